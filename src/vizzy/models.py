@@ -1,10 +1,12 @@
 """Pydantic models for Vizzy"""
 
+import sys
+from bisect import bisect_left
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, computed_field
+from pydantic import BaseModel, computed_field, field_validator
 
 
 # =============================================================================
@@ -50,6 +52,8 @@ class ImportInfo(BaseModel):
 class Node(BaseModel):
     """A derivation node in the graph"""
 
+    model_config = {"frozen": True}
+
     id: int
     import_id: int
     drv_hash: str
@@ -69,6 +73,16 @@ class Node(BaseModel):
     total_contribution: int | None = None  # Sum of unique + shared
     contribution_computed_at: datetime | None = None  # When contribution was last calculated
 
+    @field_validator("package_type", "top_level_source", "module_type")
+    @classmethod
+    def _intern_category(cls, value: str | None) -> str | None:
+        """Share one string object per value; these fields come from small closed sets.
+
+        Nodes built with model_construct skip this validator, so those call
+        sites intern the values themselves.
+        """
+        return sys.intern(value) if value is not None else None
+
 
 class Edge(BaseModel):
     """A dependency edge in the graph"""
@@ -486,46 +500,54 @@ class EssentialityStatus(str, Enum):
     @property
     def is_essential_category(self) -> bool:
         """Check if this status belongs to the essential category."""
-        return self in (
-            EssentialityStatus.ESSENTIAL,
-            EssentialityStatus.ESSENTIAL_SINGLE,
-            EssentialityStatus.ESSENTIAL_DEEP,
-        )
+        return self in _ESSENTIAL_STATUSES
 
     @property
     def is_removable_category(self) -> bool:
         """Check if this status belongs to the removable category."""
-        return self in (
-            EssentialityStatus.REMOVABLE,
-            EssentialityStatus.BUILD_ONLY,
-            EssentialityStatus.ORPHAN,
-        )
+        return self in _REMOVABLE_STATUSES
 
     @property
     def display_name(self) -> str:
         """Human-readable display name for the status."""
-        names = {
-            EssentialityStatus.ESSENTIAL: "Essential",
-            EssentialityStatus.ESSENTIAL_SINGLE: "Essential (Single Dependent)",
-            EssentialityStatus.ESSENTIAL_DEEP: "Essential (Deeply Nested)",
-            EssentialityStatus.REMOVABLE: "Removable",
-            EssentialityStatus.BUILD_ONLY: "Build Only",
-            EssentialityStatus.ORPHAN: "Orphan",
-        }
-        return names.get(self, self.value.replace("_", " ").title())
+        return _ESSENTIALITY_DISPLAY_NAMES[self]
 
     @property
     def description(self) -> str:
         """Detailed description of what this status means."""
-        descriptions = {
-            EssentialityStatus.ESSENTIAL: "Required at runtime by multiple top-level packages",
-            EssentialityStatus.ESSENTIAL_SINGLE: "Required at runtime by only one top-level package",
-            EssentialityStatus.ESSENTIAL_DEEP: "Essential dependency but deeply nested in the graph",
-            EssentialityStatus.REMOVABLE: "Only needed by optional packages, could be removed",
-            EssentialityStatus.BUILD_ONLY: "Only used during build, not in runtime closure",
-            EssentialityStatus.ORPHAN: "No path from any top-level package (cleanup candidate)",
-        }
-        return descriptions.get(self, "")
+        return _ESSENTIALITY_DESCRIPTIONS[self]
+
+
+# Lookup tables for EssentialityStatus properties, built once at import
+_ESSENTIAL_STATUSES = frozenset({
+    EssentialityStatus.ESSENTIAL,
+    EssentialityStatus.ESSENTIAL_SINGLE,
+    EssentialityStatus.ESSENTIAL_DEEP,
+})
+
+_REMOVABLE_STATUSES = frozenset({
+    EssentialityStatus.REMOVABLE,
+    EssentialityStatus.BUILD_ONLY,
+    EssentialityStatus.ORPHAN,
+})
+
+_ESSENTIALITY_DISPLAY_NAMES = {
+    EssentialityStatus.ESSENTIAL: "Essential",
+    EssentialityStatus.ESSENTIAL_SINGLE: "Essential (Single Dependent)",
+    EssentialityStatus.ESSENTIAL_DEEP: "Essential (Deeply Nested)",
+    EssentialityStatus.REMOVABLE: "Removable",
+    EssentialityStatus.BUILD_ONLY: "Build Only",
+    EssentialityStatus.ORPHAN: "Orphan",
+}
+
+_ESSENTIALITY_DESCRIPTIONS = {
+    EssentialityStatus.ESSENTIAL: "Required at runtime by multiple top-level packages",
+    EssentialityStatus.ESSENTIAL_SINGLE: "Required at runtime by only one top-level package",
+    EssentialityStatus.ESSENTIAL_DEEP: "Essential dependency but deeply nested in the graph",
+    EssentialityStatus.REMOVABLE: "Only needed by optional packages, could be removed",
+    EssentialityStatus.BUILD_ONLY: "Only used during build, not in runtime closure",
+    EssentialityStatus.ORPHAN: "No path from any top-level package (cleanup candidate)",
+}
 
 
 class AttributionPath(BaseModel):
@@ -817,6 +839,8 @@ class RemovalImpact(BaseModel):
         about whether to keep or remove a package.
     """
 
+    model_config = {"frozen": True}
+
     target: Node
     essentiality: EssentialityStatus
     affected_packages: list[Node]  # Top-level packages that would break
@@ -842,31 +866,27 @@ class RemovalImpact(BaseModel):
     @property
     def impact_level(self) -> str:
         """Categorize the impact level for display purposes."""
-        if self.removal_safe:
-            return "safe"
-        elif self.affected_count == 0:
-            return "low"
-        elif self.affected_count == 1:
-            return "medium"
-        else:
-            return "high"
+        return _IMPACT_LEVELS[self._impact_key]
 
     @computed_field
     @property
     def summary(self) -> str:
         """Human-readable summary of the removal impact."""
-        if self.removal_safe:
+        removal_safe, affected = self._impact_key
+        if removal_safe:
             if self.closure_reduction > 0:
                 return f"Safe to remove. Would reduce closure by {self.closure_reduction} packages."
             return "Safe to remove. No closure impact."
 
-        if self.affected_count == 1:
-            pkg = self.affected_packages[0].label if self.affected_packages else "1 package"
-            return f"Would break {pkg}."
-        elif self.affected_count > 1:
-            return f"Would break {self.affected_count} packages."
-        else:
-            return "Cannot determine impact."
+        return _BREAKAGE_SUMMARIES[affected].format(
+            pkg=self.affected_packages[0].label if affected == 1 else "",
+            count=self.affected_count,
+        )
+
+    @property
+    def _impact_key(self) -> tuple[bool, int]:
+        """(removal_safe, affected count capped at 2) for the lookup tables."""
+        return self.removal_safe, min(self.affected_count, 2)
 
     @computed_field
     @property
@@ -895,6 +915,37 @@ class RemovalImpact(BaseModel):
         return "\n".join(lines)
 
 
+# Lookup tables for RemovalImpact, keyed by (removal_safe, capped affected count)
+_IMPACT_LEVELS = {
+    (True, 0): "safe",
+    (True, 1): "safe",
+    (True, 2): "safe",
+    (False, 0): "low",
+    (False, 1): "medium",
+    (False, 2): "high",
+}
+
+# Upper bounds of average path depth for each EssentialityAnalysis.depth_category
+_DEPTH_THRESHOLDS = (2.0, 5.0)
+_DEPTH_CATEGORIES = ("shallow", "moderate", "deep")
+
+# EssentialityAnalysis.action_guidance per status; {dependent} is the top dependent summary
+_ACTION_GUIDANCE = {
+    EssentialityStatus.ORPHAN: "This package appears unused. Consider removing it to reduce closure size.",
+    EssentialityStatus.BUILD_ONLY: "This package is only needed at build time. It won't affect runtime.",
+    EssentialityStatus.REMOVABLE: "This package could be removed if you don't need its dependent packages.",
+    EssentialityStatus.ESSENTIAL_SINGLE: "This package is required by {dependent}. Remove that to remove this.",
+    EssentialityStatus.ESSENTIAL_DEEP: "This package is a deep dependency. It's needed but through many layers.",
+    EssentialityStatus.ESSENTIAL: "This package is essential and cannot be removed without breaking your system.",
+}
+
+_BREAKAGE_SUMMARIES = {
+    0: "Cannot determine impact.",
+    1: "Would break {pkg}.",
+    2: "Would break {count} packages.",
+}
+
+
 class EssentialityAnalysis(BaseModel):
     """Complete essentiality analysis for a package.
 
@@ -917,6 +968,8 @@ class EssentialityAnalysis(BaseModel):
         Used by the Why Chain UI for the enhanced essentiality display.
     """
 
+    model_config = {"frozen": True}
+
     target: Node
     status: EssentialityStatus
     removal_impact: RemovalImpact
@@ -952,29 +1005,14 @@ class EssentialityAnalysis(BaseModel):
         """Categorize the dependency depth for display."""
         if self.is_direct_dependency:
             return "direct"
-        elif self.path_depth_avg <= 2:
-            return "shallow"
-        elif self.path_depth_avg <= 5:
-            return "moderate"
-        else:
-            return "deep"
+        # bisect_left keeps the upper bounds inclusive (avg <= 2 is shallow)
+        return _DEPTH_CATEGORIES[bisect_left(_DEPTH_THRESHOLDS, self.path_depth_avg)]
 
     @computed_field
     @property
     def action_guidance(self) -> str:
         """Provide actionable guidance based on the analysis."""
-        if self.status == EssentialityStatus.ORPHAN:
-            return "This package appears unused. Consider removing it to reduce closure size."
-        elif self.status == EssentialityStatus.BUILD_ONLY:
-            return "This package is only needed at build time. It won't affect runtime."
-        elif self.status == EssentialityStatus.REMOVABLE:
-            return "This package could be removed if you don't need its dependent packages."
-        elif self.status == EssentialityStatus.ESSENTIAL_SINGLE:
-            return f"This package is required by {self.top_dependent_summary}. Remove that to remove this."
-        elif self.status == EssentialityStatus.ESSENTIAL_DEEP:
-            return "This package is a deep dependency. It's needed but through many layers."
-        else:  # ESSENTIAL
-            return "This package is essential and cannot be removed without breaking your system."
+        return _ACTION_GUIDANCE[self.status].format(dependent=self.top_dependent_summary)
 
 
 class AttributionCache(BaseModel):
@@ -1,8 +1,10 @@
 """Host/Import comparison routes"""
 
+import copy
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from enum import Enum
-import re
 
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
@@ -12,6 +14,7 @@ from vizzy.models import DiffType
 from vizzy.services import comparison as comparison_service
 from vizzy.services import graph as graph_service
 from vizzy.services import baseline as baseline_service
+from vizzy.services.cache import cache, cache_key_for_import
 from vizzy.database import get_db
 
 router = APIRouter(prefix="/compare")
@@ -118,14 +121,14 @@ CATEGORY_PATTERNS = {
     ],
 }
 
+_CATEGORY_MATCHER = comparison_service.CategoryMatcher(CATEGORY_PATTERNS)
 
+
+@lru_cache(maxsize=65536)
 def categorize_diff(label: str) -> DiffCategory:
-    """Categorize a package diff by its label."""
-    for category, patterns in CATEGORY_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, label, re.IGNORECASE):
-                return category
-    return DiffCategory.OTHER
+    """Categorize a package diff by its label (memoized per label)."""
+    category = _CATEGORY_MATCHER.match(label)
+    return DiffCategory.OTHER if category is None else category
 
 
 def categorize_diffs(diffs):
@@ -138,14 +141,33 @@ def categorize_diffs(diffs):
 
 def group_diffs_by_category(diffs):
     """Group diffs by semantic category."""
-    categorized = {cat: [] for cat in DiffCategory}
+    categorized = defaultdict(list)
 
     for diff in diffs:
-        category = categorize_diff(diff.label)
-        categorized[category].append(diff)
+        categorized[categorize_diff(diff.label)].append(diff)
+
+    # Only non-empty buckets exist; enum order keeps ties stable when sorting by count
+    result = {cat: categorized[cat] for cat in DiffCategory if cat in categorized}
+    return dict(sorted(result.items(), key=lambda x: -len(x[1])))
+
 
-    # Remove empty categories and sort by count
-    return {k: v for k, v in sorted(categorized.items(), key=lambda x: -len(x[1])) if v}
+# Importance adjustments by package type and by label category
+_PACKAGE_TYPE_SCORES = {
+    'application': 5,
+    'service': 4,
+    'development': 3,
+    'library': -2,
+    'documentation': -3,
+    'font': -1,
+}
+_CATEGORY_SCORES = {
+    DiffCategory.DESKTOP_ENV: 3,
+    DiffCategory.SYSTEM_SERVICES: 2,
+    DiffCategory.DEVELOPMENT: 2,
+    DiffCategory.LIBRARIES: -1,
+    DiffCategory.DOCUMENTATION: -2,
+    DiffCategory.FONTS: -1,
+}
 
 
 def score_diff_importance(diff) -> float:
@@ -175,18 +197,7 @@ def score_diff_importance(diff) -> float:
         score += 10
 
     # Package type scoring
-    if diff.package_type == 'application':
-        score += 5
-    elif diff.package_type == 'service':
-        score += 4
-    elif diff.package_type == 'development':
-        score += 3
-    elif diff.package_type == 'library':
-        score -= 2
-    elif diff.package_type == 'documentation':
-        score -= 3
-    elif diff.package_type == 'font':
-        score -= 1
+    score += _PACKAGE_TYPE_SCORES.get(diff.package_type, 0)
 
     # Closure impact (larger impact = more important)
     left_closure = diff.left_node.closure_size if diff.left_node else 0
@@ -195,19 +206,7 @@ def score_diff_importance(diff) -> float:
     score += min(closure_impact / 100, 5)  # Cap at 5 points
 
     # Category scoring
-    category = categorize_diff(diff.label)
-    if category == DiffCategory.DESKTOP_ENV:
-        score += 3
-    elif category == DiffCategory.SYSTEM_SERVICES:
-        score += 2
-    elif category == DiffCategory.DEVELOPMENT:
-        score += 2
-    elif category == DiffCategory.LIBRARIES:
-        score -= 1
-    elif category == DiffCategory.DOCUMENTATION:
-        score -= 2
-    elif category == DiffCategory.FONTS:
-        score -= 1
+    score += _CATEGORY_SCORES.get(categorize_diff(diff.label), 0)
 
     return score
 
@@ -479,6 +478,55 @@ def get_reverse_paths(import_id: int, node_id: int, max_depth: int = 10) -> list
             return results
 
 
+def _fetch_package_nodes(
+    cur,
+    package_label: str,
+    left_import_id: int,
+    right_import_id: int,
+) -> dict[int, dict]:
+    """Find the node for a package label in both imports with one query.
+
+    Returns:
+        Mapping of import id to node row, for the imports containing the package
+    """
+    cur.execute(
+        """
+        SELECT DISTINCT ON (import_id)
+            import_id, id, label, drv_hash, package_type
+        FROM nodes
+        WHERE label = %s AND import_id IN (%s, %s)
+        ORDER BY import_id, id
+        """,
+        (package_label, left_import_id, right_import_id)
+    )
+    return {
+        row['import_id']: {k: v for k, v in row.items() if k != 'import_id'}
+        for row in cur.fetchall()
+    }
+
+
+def _diff_package_nodes(
+    package_label: str,
+    left_row: dict | None,
+    right_row: dict | None,
+) -> dict:
+    """Build the trace comparison result for a package's two nodes.
+
+    Pure function of its arguments; paths are left empty for the caller
+    to fill in.
+    """
+    in_both = left_row is not None and right_row is not None
+    return {
+        "package": package_label,
+        "left_node": dict(left_row) if left_row else None,
+        "right_node": dict(right_row) if right_row else None,
+        "left_paths": [],
+        "right_paths": [],
+        "same_hash": in_both and left_row['drv_hash'] == right_row['drv_hash'],
+        "in_both": in_both,
+    }
+
+
 def compare_package_traces(
     left_import_id: int,
     right_import_id: int,
@@ -490,54 +538,35 @@ def compare_package_traces(
     Returns paths from root-level packages down to the target package
     in both configurations.
     """
+    # Both imports appear as "import:<id>" so deleting either one
+    # (cache.invalidate_import) drops the cached trace.
+    cache_key = cache_key_for_import(
+        "cmp_trace", left_import_id, f"import:{right_import_id}", package_label
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        # Hand out copies so a caller mutating its result can't alter later hits
+        return copy.deepcopy(cached)
+
     with get_db() as conn:
         with conn.cursor() as cur:
-            # Find node in left import
-            cur.execute(
-                """
-                SELECT id, label, drv_hash, package_type
-                FROM nodes
-                WHERE import_id = %s AND label = %s
-                LIMIT 1
-                """,
-                (left_import_id, package_label)
+            rows_by_import = _fetch_package_nodes(
+                cur, package_label, left_import_id, right_import_id
             )
-            left_row = cur.fetchone()
 
-            # Find node in right import
-            cur.execute(
-                """
-                SELECT id, label, drv_hash, package_type
-                FROM nodes
-                WHERE import_id = %s AND label = %s
-                LIMIT 1
-                """,
-                (right_import_id, package_label)
-            )
-            right_row = cur.fetchone()
+    left_row = rows_by_import.get(left_import_id)
+    right_row = rows_by_import.get(right_import_id)
 
-    result = {
-        "package": package_label,
-        "left_node": None,
-        "right_node": None,
-        "left_paths": [],
-        "right_paths": [],
-        "same_hash": False,
-        "in_both": False,
-    }
+    result = _diff_package_nodes(package_label, left_row, right_row)
 
     if left_row:
-        result["left_node"] = dict(left_row)
         result["left_paths"] = get_reverse_paths(left_import_id, left_row['id'])
 
     if right_row:
-        result["right_node"] = dict(right_row)
         result["right_paths"] = get_reverse_paths(right_import_id, right_row['id'])
 
-    if left_row and right_row:
-        result["in_both"] = True
-        result["same_hash"] = left_row['drv_hash'] == right_row['drv_hash']
-
+    # Imports are immutable once ingested, so traces only go stale on delete
+    cache.set(cache_key, copy.deepcopy(result), ttl=3600)
     return result
 
 
@@ -597,8 +597,9 @@ async def dashboard(request: Request, import_id: int):
     if not import_info:
         return HTMLResponse("Import not found", status_code=404)
 
-    # Get dashboard summary metrics
-    summary = dashboard_service.get_dashboard_summary(import_id)
+    # Get dashboard summary metrics. The contributors and type distribution
+    # are fetched over the same connection and cached for the HTMX partials.
+    summary, _, _ = dashboard_service.get_dashboard_bundle(import_id)
 
     # Transform summary for template compatibility
     template_summary = None
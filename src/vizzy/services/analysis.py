@@ -1,6 +1,7 @@
 """Graph analysis service - duplicates, paths, loops, Sankey flows"""
 
 import json
+from array import array
 from dataclasses import dataclass
 from vizzy.database import get_db
 from vizzy.models import Node, Edge, LoopGroup, RedundantLink
@@ -469,12 +470,15 @@ def build_sankey_data(import_id: int, label: str, max_deps_per_variant: int = 10
 def find_loops(import_id: int) -> list[LoopGroup]:
     """Find all strongly connected components (cycles) in the dependency graph.
 
-    Uses Tarjan's algorithm implemented in Python since PostgreSQL lacks native SCC support.
+    Uses Pearce's iterative variant of Tarjan's algorithm implemented in Python since
+    PostgreSQL lacks native SCC support.
     A cycle indicates circular dependencies, which are unusual in Nix but possible with overrides.
 
     Returns list of LoopGroup objects, each containing the nodes involved in a cycle.
     """
-    # Check cache first - loop detection is expensive and results don't change
+    # Check cache first - loop detection is expensive and results don't change.
+    # Edges are only written while importing, and re-imports invalidate the
+    # import's keys, so the import id alone identifies the graph.
     cache_key = cache_key_for_import("loops", import_id)
     cached = cache.get(cache_key)
     if cached is not None:
@@ -482,16 +486,8 @@ def find_loops(import_id: int) -> list[LoopGroup]:
 
     with get_db() as conn:
         with conn.cursor() as cur:
-            # Fetch all nodes and edges for this import
-            cur.execute(
-                """
-                SELECT id, import_id, drv_hash, drv_name, label, package_type, depth, closure_size, metadata, is_top_level, top_level_source
-                FROM nodes WHERE import_id = %s
-                """,
-                (import_id,)
-            )
-            nodes_by_id = {row['id']: Node(**row) for row in cur.fetchall()}
-
+            # Only the edge list is needed to find cycles; it is served from the
+            # (import_id, source_id, target_id) index without touching node rows
             cur.execute(
                 """
                 SELECT source_id, target_id FROM edges WHERE import_id = %s
@@ -500,107 +496,187 @@ def find_loops(import_id: int) -> list[LoopGroup]:
             )
             edges = [(row['source_id'], row['target_id']) for row in cur.fetchall()]
 
-            # Build adjacency list (source depends on target, so source -> target)
-            adjacency: dict[int, list[int]] = {node_id: [] for node_id in nodes_by_id}
-            for source_id, target_id in edges:
-                if source_id in adjacency and target_id in nodes_by_id:
-                    adjacency[source_id].append(target_id)
-
-            # Tarjan's SCC algorithm
-            index_counter = [0]
-            stack: list[int] = []
-            lowlinks: dict[int, int] = {}
-            index: dict[int, int] = {}
-            on_stack: dict[int, bool] = {}
-            sccs: list[list[int]] = []
-
-            def strongconnect(node: int):
-                index[node] = index_counter[0]
-                lowlinks[node] = index_counter[0]
-                index_counter[0] += 1
-                stack.append(node)
-                on_stack[node] = True
-
-                for successor in adjacency.get(node, []):
-                    if successor not in index:
-                        strongconnect(successor)
-                        lowlinks[node] = min(lowlinks[node], lowlinks[successor])
-                    elif on_stack.get(successor, False):
-                        lowlinks[node] = min(lowlinks[node], index[successor])
-
-                # If node is a root node, pop the stack and generate an SCC
-                if lowlinks[node] == index[node]:
-                    scc = []
-                    while True:
-                        w = stack.pop()
-                        on_stack[w] = False
-                        scc.append(w)
-                        if w == node:
-                            break
-                    # Only keep SCCs with more than one node (actual cycles)
-                    if len(scc) > 1:
-                        sccs.append(scc)
-
-            # Run Tarjan's from each unvisited node
-            for node_id in nodes_by_id:
-                if node_id not in index:
-                    strongconnect(node_id)
+            # Re-map node ids to dense 0..n-1 positions and pack the edges into
+            # CSR arrays over them (source depends on target, so source -> target).
+            # Nodes without edges can't be part of a cycle, so they never appear.
+            position: dict[int, int] = {}
+            dense_edges = [
+                (position.setdefault(source_id, len(position)),
+                 position.setdefault(target_id, len(position)))
+                for source_id, target_id in edges
+            ]
+            node_ids = list(position)
+            indptr, indices = _build_csr(len(node_ids), dense_edges)
+            sccs = _strongly_connected_components(indptr, indices)
 
-            # Build LoopGroup objects
+            # Build LoopGroup objects, fetching node rows only for cycle members
             loop_groups = []
-            for scc in sccs:
-                scc_nodes = [nodes_by_id[nid] for nid in scc if nid in nodes_by_id]
-                if scc_nodes:
-                    # Find a simple cycle path within this SCC
-                    cycle_path = _find_cycle_in_scc(scc, adjacency)
-                    loop_groups.append(LoopGroup(nodes=scc_nodes, cycle_path=cycle_path))
+            if sccs:
+                cur.execute(
+                    """
+                    SELECT id, import_id, drv_hash, drv_name, label, package_type, depth, closure_size, metadata, is_top_level, top_level_source
+                    FROM nodes WHERE import_id = %s AND id = ANY(%s)
+                    """,
+                    (import_id, [node_ids[v] for scc in sccs for v in scc])
+                )
+                nodes_by_id = {row['id']: Node(**row) for row in cur.fetchall()}
+
+                for scc in sccs:
+                    scc_ids = [node_ids[v] for v in scc]
+                    scc_nodes = [nodes_by_id[nid] for nid in scc_ids if nid in nodes_by_id]
+                    if scc_nodes:
+                        # Find a simple cycle path within this SCC
+                        cycle = _find_cycle_in_scc(scc, indptr, indices)
+                        cycle_path = [node_ids[v] for v in cycle]
+                        loop_groups.append(LoopGroup(nodes=scc_nodes, cycle_path=cycle_path))
 
     # Cache for 30 minutes - loop detection is expensive and data doesn't change
     cache.set(cache_key, loop_groups, ttl=1800)
     return loop_groups
 
 
-def _find_cycle_in_scc(scc_nodes: list[int], adjacency: dict[int, list[int]]) -> list[int]:
-    """Find a simple cycle path within an SCC using DFS."""
-    scc_set = set(scc_nodes)
+def _build_csr(n: int, edges: list[tuple[int, int]]) -> tuple[array, array]:
+    """Pack (source, target) edges over nodes 0..n-1 into CSR arrays.
+
+    The successors of node v are indices[indptr[v]:indptr[v + 1]], in the order
+    the edges were given.
+    """
+    indptr = array('i', [0]) * (n + 1)
+    for source, _ in edges:
+        indptr[source + 1] += 1
+    for v in range(n):
+        indptr[v + 1] += indptr[v]
+
+    fill = indptr[:-1]
+    indices = array('i', [0]) * len(edges)
+    for source, target in edges:
+        indices[fill[source]] = target
+        fill[source] += 1
+    return indptr, indices
+
+
+def _strongly_connected_components(indptr: array, indices: array) -> list[list[int]]:
+    """Return the SCCs with more than one node of a CSR graph over nodes 0..n-1.
+
+    Pearce's space-efficient formulation of Tarjan's algorithm, run with an
+    explicit work stack so deep dependency chains can't hit the recursion limit.
+    A single rindex array holds the DFS index of nodes still being explored and
+    the component number (counting down from n - 1) of finished ones, so no
+    separate lowlink or on-stack bookkeeping is needed. Each node's position in
+    its successor list is kept in next_edge, so the work stack holds plain ints.
+    """
+    n = len(indptr) - 1
+    rindex = array('i', [0]) * n  # 0 means unvisited
+    next_edge = indptr[:-1]
+    root = bytearray(n)
+    stack: list[int] = []
+    work: list[int] = []
+    sccs: list[list[int]] = []
+    index = 1
+    component = n - 1
+
+    for start in range(n):
+        if rindex[start]:
+            continue
+
+        rindex[start] = index
+        index += 1
+        root[start] = 1
+        work.append(start)
+
+        while work:
+            node = work[-1]
+            edge = next_edge[node]
+            end = indptr[node + 1]
+            while edge < end:
+                successor = indices[edge]
+                edge += 1
+                if not rindex[successor]:
+                    # Descend; the parent compares against this child once it's done
+                    next_edge[node] = edge
+                    rindex[successor] = index
+                    index += 1
+                    root[successor] = 1
+                    work.append(successor)
+                    break
+                if rindex[successor] < rindex[node]:
+                    rindex[node] = rindex[successor]
+                    root[node] = 0
+            else:
+                work.pop()
+                if root[node]:
+                    # node is the root of an SCC: everything above it on the stack
+                    # with an index at least its own belongs to the same component
+                    index -= 1
+                    scc = [node]
+                    while stack and rindex[node] <= rindex[stack[-1]]:
+                        member = stack.pop()
+                        rindex[member] = component
+                        index -= 1
+                        scc.append(member)
+                    rindex[node] = component
+                    component -= 1
+                    # Only keep SCCs with more than one node (actual cycles)
+                    if len(scc) > 1:
+                        sccs.append(scc)
+                else:
+                    stack.append(node)
+
+                if work:
+                    parent = work[-1]
+                    if rindex[node] < rindex[parent]:
+                        rindex[parent] = rindex[node]
+                        root[parent] = 0
+
+    return sccs
+
+
+def _find_cycle_in_scc(scc_nodes: list[int], indptr: array, indices: array) -> list[int]:
+    """Find a simple cycle path within an SCC using DFS over the CSR graph.
+
+    scc_nodes are dense node positions, as returned by _strongly_connected_components,
+    and the path is given in the same positions. Each path entry keeps a cursor
+    into its successor list, so the DFS needs no recursion.
+    """
     if not scc_nodes:
         return []
 
+    n = len(indptr) - 1
+    in_scc = bytearray(n)
+    for node in scc_nodes:
+        in_scc[node] = 1
+
     # Start from first node and find a path back to it
     start = scc_nodes[0]
-    visited: set[int] = set()
-    path: list[int] = []
-
-    def dfs(node: int, target: int) -> bool:
-        if node == target and path:
-            return True
-        if node in visited:
-            return False
-
-        visited.add(node)
-        path.append(node)
-
-        for neighbor in adjacency.get(node, []):
-            if neighbor in scc_set:
-                if neighbor == target and len(path) > 1:
-                    path.append(neighbor)
-                    return True
-                if neighbor not in visited:
-                    if dfs(neighbor, target):
-                        return True
-
-        path.pop()
-        return False
-
-    # Try to find cycle starting and ending at start
-    for neighbor in adjacency.get(start, []):
-        if neighbor in scc_set:
-            visited = {start}
-            path = [start]
-            if dfs(neighbor, start):
-                return path
-
-    return scc_nodes  # Fallback to just returning the SCC nodes
+    visited = bytearray(n)
+    visited[start] = 1
+    path = [start]
+    cursors = [indptr[start]]
+
+    while path:
+        node = path[-1]
+        edge = cursors[-1]
+        end = indptr[node + 1]
+        while edge < end:
+            neighbor = indices[edge]
+            edge += 1
+            if not in_scc[neighbor]:
+                continue
+            if neighbor == start:
+                if len(path) > 1:
+                    path.append(start)
+                    return path
+            elif not visited[neighbor]:
+                cursors[-1] = edge
+                visited[neighbor] = 1
+                path.append(neighbor)
+                cursors.append(indptr[neighbor])
+                break
+        else:
+            path.pop()
+            cursors.pop()
+
+    return list(scc_nodes)  # Fallback to just returning the SCC nodes
 
 
 def find_redundant_links(import_id: int, max_check: int = 1000) -> list[RedundantLink]:
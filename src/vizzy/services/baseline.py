@@ -25,7 +25,7 @@ from vizzy.services.cache import cache, cache_key_for_import
 logger = logging.getLogger("vizzy.baseline")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Baseline:
     """A baseline reference configuration for comparison.
 
@@ -51,7 +51,7 @@ class Baseline:
     tags: list[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BaselineComparison:
     """Result of comparing an import against a baseline.
 
@@ -77,7 +77,7 @@ class BaselineComparison:
     computed_at: datetime
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BaselineCreateResult:
     """Result of creating a baseline."""
     baseline_id: int
@@ -749,7 +749,7 @@ def _row_to_comparison(row: dict) -> BaselineComparison:
 # =============================================================================
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BaselinePreset:
     """A preset option for baseline comparison.
 
@@ -4,10 +4,14 @@ This module provides functionality to compare two imported configurations
 and identify differences between them.
 """
 
+import heapq
 import re
+import sys
 from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from typing import Iterable
 
 from vizzy.database import get_db
 from vizzy.models import (
@@ -42,6 +46,11 @@ def classify_diff(left_hash: str | None, right_hash: str | None) -> DiffType:
         return DiffType.ONLY_RIGHT
 
 
+def _intern_optional(value: str | None) -> str | None:
+    """Intern a nullable category string, as Node's validator would."""
+    return sys.intern(value) if value is not None else None
+
+
 def _build_node_from_row(row: dict, prefix: str) -> Node | None:
     """Build a Node object from a row dictionary with a column prefix.
 
@@ -56,18 +65,21 @@ def _build_node_from_row(row: dict, prefix: str) -> Node | None:
     if not node_id:
         return None
 
-    return Node(
+    # Columns come straight from the nodes table with the types Node
+    # expects, so skip pydantic validation for these per-row objects.
+    # model_construct bypasses Node's interning validator, so intern here
+    return Node.model_construct(
         id=node_id,
         import_id=row.get(f"{prefix}_import_id") or 0,
         drv_hash=row.get(f"{prefix}_hash") or "",
         drv_name=row.get(f"{prefix}_name") or "",
         label=row.get("label") or "",
-        package_type=row.get(f"{prefix}_type"),
+        package_type=_intern_optional(row.get(f"{prefix}_type")),
         depth=row.get(f"{prefix}_depth"),
         closure_size=row.get(f"{prefix}_closure"),
         metadata=row.get(f"{prefix}_metadata"),
         is_top_level=row.get(f"{prefix}_is_top_level") or False,
-        top_level_source=row.get(f"{prefix}_top_level_source"),
+        top_level_source=_intern_optional(row.get(f"{prefix}_top_level_source")),
     )
 
 
@@ -163,7 +175,7 @@ def compare_imports(
         # Determine package type (prefer left, fallback to right)
         package_type = row["left_type"] or row["right_type"]
 
-        diff = NodeDiff(
+        diff = NodeDiff.model_construct(
             label=row["label"],
             package_type=package_type,
             left_node=left_node,
@@ -593,6 +605,65 @@ def match_nodes(
     return diffs
 
 
+# Characters that make a "^..." rule more than a literal prefix
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+class CategoryMatcher:
+    """Match package labels against ordered category pattern rules.
+
+    Literal ``^prefix`` rules are stored in a character trie, so a single
+    walk over the label finds every prefix hit at once. The remaining
+    rules (suffixes, character classes) are compiled into one
+    case-insensitive alternation per category. As with a linear scan over
+    the rules, the first category in rule order that matches wins.
+    """
+
+    def __init__(self, patterns: dict[Enum, list[str]]):
+        self._categories = list(patterns)
+        self._trie: dict = {}
+        regexes = []
+
+        for priority, (category, rules) in enumerate(patterns.items()):
+            residual = []
+            for rule in rules:
+                prefix = rule[1:]
+                if rule.startswith("^") and not _REGEX_META.search(prefix):
+                    node = self._trie
+                    for char in prefix.lower():
+                        node = node.setdefault(char, {})
+                    # None marks the end of a prefix; keep the best priority
+                    node[None] = min(node.get(None, priority), priority)
+                else:
+                    residual.append(rule)
+            if residual:
+                pattern = "|".join(f"(?:{rule})" for rule in residual)
+                regexes.append((priority, re.compile(pattern, re.IGNORECASE)))
+
+        self._regexes = tuple(regexes)
+
+    def match(self, label: str) -> Enum | None:
+        """Return the first category whose rules match label, or None."""
+        best = len(self._categories)
+
+        node = self._trie
+        for char in label.lower():
+            node = node.get(char)
+            if node is None:
+                break
+            best = min(best, node.get(None, best))
+
+        # Only categories ranked ahead of the best prefix hit can still win
+        for priority, regex in self._regexes:
+            if priority >= best:
+                break
+            if regex.search(label):
+                best = priority
+                break
+
+        return self._categories[best] if best < len(self._categories) else None
+
+
 class DiffCategory(str, Enum):
     """High-level diff categories for UI display."""
 
@@ -714,9 +785,33 @@ CATEGORY_PATTERNS: dict[DiffCategory, list[str]] = {
     ],
 }
 
+_CATEGORY_MATCHER = CategoryMatcher(CATEGORY_PATTERNS)
+
+
+# Categories implied by a package type, checked before any label patterns
+_PACKAGE_TYPE_CATEGORIES: dict[str, DiffCategory] = {
+    "font": DiffCategory.FONTS,
+    "documentation": DiffCategory.DOCUMENTATION,
+    "python-package": DiffCategory.PYTHON,
+    "development": DiffCategory.DEVELOPMENT,
+    "service": DiffCategory.SYSTEM_SERVICES,
+    "kernel": DiffCategory.SYSTEM_SERVICES,
+    "library": DiffCategory.LIBRARIES,
+}
 
+
+@lru_cache(maxsize=65536)
 def categorize_diff(label: str, package_type: str | None) -> DiffCategory:
-    """Categorize a single diff based on its label and package type.
+    """Categorize a single diff based on its package type and label.
+
+    Package types listed in _PACKAGE_TYPE_CATEGORIES take precedence;
+    other diffs are categorized by matching the label against
+    CATEGORY_PATTERNS.
+
+    Results are memoized per (label, package_type): the same labels recur
+    across diffs and across the summary helpers that re-categorize a
+    comparison. CATEGORY_PATTERNS is compiled into _CATEGORY_MATCHER at
+    import time and treated as a constant.
 
     Args:
         label: The package label
@@ -725,24 +820,14 @@ def categorize_diff(label: str, package_type: str | None) -> DiffCategory:
     Returns:
         The appropriate DiffCategory for this package
     """
-    # Check pattern-based categorization first
-    for category, patterns in CATEGORY_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, label, re.IGNORECASE):
-                return category
-
-    # Fall back to package type if available
-    if package_type:
-        type_mapping = {
-            "font": DiffCategory.FONTS,
-            "documentation": DiffCategory.DOCUMENTATION,
-            "python-package": DiffCategory.PYTHON,
-            "development": DiffCategory.DEVELOPMENT,
-            "service": DiffCategory.SYSTEM_SERVICES,
-            "library": DiffCategory.LIBRARIES,
-        }
-        if package_type in type_mapping:
-            return type_mapping[package_type]
+    # A known package type decides the category without scanning the label
+    category = _PACKAGE_TYPE_CATEGORIES.get(package_type)
+    if category is not None:
+        return category
+
+    category = _CATEGORY_MATCHER.match(label)
+    if category is not None:
+        return category
 
     return DiffCategory.OTHER
 
@@ -756,17 +841,40 @@ def categorize_diffs(diffs: list[NodeDiff]) -> dict[DiffCategory, list[NodeDiff]
     Returns:
         Dictionary mapping categories to lists of diffs in that category
     """
-    categorized: dict[DiffCategory, list[NodeDiff]] = {cat: [] for cat in DiffCategory}
+    categorized: defaultdict[DiffCategory, list[NodeDiff]] = defaultdict(list)
 
     for diff in diffs:
-        category = categorize_diff(diff.label, diff.package_type)
-        categorized[category].append(diff)
+        categorized[categorize_diff(diff.label, diff.package_type)].append(diff)
 
-    # Remove empty categories and sort by count
-    result = {k: v for k, v in categorized.items() if v}
+    # Only categories that received diffs have buckets; walk them in enum
+    # order so ties keep a stable order, then sort by count
+    result = {cat: categorized[cat] for cat in DiffCategory if cat in categorized}
     return dict(sorted(result.items(), key=lambda x: len(x[1]), reverse=True))
 
 
+# Importance adjustment for each package type
+_PACKAGE_TYPE_SCORES: dict[str, int] = {
+    "application": 5,
+    "service": 4,
+    "font": 2,
+    "library": -2,
+    "documentation": -1,
+}
+
+
+def _importance_key(diff: NodeDiff) -> int:
+    """Integer form of score_diff_importance, scaled by 100.
+
+    Both score terms pack exactly into one int (the closure term is capped
+    at 500 before scaling), so sorting on it orders diffs the same way as
+    the float score while comparing plain ints.
+    """
+    left_closure = diff.left_node.closure_size if diff.left_node else 0
+    right_closure = diff.right_node.closure_size if diff.right_node else 0
+    closure_impact = abs((left_closure or 0) - (right_closure or 0))
+    return _PACKAGE_TYPE_SCORES.get(diff.package_type, 0) * 100 + min(closure_impact, 500)
+
+
 def score_diff_importance(diff: NodeDiff) -> float:
     """Score how important a diff is to the user.
 
@@ -780,33 +888,16 @@ def score_diff_importance(diff: NodeDiff) -> float:
     - Build-time only
     - Small closure
 
+    The package type contributes its _PACKAGE_TYPE_SCORES weight and the
+    closure impact contributes one point per 100 packages, capped at 5.
+
     Args:
         diff: The NodeDiff to score
 
     Returns:
         A float score (higher = more important)
     """
-    score = 0.0
-
-    # Package type scoring
-    if diff.package_type == "application":
-        score += 5
-    elif diff.package_type == "service":
-        score += 4
-    elif diff.package_type == "font":
-        score += 2
-    elif diff.package_type == "library":
-        score -= 2
-    elif diff.package_type == "documentation":
-        score -= 1
-
-    # Closure impact scoring
-    left_closure = diff.left_node.closure_size if diff.left_node else 0
-    right_closure = diff.right_node.closure_size if diff.right_node else 0
-    closure_impact = abs((left_closure or 0) - (right_closure or 0))
-    score += min(closure_impact / 100, 5)  # Cap contribution at 5
-
-    return score
+    return _importance_key(diff) / 100
 
 
 def sort_diffs_by_importance(diffs: list[NodeDiff]) -> list[NodeDiff]:
@@ -818,7 +909,23 @@ def sort_diffs_by_importance(diffs: list[NodeDiff]) -> list[NodeDiff]:
     Returns:
         Sorted list of diffs (most important first)
     """
-    return sorted(diffs, key=score_diff_importance, reverse=True)
+    return sorted(diffs, key=_importance_key, reverse=True)
+
+
+def top_n_by_importance(diffs: Iterable[NodeDiff], n: int) -> list[NodeDiff]:
+    """Return the n most important diffs without sorting the whole list.
+
+    Equivalent to ``sort_diffs_by_importance(diffs)[:n]``, including the
+    order of ties, but runs in O(N log n).
+
+    Args:
+        diffs: Diffs to rank
+        n: Number of diffs to return
+
+    Returns:
+        Up to n diffs, most important first
+    """
+    return heapq.nlargest(n, diffs, key=_importance_key)
 
 
 def generate_diff_summary(comparison: ImportComparison) -> str:
@@ -860,7 +967,7 @@ def generate_diff_summary(comparison: ImportComparison) -> str:
     return " ".join(parts)
 
 
-@dataclass
+@dataclass(slots=True)
 class CategorySummary:
     """Summary of diffs within a semantic category."""
     category: DiffCategory
@@ -874,6 +981,10 @@ class CategorySummary:
     total_closure_impact: int  # total closure size change
 
 
+# Position of each category in the enum, used to break ties deterministically
+_CATEGORY_ORDER = {category: index for index, category in enumerate(DiffCategory)}
+
+
 def get_category_summaries(
     comparison: ImportComparison,
     diff_type_filter: DiffType | None = None,
@@ -881,7 +992,8 @@ def get_category_summaries(
     """Get summaries of all categories with their diffs.
 
     This function provides a complete overview of differences grouped
-    by semantic category, with counts and net changes for each.
+    by semantic category, with counts and net changes for each. Each diff
+    is categorized once and its category's counters are updated in place.
 
     Args:
         comparison: The ImportComparison to summarize
@@ -890,38 +1002,48 @@ def get_category_summaries(
     Returns:
         List of CategorySummary objects, sorted by impact (largest changes first)
     """
-    # Filter diffs if needed
-    diffs = comparison.all_diffs
-    if diff_type_filter:
-        diffs = [d for d in diffs if d.diff_type == diff_type_filter]
-
-    # Categorize all diffs
-    categorized = categorize_diffs(diffs)
-
-    summaries = []
-    for category, category_diffs in categorized.items():
-        left_only = sum(1 for d in category_diffs if d.diff_type == DiffType.ONLY_LEFT)
-        right_only = sum(1 for d in category_diffs if d.diff_type == DiffType.ONLY_RIGHT)
-        different = sum(1 for d in category_diffs if d.diff_type == DiffType.DIFFERENT_HASH)
-        same = sum(1 for d in category_diffs if d.diff_type == DiffType.SAME)
-
-        # Calculate closure impact (sum of all closure_impact values)
-        closure_impact = sum(d.closure_impact for d in category_diffs)
-
-        summaries.append(CategorySummary(
-            category=category,
-            display_name=category.value,
-            diffs=category_diffs,
-            left_only_count=left_only,
-            right_only_count=right_only,
-            different_count=different,
-            same_count=same,
-            net_change=right_only - left_only,
-            total_closure_impact=closure_impact,
-        ))
-
-    # Sort by absolute net change (biggest changes first)
-    summaries.sort(key=lambda s: abs(s.net_change), reverse=True)
+    by_category: dict[DiffCategory, CategorySummary] = {}
+
+    for diff in comparison.all_diffs:
+        if diff_type_filter and diff.diff_type != diff_type_filter:
+            continue
+
+        category = categorize_diff(diff.label, diff.package_type)
+        summary = by_category.get(category)
+        if summary is None:
+            summary = by_category[category] = CategorySummary(
+                category=category,
+                display_name=category.value,
+                diffs=[],
+                left_only_count=0,
+                right_only_count=0,
+                different_count=0,
+                same_count=0,
+                net_change=0,
+                total_closure_impact=0,
+            )
+
+        summary.diffs.append(diff)
+        if diff.diff_type == DiffType.ONLY_LEFT:
+            summary.left_only_count += 1
+        elif diff.diff_type == DiffType.ONLY_RIGHT:
+            summary.right_only_count += 1
+        elif diff.diff_type == DiffType.DIFFERENT_HASH:
+            summary.different_count += 1
+        else:
+            summary.same_count += 1
+        summary.total_closure_impact += diff.closure_impact
+
+    summaries = list(by_category.values())
+    for summary in summaries:
+        summary.net_change = summary.right_only_count - summary.left_only_count
+
+    # Biggest net change first; ties fall back to category size, then enum order
+    summaries.sort(key=lambda s: (
+        -abs(s.net_change),
+        -len(s.diffs),
+        _CATEGORY_ORDER[s.category],
+    ))
 
     return summaries
 
@@ -940,9 +1062,8 @@ def get_top_changes(
         List of most important NodeDiffs
     """
     # Only look at actual changes (not SAME)
-    changes = [d for d in comparison.all_diffs if d.diff_type != DiffType.SAME]
-    sorted_changes = sort_diffs_by_importance(changes)
-    return sorted_changes[:limit]
+    changes = (d for d in comparison.all_diffs if d.diff_type != DiffType.SAME)
+    return top_n_by_importance(changes, limit)
 
 
 def generate_category_summary_text(summaries: list[CategorySummary]) -> str:
@@ -1010,6 +1131,27 @@ from vizzy.models import (
 )
 
 
+# Version suffix patterns, tried in order of specificity.
+# Versions typically start with a digit and can contain digits, dots, and hyphens.
+_VERSION_PATTERNS: tuple[re.Pattern[str], ...] = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        # Standard version: name-1.2.3 or name-1.2.3-4
+        r'^(.+?)-(\d+(?:\.\d+)*(?:-\d+)?)$',
+        # Version with release suffix: name-1.2.3rc1 or name-1.2.3_beta
+        r'^(.+?)-(\d+(?:\.\d+)*(?:[-_]?(?:alpha|beta|rc|pre|post|dev|git|svn|hg|p)\d*)?)$',
+        # Date-based version: name-20231215 or name-2023-12-15
+        r'^(.+?)-(\d{8}|\d{4}-\d{2}-\d{2})$',
+        # Git/commit hash version: name-unstable-2023-12-15
+        r'^(.+?)-(unstable-\d{4}-\d{2}-\d{2})$',
+        # Short numeric version: name-1 or name-13
+        r'^(.+?)-(\d+)$',
+    )
+)
+_VERSION_SEPARATORS = re.compile(r'[.\-_]')
+_VERSION_SUBPARTS = re.compile(r'\d+|[a-zA-Z]+')
+
+
 def extract_version(label: str) -> Tuple[str, str | None]:
     """Extract package name and version from a derivation label.
 
@@ -1044,26 +1186,8 @@ def extract_version(label: str) -> Tuple[str, str | None]:
         >>> extract_version("perl5.38.2-URI-5.21")
         ("perl5.38.2-URI", "5.21")
     """
-    # Pattern to match version at the end of the label
-    # Versions typically start with a digit and can contain digits, dots, and hyphens
-    # We need to find the last occurrence of -<version> pattern
-
-    # Try multiple patterns in order of specificity
-    patterns = [
-        # Standard version: name-1.2.3 or name-1.2.3-4
-        r'^(.+?)-(\d+(?:\.\d+)*(?:-\d+)?)$',
-        # Version with release suffix: name-1.2.3rc1 or name-1.2.3_beta
-        r'^(.+?)-(\d+(?:\.\d+)*(?:[-_]?(?:alpha|beta|rc|pre|post|dev|git|svn|hg|p)\d*)?)$',
-        # Date-based version: name-20231215 or name-2023-12-15
-        r'^(.+?)-(\d{8}|\d{4}-\d{2}-\d{2})$',
-        # Git/commit hash version: name-unstable-2023-12-15
-        r'^(.+?)-(unstable-\d{4}-\d{2}-\d{2})$',
-        # Short numeric version: name-1 or name-13
-        r'^(.+?)-(\d+)$',
-    ]
-
-    for pattern in patterns:
-        match = re.match(pattern, label, re.IGNORECASE)
+    for pattern in _VERSION_PATTERNS:
+        match = pattern.match(label)
         if match:
             return match.group(1), match.group(2)
 
@@ -1096,13 +1220,13 @@ def parse_version_components(version: str) -> list[int | str]:
     components: list[int | str] = []
 
     # Split on common separators
-    parts = re.split(r'[.\-_]', version)
+    parts = _VERSION_SEPARATORS.split(version)
 
     for part in parts:
         if not part:
             continue
         # Further split on numeric/alpha boundaries
-        subparts = re.findall(r'\d+|[a-zA-Z]+', part)
+        subparts = _VERSION_SUBPARTS.findall(part)
         for subpart in subparts:
             if subpart.isdigit():
                 components.append(int(subpart))
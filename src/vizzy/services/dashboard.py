@@ -69,112 +69,122 @@ class TypeDistributionEntry:
     total_closure_size: int
 
 
-def get_dashboard_summary(import_id: int) -> DashboardSummary | None:
-    """Get complete dashboard summary metrics for an import.
+def _query_dashboard_summary(cur, import_id: int) -> DashboardSummary | None:
+    """Run the dashboard summary queries on an open cursor.
+
+    The baseline comparison is left unset; see _attach_baseline_comparison.
 
     Args:
+        cur: Cursor on an open connection
         import_id: The import to get metrics for
 
     Returns:
-        DashboardSummary with all key metrics, or None if import not found
+        DashboardSummary without baseline comparison, or None if import not found
     """
-    cache_key = cache_key_for_import("dashboard_summary", import_id)
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
+    # Check import exists and get basic counts
+    cur.execute(
+        """
+        SELECT node_count, edge_count
+        FROM imports
+        WHERE id = %s
+        """,
+        (import_id,),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+
+    total_nodes = row['node_count'] or 0
+    total_edges = row['edge_count'] or 0
+
+    # If counts are missing, compute them
+    if total_nodes == 0:
+        cur.execute(
+            "SELECT COUNT(*) as cnt FROM nodes WHERE import_id = %s",
+            (import_id,)
+        )
+        total_nodes = cur.fetchone()['cnt']
+
+    if total_edges == 0:
+        cur.execute(
+            "SELECT COUNT(*) as cnt FROM edges WHERE import_id = %s",
+            (import_id,)
+        )
+        total_edges = cur.fetchone()['cnt']
+
+    # Get redundancy score (percentage of redundant edges)
+    cur.execute(
+        """
+        SELECT
+            COUNT(*) FILTER (WHERE is_redundant = TRUE) as redundant_count,
+            COUNT(*) as total_count
+        FROM edges
+        WHERE import_id = %s
+        """,
+        (import_id,),
+    )
+    edge_row = cur.fetchone()
+    redundant_count = edge_row['redundant_count'] or 0
+    edge_total = edge_row['total_count'] or 1  # Avoid division by zero
+    redundancy_score = redundant_count / edge_total if edge_total > 0 else 0.0
+
+    # Get runtime vs build-time ratio
+    cur.execute(
+        """
+        SELECT
+            COUNT(*) FILTER (WHERE dependency_type = 'runtime') as runtime_count,
+            COUNT(*) FILTER (WHERE dependency_type = 'build') as build_count,
+            COUNT(*) FILTER (WHERE dependency_type IS NOT NULL) as classified_count
+        FROM edges
+        WHERE import_id = %s
+        """,
+        (import_id,),
+    )
+    dep_row = cur.fetchone()
+    runtime_count = dep_row['runtime_count'] or 0
+    classified_count = dep_row['classified_count'] or 1
+    runtime_ratio = runtime_count / classified_count if classified_count > 0 else 0.0
+
+    # Get depth statistics
+    cur.execute(
+        """
+        SELECT
+            COALESCE(MAX(depth), 0) as max_depth,
+            COALESCE(AVG(depth), 0) as avg_depth,
+            COALESCE(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY depth), 0) as median_depth
+        FROM nodes
+        WHERE import_id = %s AND depth IS NOT NULL
+        """,
+        (import_id,),
+    )
+    depth_row = cur.fetchone()
+    depth_stats = DepthStats(
+        max_depth=int(depth_row['max_depth'] or 0),
+        avg_depth=float(depth_row['avg_depth'] or 0),
+        median_depth=float(depth_row['median_depth'] or 0),
+    )
+
+    return DashboardSummary(
+        import_id=import_id,
+        total_nodes=total_nodes,
+        total_edges=total_edges,
+        redundancy_score=redundancy_score,
+        runtime_ratio=runtime_ratio,
+        depth_stats=depth_stats,
+    )
 
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            # Check import exists and get basic counts
-            cur.execute(
-                """
-                SELECT node_count, edge_count
-                FROM imports
-                WHERE id = %s
-                """,
-                (import_id,)
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-
-            total_nodes = row['node_count'] or 0
-            total_edges = row['edge_count'] or 0
-
-            # If counts are missing, compute them
-            if total_nodes == 0:
-                cur.execute(
-                    "SELECT COUNT(*) as cnt FROM nodes WHERE import_id = %s",
-                    (import_id,)
-                )
-                total_nodes = cur.fetchone()['cnt']
-
-            if total_edges == 0:
-                cur.execute(
-                    "SELECT COUNT(*) as cnt FROM edges WHERE import_id = %s",
-                    (import_id,)
-                )
-                total_edges = cur.fetchone()['cnt']
-
-            # Get redundancy score (percentage of redundant edges)
-            cur.execute(
-                """
-                SELECT
-                    COUNT(*) FILTER (WHERE is_redundant = TRUE) as redundant_count,
-                    COUNT(*) as total_count
-                FROM edges
-                WHERE import_id = %s
-                """,
-                (import_id,)
-            )
-            edge_row = cur.fetchone()
-            redundant_count = edge_row['redundant_count'] or 0
-            edge_total = edge_row['total_count'] or 1  # Avoid division by zero
-            redundancy_score = redundant_count / edge_total if edge_total > 0 else 0.0
-
-            # Get runtime vs build-time ratio
-            cur.execute(
-                """
-                SELECT
-                    COUNT(*) FILTER (WHERE dependency_type = 'runtime') as runtime_count,
-                    COUNT(*) FILTER (WHERE dependency_type = 'build') as build_count,
-                    COUNT(*) FILTER (WHERE dependency_type IS NOT NULL) as classified_count
-                FROM edges
-                WHERE import_id = %s
-                """,
-                (import_id,)
-            )
-            dep_row = cur.fetchone()
-            runtime_count = dep_row['runtime_count'] or 0
-            classified_count = dep_row['classified_count'] or 1
-            runtime_ratio = runtime_count / classified_count if classified_count > 0 else 0.0
-
-            # Get depth statistics
-            cur.execute(
-                """
-                SELECT
-                    COALESCE(MAX(depth), 0) as max_depth,
-                    COALESCE(AVG(depth), 0) as avg_depth,
-                    COALESCE(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY depth), 0) as median_depth
-                FROM nodes
-                WHERE import_id = %s AND depth IS NOT NULL
-                """,
-                (import_id,)
-            )
-            depth_row = cur.fetchone()
-            depth_stats = DepthStats(
-                max_depth=int(depth_row['max_depth'] or 0),
-                avg_depth=float(depth_row['avg_depth'] or 0),
-                median_depth=float(depth_row['median_depth'] or 0),
-            )
 
-    # Get baseline comparison if available
-    baseline_comparison = None
+def _attach_baseline_comparison(summary: DashboardSummary) -> None:
+    """Fill in the summary's baseline comparison if a baseline exists.
+
+    Args:
+        summary: The summary to update in place
+    """
     try:
         from vizzy.services import baseline as baseline_service
-        comparison = baseline_service.get_comparison_for_dashboard(import_id)
+        comparison = baseline_service.get_comparison_for_dashboard(summary.import_id)
         if comparison:
-            baseline_comparison = BaselineComparison(
+            summary.baseline_comparison = BaselineComparison(
                 baseline_name=comparison.baseline_name,
                 node_difference=comparison.node_difference,
                 percentage=comparison.percentage_difference,
@@ -183,16 +193,124 @@ def get_dashboard_summary(import_id: int) -> DashboardSummary | None:
         # Baseline service not available or no baselines exist
         pass
 
-    summary = DashboardSummary(
-        import_id=import_id,
-        total_nodes=total_nodes,
-        total_edges=total_edges,
-        redundancy_score=redundancy_score,
-        runtime_ratio=runtime_ratio,
-        depth_stats=depth_stats,
-        baseline_comparison=baseline_comparison,
+
+def _query_top_contributors(
+    cur,
+    import_id: int,
+    limit: int,
+    top_level_only: bool,
+) -> list[TopContributor]:
+    """Run the top contributors query on an open cursor.
+
+    Args:
+        cur: Cursor on an open connection
+        import_id: The import to analyze
+        limit: Maximum number of contributors to return
+        top_level_only: If True, only return top-level packages
+
+    Returns:
+        List of TopContributor objects ordered by closure_size descending
+    """
+    if top_level_only:
+        cur.execute(
+            """
+            SELECT id, label, closure_size, package_type, unique_contribution
+            FROM nodes
+            WHERE import_id = %s AND is_top_level = TRUE
+            ORDER BY COALESCE(closure_size, 0) DESC NULLS LAST
+            LIMIT %s
+            """,
+            (import_id, limit),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT id, label, closure_size, package_type, unique_contribution
+            FROM nodes
+            WHERE import_id = %s
+            ORDER BY COALESCE(closure_size, 0) DESC NULLS LAST
+            LIMIT %s
+            """,
+            (import_id, limit),
+        )
+
+    return [
+        TopContributor(
+            node_id=row['id'],
+            label=row['label'],
+            closure_size=row['closure_size'] or 0,
+            package_type=row['package_type'],
+            unique_contribution=row['unique_contribution'],
+        )
+        for row in cur.fetchall()
+    ]
+
+
+def _query_type_distribution(cur, import_id: int) -> list[TypeDistributionEntry]:
+    """Run the package type distribution queries on an open cursor.
+
+    Args:
+        cur: Cursor on an open connection
+        import_id: The import to analyze
+
+    Returns:
+        List of TypeDistributionEntry objects ordered by count descending
+    """
+    # Get total node count for percentage calculation
+    cur.execute(
+        "SELECT COUNT(*) as total FROM nodes WHERE import_id = %s",
+        (import_id,),
+    )
+    total_nodes = cur.fetchone()['total'] or 1
+
+    # Get distribution by package type
+    cur.execute(
+        """
+        SELECT
+            COALESCE(package_type, 'unknown') as package_type,
+            COUNT(*) as count,
+            COALESCE(SUM(closure_size), 0) as total_closure_size
+        FROM nodes
+        WHERE import_id = %s
+        GROUP BY package_type
+        ORDER BY count DESC
+        """,
+        (import_id,),
     )
 
+    return [
+        TypeDistributionEntry(
+            package_type=row['package_type'] or 'unknown',
+            count=row['count'],
+            percentage=round((row['count'] / total_nodes) * 100, 1),
+            total_closure_size=row['total_closure_size'] or 0,
+        )
+        for row in cur.fetchall()
+    ]
+
+
+def get_dashboard_summary(import_id: int) -> DashboardSummary | None:
+    """Get complete dashboard summary metrics for an import.
+
+    Args:
+        import_id: The import to get metrics for
+
+    Returns:
+        DashboardSummary with all key metrics, or None if import not found
+    """
+    cache_key = cache_key_for_import("dashboard_summary", import_id)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            summary = _query_dashboard_summary(cur, import_id)
+    if summary is None:
+        return None
+
+    _attach_baseline_comparison(summary)
+
     # Cache for 5 minutes
     cache.set(cache_key, summary, ttl=300)
     return summary
@@ -222,39 +340,7 @@ def get_top_contributors(
 
     with get_db() as conn:
         with conn.cursor() as cur:
-            if top_level_only:
-                cur.execute(
-                    """
-                    SELECT id, label, closure_size, package_type, unique_contribution
-                    FROM nodes
-                    WHERE import_id = %s AND is_top_level = TRUE
-                    ORDER BY COALESCE(closure_size, 0) DESC NULLS LAST
-                    LIMIT %s
-                    """,
-                    (import_id, limit)
-                )
-            else:
-                cur.execute(
-                    """
-                    SELECT id, label, closure_size, package_type, unique_contribution
-                    FROM nodes
-                    WHERE import_id = %s
-                    ORDER BY COALESCE(closure_size, 0) DESC NULLS LAST
-                    LIMIT %s
-                    """,
-                    (import_id, limit)
-                )
-
-            result = [
-                TopContributor(
-                    node_id=row['id'],
-                    label=row['label'],
-                    closure_size=row['closure_size'] or 0,
-                    package_type=row['package_type'],
-                    unique_contribution=row['unique_contribution'],
-                )
-                for row in cur.fetchall()
-            ]
+            result = _query_top_contributors(cur, import_id, limit, top_level_only)
 
     # Cache for 5 minutes
     cache.set(cache_key, result, ttl=300)
@@ -279,43 +365,64 @@ def get_type_distribution(import_id: int) -> list[TypeDistributionEntry]:
 
     with get_db() as conn:
         with conn.cursor() as cur:
-            # Get total node count for percentage calculation
-            cur.execute(
-                "SELECT COUNT(*) as total FROM nodes WHERE import_id = %s",
-                (import_id,)
-            )
-            total_nodes = cur.fetchone()['total'] or 1
-
-            # Get distribution by package type
-            cur.execute(
-                """
-                SELECT
-                    COALESCE(package_type, 'unknown') as package_type,
-                    COUNT(*) as count,
-                    COALESCE(SUM(closure_size), 0) as total_closure_size
-                FROM nodes
-                WHERE import_id = %s
-                GROUP BY package_type
-                ORDER BY count DESC
-                """,
-                (import_id,)
-            )
-
-            result = [
-                TypeDistributionEntry(
-                    package_type=row['package_type'] or 'unknown',
-                    count=row['count'],
-                    percentage=round((row['count'] / total_nodes) * 100, 1),
-                    total_closure_size=row['total_closure_size'] or 0,
-                )
-                for row in cur.fetchall()
-            ]
+            result = _query_type_distribution(cur, import_id)
 
     # Cache for 5 minutes
     cache.set(cache_key, result, ttl=300)
     return result
 
 
+def get_dashboard_bundle(
+    import_id: int,
+    limit: int = 10,
+    top_level_only: bool = True,
+) -> tuple[DashboardSummary | None, list[TopContributor], list[TypeDistributionEntry]]:
+    """Get the summary, top contributors and type distribution together.
+
+    Whatever is not already cached is fetched over a single connection
+    and stored under the same cache keys as the individual getters, so
+    the dashboard's partial endpoints and get_health_indicators reuse it.
+
+    Args:
+        import_id: The import to analyze
+        limit: Maximum number of contributors to return
+        top_level_only: If True, only return top-level contributors
+
+    Returns:
+        Tuple of (summary, contributors, distribution); summary is None and
+        the lists are empty if the import does not exist
+    """
+    summary_key = cache_key_for_import("dashboard_summary", import_id)
+    contributors_key = cache_key_for_import("top_contributors", import_id, limit, top_level_only)
+    distribution_key = cache_key_for_import("type_distribution", import_id)
+
+    summary = cache.get(summary_key)
+    contributors = cache.get(contributors_key)
+    distribution = cache.get(distribution_key)
+    if summary is not None and contributors is not None and distribution is not None:
+        return summary, contributors, distribution
+
+    fetched_summary = summary is None
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            if summary is None:
+                summary = _query_dashboard_summary(cur, import_id)
+                if summary is None:
+                    return None, [], []
+            if contributors is None:
+                contributors = _query_top_contributors(cur, import_id, limit, top_level_only)
+                cache.set(contributors_key, contributors, ttl=300)
+            if distribution is None:
+                distribution = _query_type_distribution(cur, import_id)
+                cache.set(distribution_key, distribution, ttl=300)
+
+    if fetched_summary:
+        _attach_baseline_comparison(summary)
+        cache.set(summary_key, summary, ttl=300)
+
+    return summary, contributors, distribution
+
+
 def get_health_indicators(import_id: int) -> dict:
     """Get health indicators with status assessments.
 
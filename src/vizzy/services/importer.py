@@ -520,6 +520,15 @@ def reclassify_edges(import_id: int) -> int:
             return len(updates)
 
 
+# Module type by the (first component, separator) of a top_level_source:
+# 'systemPackages' must be the whole source, programs/services need a dotted path
+_MODULE_TYPES = {
+    ('systemPackages', ''): 'systemPackages',
+    ('programs', '.'): 'programs',
+    ('services', '.'): 'services',
+}
+
+
 def _classify_module_type(source: str) -> str:
     """Classify a top_level_source into a module type.
 
@@ -529,14 +538,8 @@ def _classify_module_type(source: str) -> str:
     Returns:
         Module type: 'systemPackages', 'programs', 'services', or 'other'
     """
-    if source == 'systemPackages':
-        return 'systemPackages'
-    elif source.startswith('programs.'):
-        return 'programs'
-    elif source.startswith('services.'):
-        return 'services'
-    else:
-        return 'other'
+    head, sep, _ = source.partition('.')
+    return _MODULE_TYPES.get((head, sep), 'other')
 
 
 def mark_top_level_nodes(import_id: int, host: str | None = None) -> int:
@@ -581,27 +584,29 @@ def mark_top_level_nodes(import_id: int, host: str | None = None) -> int:
     if not top_level:
         return 0
 
+    # One parameter row per package, with its module type classified for
+    # easier querying
+    updates = [
+        (source, _classify_module_type(source), import_id, pkg_name, pkg_name)
+        for pkg_name, source in top_level.items()
+    ]
+
     with get_db() as conn:
         with conn.cursor() as cur:
-            marked = 0
-
-            for pkg_name, source in top_level.items():
-                # Classify the module type for easier querying
-                module_type = _classify_module_type(source)
-
-                # Try exact match first, then prefix match
-                # This handles versioned package names (e.g., "firefox-120.0")
-                cur.execute("""
-                    UPDATE nodes
-                    SET is_top_level = TRUE,
-                        top_level_source = %s,
-                        module_type = %s
-                    WHERE import_id = %s
-                      AND (label = %s OR label LIKE %s || '-%%')
-                      AND is_top_level = FALSE
-                    RETURNING id
-                """, (source, module_type, import_id, pkg_name, pkg_name))
-                marked += cur.rowcount
+            # Try exact match first, then prefix match
+            # This handles versioned package names (e.g., "firefox-120.0").
+            # executemany pipelines the statements in order, so a node claimed by
+            # an earlier package keeps that package's source
+            cur.executemany("""
+                UPDATE nodes
+                SET is_top_level = TRUE,
+                    top_level_source = %s,
+                    module_type = %s
+                WHERE import_id = %s
+                  AND (label = %s OR label LIKE %s || '-%%')
+                  AND is_top_level = FALSE
+            """, updates)
+            marked = cur.rowcount
 
             conn.commit()
             return marked
@@ -86,7 +86,7 @@ class StalenessReport:
         return self.stale_count > 0 or self.never_computed_count > 0
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RecomputationResult:
     """Result of an incremental recomputation operation."""
     import_id: int
@@ -445,7 +445,7 @@ def compute_removal_impact(
         elif len(affected_packages) > 1:
             removal_warning = f"Required by {len(affected_packages)} packages"
 
-    return RemovalImpact(
+    return RemovalImpact.model_construct(
         target=target,
         essentiality=essentiality,
         affected_packages=affected_packages,
@@ -591,7 +591,7 @@ def build_essentiality_analysis(
     else:
         top_dependent_summary = f"{runtime_dependents} packages"
 
-    return EssentialityAnalysis(
+    return EssentialityAnalysis.model_construct(
         target=target,
         status=status,
         removal_impact=removal_impact,
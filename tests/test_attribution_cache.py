@@ -275,15 +275,23 @@ class TestAttributionCache:
     """
 
     @pytest.fixture
-    def mock_db(self):
-        """Fixture to mock database connection."""
+    def mock_db(self, request):
+        """Fixture to mock database connection.
+
+        Can be parametrized indirectly with a dict of ``fetchone`` /
+        ``fetchall`` result sequences; each sequence is consumed one
+        call at a time via ``side_effect``.
+        """
+        results = getattr(request, "param", {})
         with patch('vizzy.services.attribution_cache.get_db') as mock:
             conn = MagicMock()
             cur = MagicMock()
-            conn.__enter__ = MagicMock(return_value=conn)
-            conn.__exit__ = MagicMock(return_value=None)
-            conn.cursor.return_value.__enter__ = MagicMock(return_value=cur)
-            conn.cursor.return_value.__exit__ = MagicMock(return_value=None)
+            conn.__enter__.return_value = conn
+            conn.cursor.return_value.__enter__.return_value = cur
+            if "fetchone" in results:
+                cur.fetchone.side_effect = iter(results["fetchone"])
+            if "fetchall" in results:
+                cur.fetchall.side_effect = iter(results["fetchall"])
             mock.return_value = conn
             yield mock, conn, cur
 
@@ -365,6 +373,29 @@ class TestAttributionCache:
         # Clean up
         cache.delete(cache_key)
 
+    @pytest.mark.parametrize(
+        "mock_db",
+        [
+            {"fetchone": [None]},
+            {"fetchone": [{
+                "result": {},
+                "computed_at": datetime(2000, 1, 1),
+            }]},
+        ],
+        ids=["no_row", "expired_row"],
+        indirect=True,
+    )
+    def test_get_cached_attribution_database_miss(self, mock_db, sample_query):
+        """Test that a missing or expired database row is a cache miss."""
+        from vizzy.services.attribution_cache import get_cached_attribution
+
+        mock, conn, cur = mock_db
+
+        result = get_cached_attribution(sample_query.target_node_id, sample_query)
+
+        assert result is None
+        cur.fetchone.assert_called_once()
+
     def test_invalidate_attribution_cache(self, mock_db):
         """Test cache invalidation clears both tiers."""
         from vizzy.services.attribution_cache import invalidate_attribution_cache
@@ -1,9 +1,13 @@
 """Tests for baseline comparison presets (Phase 8F-004)"""
 
+import dataclasses
+
 import pytest
 from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock
+from types import MappingProxyType
+from unittest.mock import Mock
 
+from vizzy.services import baseline as _baseline_mod
 from vizzy.services.baseline import (
     BaselinePreset,
     get_previous_import,
@@ -13,474 +17,431 @@ from vizzy.services.baseline import (
     get_baseline_by_source_import,
     compare_to_previous_import,
     Baseline,
-    BaselineCreateResult,
     BaselineComparison,
+    BaselineCreateResult,
 )
 
 
+_NOW = datetime(2024, 6, 1, 12, 0, 0)
+_YESTERDAY = _NOW - timedelta(days=1)
+
+
+def _make_baseline(**overrides) -> Baseline:
+    """Build a Baseline with frozen defaults for the optional fields"""
+    fields = dict(
+        description=None,
+        source_import_id=None,
+        closure_by_type=MappingProxyType({}),
+        top_level_count=None,
+        runtime_edge_count=None,
+        build_edge_count=None,
+        max_depth=None,
+        avg_depth=None,
+        top_contributors=(),
+        created_at=_NOW,
+        updated_at=_NOW,
+        is_system_baseline=False,
+        tags=(),
+    )
+    fields.update(overrides)
+    return Baseline(**fields)
+
+
+class _FakeCursor:
+    """Cursor double exposing only the query methods the service uses"""
+
+    def __init__(self):
+        self.execute = Mock()
+        self.fetchone = Mock()
+        self.fetchall = Mock()
+
+    def queue_results(self, fetchone=None, fetchall=None):
+        """Queue the rows returned by successive fetchone/fetchall calls"""
+        if fetchone is not None:
+            self.fetchone.side_effect = fetchone
+        if fetchall is not None:
+            self.fetchall.side_effect = fetchall
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeConn:
+    """Connection double whose cursor() returns a single _FakeCursor"""
+
+    def __init__(self, cursor: _FakeCursor):
+        self.cursor = Mock(return_value=cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _patch_baseline(monkeypatch, **return_values) -> dict[str, Mock]:
+    """Replace several baseline service functions with Mocks in one call"""
+    mocks = {}
+    for name, value in return_values.items():
+        mocks[name] = Mock(return_value=value)
+        monkeypatch.setattr(_baseline_mod, name, mocks[name])
+    return mocks
+
+
+@pytest.fixture
+def mock_db_cursor(monkeypatch):
+    """Patch get_db and yield a pre-wired (mock_db, mock_conn, mock_cursor)"""
+    mock_cursor = _FakeCursor()
+    mock_conn = _FakeConn(mock_cursor)
+    mock_db = Mock(return_value=mock_conn)
+    monkeypatch.setattr(_baseline_mod, 'get_db', mock_db)
+    return mock_db, mock_conn, mock_cursor
+
+
 class TestGetPreviousImport:
     """Test the get_previous_import function"""
 
-    def test_no_current_import(self):
+    def test_no_current_import(self, mock_db_cursor):
         """Should return None if current import doesn't exist"""
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = None
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_cursor.fetchone.return_value = None
 
-            result = get_previous_import(999)
-            assert result is None
+        result = get_previous_import(999)
+        assert result is None
 
-    def test_no_previous_import(self):
+    def test_no_previous_import(self, mock_db_cursor):
         """Should return None if no previous import exists"""
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-            # First call returns current import, second returns None (no previous)
-            mock_cursor.fetchone.side_effect = [
-                {'name': 'myhost', 'imported_at': datetime.now()},
-                None,
-            ]
+        _, _, mock_cursor = mock_db_cursor
+
+        # First call returns current import, second returns None (no previous)
+        mock_cursor.fetchone.side_effect = [
+            {'name': 'myhost', 'imported_at': _NOW},
+            None,
+        ]
 
-            result = get_previous_import(1)
-            assert result is None
+        result = get_previous_import(1)
+        assert result is None
 
-    def test_previous_import_found(self):
+    def test_previous_import_found(self, mock_db_cursor):
         """Should return previous import when it exists"""
-        now = datetime.now()
-        yesterday = now - timedelta(days=1)
-
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-            mock_cursor.fetchone.side_effect = [
-                {'name': 'myhost', 'imported_at': now},
-                {
-                    'id': 1,
-                    'name': 'myhost',
-                    'config_path': '/etc/nixos',
-                    'drv_path': '/nix/store/abc',
-                    'imported_at': yesterday,
-                    'node_count': 100,
-                    'edge_count': 200,
-                },
-            ]
-
-            result = get_previous_import(2)
-            assert result is not None
-            assert result['id'] == 1
-            assert result['name'] == 'myhost'
-            assert result['imported_at'] == yesterday
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_cursor.fetchone.side_effect = [
+            {'name': 'myhost', 'imported_at': _NOW},
+            {
+                'id': 1,
+                'name': 'myhost',
+                'config_path': '/etc/nixos',
+                'drv_path': '/nix/store/abc',
+                'imported_at': _YESTERDAY,
+                'node_count': 100,
+                'edge_count': 200,
+            },
+        ]
+
+        result = get_previous_import(2)
+        assert result is not None
+        assert result['id'] == 1
+        assert result['name'] == 'myhost'
+        assert result['imported_at'] == _YESTERDAY
+
+
+_PREVIOUS_IMPORT = {
+    'id': 1,
+    'name': 'myhost',
+    'imported_at': _YESTERDAY,
+    'node_count': 100,
+    'edge_count': 200,
+}
+
+_SYSTEM_BASELINE = _make_baseline(
+    id=10,
+    name='Minimal NixOS',
+    description='Minimal baseline',
+    node_count=1000,
+    edge_count=2000,
+    is_system_baseline=True,
+    tags=('system',),
+)
+
+_USER_BASELINE = _make_baseline(
+    id=20,
+    name='My Saved Config',
+    description='User baseline',
+    source_import_id=5,
+    node_count=5000,
+    edge_count=10000,
+)
 
 
 class TestGetAvailablePresets:
     """Test the get_available_presets function"""
 
-    def test_presets_include_previous_import(self):
-        """Should include previous import as first preset if available"""
-        now = datetime.now()
-        yesterday = now - timedelta(days=1)
-
-        with patch('vizzy.services.baseline.get_previous_import') as mock_prev:
-            with patch('vizzy.services.baseline.list_baselines') as mock_list:
-                mock_prev.return_value = {
-                    'id': 1,
-                    'name': 'myhost',
-                    'imported_at': yesterday,
-                    'node_count': 100,
-                    'edge_count': 200,
-                }
-                mock_list.return_value = []
-
-                presets = get_available_presets(2)
-
-                assert len(presets) == 1
-                assert presets[0].preset_type == 'previous_import'
-                assert presets[0].name == 'Previous Import'
-                assert presets[0].target_id == 1
-
-    def test_presets_include_system_baselines(self):
-        """Should include system baselines after previous import"""
-        with patch('vizzy.services.baseline.get_previous_import') as mock_prev:
-            with patch('vizzy.services.baseline.list_baselines') as mock_list:
-                mock_prev.return_value = None
-                mock_list.return_value = [
-                    Baseline(
-                        id=1,
-                        name='Minimal NixOS',
-                        description='Minimal baseline',
-                        source_import_id=None,
-                        node_count=1000,
-                        edge_count=2000,
-                        closure_by_type={},
-                        top_level_count=None,
-                        runtime_edge_count=None,
-                        build_edge_count=None,
-                        max_depth=None,
-                        avg_depth=None,
-                        top_contributors=[],
-                        created_at=datetime.now(),
-                        updated_at=datetime.now(),
-                        is_system_baseline=True,
-                        tags=['system'],
-                    ),
-                ]
-
-                presets = get_available_presets(2)
-
-                assert len(presets) == 1
-                assert presets[0].preset_type == 'system_baseline'
-                assert presets[0].name == 'Minimal NixOS'
-
-    def test_presets_include_user_baselines(self):
-        """Should include user baselines after system baselines"""
-        with patch('vizzy.services.baseline.get_previous_import') as mock_prev:
-            with patch('vizzy.services.baseline.list_baselines') as mock_list:
-                mock_prev.return_value = None
-                mock_list.return_value = [
-                    Baseline(
-                        id=1,
-                        name='My Saved Config',
-                        description='User baseline',
-                        source_import_id=10,
-                        node_count=5000,
-                        edge_count=10000,
-                        closure_by_type={},
-                        top_level_count=None,
-                        runtime_edge_count=None,
-                        build_edge_count=None,
-                        max_depth=None,
-                        avg_depth=None,
-                        top_contributors=[],
-                        created_at=datetime.now(),
-                        updated_at=datetime.now(),
-                        is_system_baseline=False,
-                        tags=[],
-                    ),
-                ]
-
-                presets = get_available_presets(2)
-
-                assert len(presets) == 1
-                assert presets[0].preset_type == 'baseline'
-                assert presets[0].name == 'My Saved Config'
-
-    def test_presets_order(self):
+    @pytest.mark.parametrize(
+        'previous, baselines, expected',
+        [
+            (
+                _PREVIOUS_IMPORT,
+                [],
+                [('previous_import', 'Previous Import', 1)],
+            ),
+            (
+                None,
+                [_SYSTEM_BASELINE],
+                [('system_baseline', 'Minimal NixOS', 10)],
+            ),
+            (
+                None,
+                [_USER_BASELINE],
+                [('baseline', 'My Saved Config', 20)],
+            ),
+            (
+                _PREVIOUS_IMPORT,
+                [_SYSTEM_BASELINE, _USER_BASELINE],
+                [
+                    ('previous_import', 'Previous Import', 1),
+                    ('system_baseline', 'Minimal NixOS', 10),
+                    ('baseline', 'My Saved Config', 20),
+                ],
+            ),
+        ],
+        ids=['previous_import', 'system_baseline', 'user_baseline', 'order'],
+    )
+    def test_preset_ordering(self, monkeypatch, previous, baselines, expected):
         """Presets should be ordered: previous, system baselines, user baselines"""
-        now = datetime.now()
-        yesterday = now - timedelta(days=1)
-
-        with patch('vizzy.services.baseline.get_previous_import') as mock_prev:
-            with patch('vizzy.services.baseline.list_baselines') as mock_list:
-                mock_prev.return_value = {
-                    'id': 1,
-                    'name': 'myhost',
-                    'imported_at': yesterday,
-                    'node_count': 100,
-                    'edge_count': 200,
-                }
-                mock_list.return_value = [
-                    Baseline(
-                        id=10,
-                        name='Minimal',
-                        description=None,
-                        source_import_id=None,
-                        node_count=1000,
-                        edge_count=2000,
-                        closure_by_type={},
-                        top_level_count=None,
-                        runtime_edge_count=None,
-                        build_edge_count=None,
-                        max_depth=None,
-                        avg_depth=None,
-                        top_contributors=[],
-                        created_at=datetime.now(),
-                        updated_at=datetime.now(),
-                        is_system_baseline=True,
-                        tags=[],
-                    ),
-                    Baseline(
-                        id=20,
-                        name='User Baseline',
-                        description=None,
-                        source_import_id=5,
-                        node_count=5000,
-                        edge_count=10000,
-                        closure_by_type={},
-                        top_level_count=None,
-                        runtime_edge_count=None,
-                        build_edge_count=None,
-                        max_depth=None,
-                        avg_depth=None,
-                        top_contributors=[],
-                        created_at=datetime.now(),
-                        updated_at=datetime.now(),
-                        is_system_baseline=False,
-                        tags=[],
-                    ),
-                ]
-
-                presets = get_available_presets(2)
-
-                assert len(presets) == 3
-                assert presets[0].preset_type == 'previous_import'
-                assert presets[1].preset_type == 'system_baseline'
-                assert presets[2].preset_type == 'baseline'
+        _patch_baseline(
+            monkeypatch,
+            get_previous_import=previous,
+            list_baselines=baselines,
+        )
+
+        presets = get_available_presets(2)
+
+        assert [(p.preset_type, p.name, p.target_id) for p in presets] == expected
 
 
 class TestGetImportsForHost:
     """Test the get_imports_for_host function"""
 
-    def test_returns_imports_for_host(self):
+    def test_returns_imports_for_host(self, mock_db_cursor):
         """Should return all imports for a host, newest first"""
-        now = datetime.now()
-
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-            mock_cursor.fetchall.return_value = [
-                {
-                    'id': 3,
-                    'name': 'myhost',
-                    'config_path': '/etc/nixos',
-                    'drv_path': '/nix/store/c',
-                    'imported_at': now,
-                    'node_count': 3000,
-                    'edge_count': 6000,
-                },
-                {
-                    'id': 2,
-                    'name': 'myhost',
-                    'config_path': '/etc/nixos',
-                    'drv_path': '/nix/store/b',
-                    'imported_at': now - timedelta(days=1),
-                    'node_count': 2900,
-                    'edge_count': 5800,
-                },
-            ]
-
-            result = get_imports_for_host('myhost')
-
-            assert len(result) == 2
-            assert result[0]['id'] == 3  # Newest first
-            assert result[1]['id'] == 2
-
-    def test_respects_limit(self):
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_cursor.fetchall.return_value = [
+            {
+                'id': 3,
+                'name': 'myhost',
+                'config_path': '/etc/nixos',
+                'drv_path': '/nix/store/c',
+                'imported_at': _NOW,
+                'node_count': 3000,
+                'edge_count': 6000,
+            },
+            {
+                'id': 2,
+                'name': 'myhost',
+                'config_path': '/etc/nixos',
+                'drv_path': '/nix/store/b',
+                'imported_at': _YESTERDAY,
+                'node_count': 2900,
+                'edge_count': 5800,
+            },
+        ]
+
+        result = get_imports_for_host('myhost')
+
+        assert len(result) == 2
+        assert result[0]['id'] == 3  # Newest first
+        assert result[1]['id'] == 2
+
+    def test_respects_limit(self, mock_db_cursor):
         """Should respect the limit parameter"""
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_cursor.fetchall.return_value = []
+
+        get_imports_for_host('myhost', limit=5)
 
-            mock_cursor.fetchall.return_value = []
+        # Check that limit was passed to query as a parameter
+        assert mock_cursor.execute.call_args.args[1] == ('myhost', 5)
 
-            get_imports_for_host('myhost', limit=5)
 
-            # Check that limit was passed to query as a parameter
-            call_args = mock_cursor.execute.call_args
-            # The second element of the args tuple contains the parameters
-            assert call_args[0][1] == ('myhost', 5)
+_AUTO_NAME_IMPORT = {
+    'name': 'myhost',
+    'imported_at': datetime(2024, 1, 15, 12, 0, 0),
+}
+
+_CREATED_RESULT = BaselineCreateResult(
+    baseline_id=1,
+    name='myhost - 2024-01-15',
+    node_count=1000,
+    edge_count=2000,
+    success=True,
+    message='Created',
+)
+
+_CREATED_RESULT_SUFFIX = dataclasses.replace(
+    _CREATED_RESULT, name='myhost - 2024-01-15 (stable)'
+)
 
 
 class TestCreateBaselineWithAutoName:
     """Test the create_baseline_with_auto_name function"""
 
-    def test_auto_generates_name(self):
+    def test_auto_generates_name(self, mock_db_cursor, monkeypatch):
         """Should generate name from import name and date"""
-        now = datetime(2024, 1, 15, 12, 0, 0)
-
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            with patch('vizzy.services.baseline.create_baseline_from_import') as mock_create:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchone.return_value = {
-                    'name': 'myhost',
-                    'imported_at': now,
-                }
-                mock_create.return_value = BaselineCreateResult(
-                    baseline_id=1,
-                    name='myhost - 2024-01-15',
-                    node_count=1000,
-                    edge_count=2000,
-                    success=True,
-                    message='Created',
-                )
-
-                result = create_baseline_with_auto_name(1)
-
-                # Verify the generated name format
-                mock_create.assert_called_once()
-                call_kwargs = mock_create.call_args[1]
-                assert call_kwargs['name'] == 'myhost - 2024-01-15'
-                assert 'myhost' in call_kwargs['description']
-
-    def test_includes_suffix(self):
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_create = _patch_baseline(
+            monkeypatch, create_baseline_from_import=_CREATED_RESULT
+        )['create_baseline_from_import']
+
+        mock_cursor.fetchone.return_value = _AUTO_NAME_IMPORT
+
+        result = create_baseline_with_auto_name(1)
+
+        # Verify the generated name format
+        mock_create.assert_called_once()
+        call_kwargs = mock_create.call_args.kwargs
+        assert call_kwargs['name'] == 'myhost - 2024-01-15'
+        assert 'myhost' in call_kwargs['description']
+
+    def test_includes_suffix(self, mock_db_cursor, monkeypatch):
         """Should include suffix in name when provided"""
-        now = datetime(2024, 1, 15, 12, 0, 0)
-
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            with patch('vizzy.services.baseline.create_baseline_from_import') as mock_create:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchone.return_value = {
-                    'name': 'myhost',
-                    'imported_at': now,
-                }
-                mock_create.return_value = BaselineCreateResult(
-                    baseline_id=1,
-                    name='myhost - 2024-01-15 (stable)',
-                    node_count=1000,
-                    edge_count=2000,
-                    success=True,
-                    message='Created',
-                )
-
-                result = create_baseline_with_auto_name(1, suffix='stable')
-
-                call_kwargs = mock_create.call_args[1]
-                assert '(stable)' in call_kwargs['name']
-
-    def test_import_not_found(self):
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_create = _patch_baseline(
+            monkeypatch, create_baseline_from_import=_CREATED_RESULT_SUFFIX
+        )['create_baseline_from_import']
+
+        mock_cursor.fetchone.return_value = _AUTO_NAME_IMPORT
+
+        result = create_baseline_with_auto_name(1, suffix='stable')
+
+        call_kwargs = mock_create.call_args.kwargs
+        assert '(stable)' in call_kwargs['name']
+
+    def test_import_not_found(self, mock_db_cursor):
         """Should return error result if import doesn't exist"""
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        _, _, mock_cursor = mock_db_cursor
 
-            mock_cursor.fetchone.return_value = None
+        mock_cursor.fetchone.return_value = None
 
-            result = create_baseline_with_auto_name(999)
+        result = create_baseline_with_auto_name(999)
 
-            assert result.success is False
-            assert '999' in result.message
+        assert result.success is False
+        assert '999' in result.message
 
 
 class TestGetBaselineBySourceImport:
     """Test the get_baseline_by_source_import function"""
 
-    def test_returns_baseline_if_exists(self):
+    def test_returns_baseline_if_exists(self, mock_db_cursor, monkeypatch):
         """Should return baseline when one exists for the source import"""
-        now = datetime.now()
-
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            with patch('vizzy.services.baseline._row_to_baseline') as mock_convert:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchone.return_value = {
-                    'id': 1,
-                    'name': 'Test Baseline',
-                }
-                mock_baseline = Baseline(
-                    id=1,
-                    name='Test Baseline',
-                    description=None,
-                    source_import_id=5,
-                    node_count=1000,
-                    edge_count=2000,
-                    closure_by_type={},
-                    top_level_count=None,
-                    runtime_edge_count=None,
-                    build_edge_count=None,
-                    max_depth=None,
-                    avg_depth=None,
-                    top_contributors=[],
-                    created_at=now,
-                    updated_at=now,
-                    is_system_baseline=False,
-                    tags=[],
-                )
-                mock_convert.return_value = mock_baseline
-
-                result = get_baseline_by_source_import(5)
-
-                assert result is not None
-                assert result.id == 1
-
-    def test_returns_none_if_not_exists(self):
+        _, _, mock_cursor = mock_db_cursor
+
+        mock_baseline = _make_baseline(
+            id=1,
+            name='Test Baseline',
+            source_import_id=5,
+            node_count=1000,
+            edge_count=2000,
+        )
+        _patch_baseline(monkeypatch, _row_to_baseline=mock_baseline)
+
+        mock_cursor.fetchone.return_value = {
+            'id': 1,
+            'name': 'Test Baseline',
+        }
+
+        result = get_baseline_by_source_import(5)
+
+        assert result is not None
+        assert result.id == 1
+
+    def test_returns_none_if_not_exists(self, mock_db_cursor):
         """Should return None when no baseline exists for source import"""
-        with patch('vizzy.services.baseline.get_db') as mock_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        _, _, mock_cursor = mock_db_cursor
 
-            mock_cursor.fetchone.return_value = None
+        mock_cursor.fetchone.return_value = None
 
-            result = get_baseline_by_source_import(999)
+        result = get_baseline_by_source_import(999)
 
-            assert result is None
+        assert result is None
 
 
 class TestCompareToPreviousImport:
     """Test the compare_to_previous_import function"""
 
-    def test_returns_none_if_no_previous(self):
+    def test_returns_none_if_no_previous(self, monkeypatch):
         """Should return None if no previous import exists"""
-        with patch('vizzy.services.baseline.get_previous_import') as mock_prev:
-            mock_prev.return_value = None
+        _patch_baseline(monkeypatch, get_previous_import=None)
 
-            result = compare_to_previous_import(1)
+        result = compare_to_previous_import(1)
 
-            assert result is None
+        assert result is None
 
-    def test_computes_comparison(self):
+    def test_computes_comparison(self, mock_db_cursor, monkeypatch):
         """Should compute comparison metrics between imports"""
-        yesterday = datetime.now() - timedelta(days=1)
-
-        with patch('vizzy.services.baseline.get_previous_import') as mock_prev:
-            with patch('vizzy.services.baseline.get_db') as mock_db:
-                mock_prev.return_value = {
-                    'id': 1,
-                    'name': 'myhost',
-                    'imported_at': yesterday,
-                    'node_count': 1000,
-                    'edge_count': 2000,
-                }
-
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                # Mock current import query
-                mock_cursor.fetchone.side_effect = [
-                    {'name': 'myhost', 'node_count': 1100, 'edge_count': 2200},
-                ]
-                mock_cursor.fetchall.side_effect = [
-                    [{'package_type': 'library', 'count': 600}, {'package_type': 'app', 'count': 500}],
-                    [{'package_type': 'library', 'count': 550}, {'package_type': 'app', 'count': 450}],
-                ]
-
-                result = compare_to_previous_import(2)
-
-                assert result is not None
-                assert result.import_id == 2
-                assert result.baseline_id == 1
-                assert result.node_difference == 100  # 1100 - 1000
-                assert result.percentage_difference == 10.0  # 10% increase
-                assert result.is_larger is True
+        _, _, mock_cursor = mock_db_cursor
+
+        _patch_baseline(
+            monkeypatch,
+            get_previous_import={
+                'id': 1,
+                'name': 'myhost',
+                'imported_at': _YESTERDAY,
+                'node_count': 1000,
+                'edge_count': 2000,
+            },
+        )
+
+        # Current import query, then current/previous counts by type
+        mock_cursor.queue_results(
+            fetchone=[
+                {'name': 'myhost', 'node_count': 1100, 'edge_count': 2200},
+            ],
+            fetchall=[
+                [{'package_type': 'library', 'count': 600}, {'package_type': 'app', 'count': 500}],
+                [{'package_type': 'library', 'count': 550}, {'package_type': 'app', 'count': 450}],
+            ],
+        )
+
+        result = compare_to_previous_import(2)
+
+        assert result is not None
+        assert result.import_id == 2
+        assert result.baseline_id == 1
+        assert result.node_difference == 100  # 1100 - 1000
+        assert result.percentage_difference == 10.0  # 10% increase
+        assert result.is_larger is True
+
+
+_BASELINE_PRESET = BaselinePreset(
+    id='baseline:1',
+    name='Test Baseline',
+    description='A test baseline',
+    preset_type='baseline',
+    target_id=1,
+    node_count=1000,
+    edge_count=2000,
+    created_at=_NOW,
+)
+
+_PREVIOUS_IMPORT_PRESET = BaselinePreset(
+    id='import:1',
+    name='Previous',
+    description=None,
+    preset_type='previous_import',
+    target_id=1,
+    node_count=None,
+    edge_count=None,
+    created_at=None,
+)
 
 
 class TestBaselinePresetDataclass:
@@ -488,16 +449,7 @@ class TestBaselinePresetDataclass:
 
     def test_preset_creation(self):
         """Should create preset with all required fields"""
-        preset = BaselinePreset(
-            id='baseline:1',
-            name='Test Baseline',
-            description='A test baseline',
-            preset_type='baseline',
-            target_id=1,
-            node_count=1000,
-            edge_count=2000,
-            created_at=datetime.now(),
-        )
+        preset = _BASELINE_PRESET
 
         assert preset.id == 'baseline:1'
         assert preset.name == 'Test Baseline'
@@ -506,16 +458,7 @@ class TestBaselinePresetDataclass:
 
     def test_preset_with_none_values(self):
         """Should handle None values for optional fields"""
-        preset = BaselinePreset(
-            id='import:1',
-            name='Previous',
-            description=None,
-            preset_type='previous_import',
-            target_id=1,
-            node_count=None,
-            edge_count=None,
-            created_at=None,
-        )
+        preset = _PREVIOUS_IMPORT_PRESET
 
         assert preset.description is None
         assert preset.node_count is None
@@ -1,141 +1,190 @@
 """Tests for closure contribution calculation functionality (Phase 8A-003)"""
 
+import re
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, Mock
 from datetime import datetime
+from types import MappingProxyType
 
 from vizzy.models import ClosureContribution, ClosureContributionSummary, ContributionDiff
+from vizzy.services import contribution as contribution_service
+from vizzy.services.contribution import (
+    compute_closure,
+    compute_contributions,
+    get_contribution_by_type,
+    get_contribution_data,
+    get_contribution_summary,
+    identify_removal_candidates,
+)
+
+
+_FIXED_NOW = datetime(2024, 1, 1, 0, 0, 0)
+
+_SORT_TOTAL_RE = re.compile(
+    r'\bORDER\s+BY\s+total_contribution\s+DESC\b', re.IGNORECASE
+)
+
+# Shared results for queries that find nothing
+_EMPTY_ROWS: tuple = ()
+_EMPTY_TOP = MappingProxyType({
+    'total_top_level': 0,
+    'total_unique': 0,
+    'total_shared': 0,
+    'computed_at': None,
+})
+
+# Contribution rows as returned by the nodes query, frozen against mutation
+_ROW_PKG1 = MappingProxyType({
+    'id': 1,
+    'label': 'pkg1',
+    'package_type': 'app',
+    'unique_contribution': 50,
+    'shared_contribution': 50,
+    'total_contribution': 100,
+    'closure_size': 100,
+})
+
+_ROW_REMOVABLE = MappingProxyType({
+    'id': 1,
+    'label': 'removable-pkg',
+    'package_type': 'app',
+    'unique_contribution': 0,
+    'shared_contribution': 50,
+    'total_contribution': 50,
+    'closure_size': 50,
+})
+
+
+class _CMStub:
+    """Minimal context manager that yields a fixed value"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __enter__(self):
+        return self.value
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def contribution_mocks(monkeypatch):
+    """Patch get_db and cache in the contribution service.
+
+    Returns a pre-wired (mock_conn, mock_cursor, mock_cache) triple. The
+    cache misses by default so tests only need to set cursor results.
+    """
+    mock_cursor = Mock(spec=['execute', 'fetchall', 'fetchone'])
+    mock_conn = Mock(spec=['cursor', 'commit'])
+    mock_conn.cursor.return_value = _CMStub(mock_cursor)
+    mock_get_db = Mock(return_value=_CMStub(mock_conn))
+    mock_cache = Mock(spec=['get', 'set', 'invalidate'])
+    mock_cache.get.return_value = None
+    monkeypatch.setattr(contribution_service, 'get_db', mock_get_db)
+    monkeypatch.setattr(contribution_service, 'cache', mock_cache)
+    return mock_conn, mock_cursor, mock_cache
+
+
+def _make_contribution(
+    unique: int, shared: int, node_id: int = 1, label: str = "test-pkg"
+) -> ClosureContribution:
+    """Helper to create a ClosureContribution sized unique + shared"""
+    return ClosureContribution(
+        node_id=node_id,
+        label=label,
+        package_type="app",
+        unique_contribution=unique,
+        shared_contribution=shared,
+        total_contribution=unique + shared,
+        closure_size=unique + shared,
+    )
+
+
+@pytest.fixture(scope="module")
+def shared_contribution():
+    """Return read-only ClosureContributions shared across the module.
+
+    The model tests only read properties, so one instance per
+    (unique, shared) pair is built and reused by every case that needs it.
+    """
+    instances: dict[tuple[int, int], ClosureContribution] = {}
+
+    def get(unique: int, shared: int) -> ClosureContribution:
+        key = (unique, shared)
+        if key not in instances:
+            instances[key] = _make_contribution(unique, shared)
+        return instances[key]
+
+    return get
 
 
 class TestClosureContributionModel:
     """Test the ClosureContribution model"""
 
-    def test_unique_percentage_calculation(self):
-        """Unique percentage should be correctly calculated"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=25,
-            shared_contribution=75,
-            total_contribution=100,
-            closure_size=100,
-        )
-        assert contrib.unique_percentage == 25.0
-
-    def test_unique_percentage_all_unique(self):
-        """When all contributions are unique, percentage should be 100"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=50,
-            shared_contribution=0,
-            total_contribution=50,
-            closure_size=50,
-        )
+    @pytest.mark.parametrize(
+        "unique,shared,expected",
+        [
+            pytest.param(25, 75, 25.0, id="partial"),
+            pytest.param(50, 0, 100.0, id="all_unique"),
+            pytest.param(0, 50, 0.0, id="all_shared"),
+            pytest.param(0, 0, 0.0, id="zero_total"),
+        ],
+    )
+    def test_unique_percentage(self, shared_contribution, unique, shared, expected):
+        """Unique percentage should be unique / total, or 0 when empty"""
+        contrib = shared_contribution(unique, shared)
+        assert contrib.unique_percentage == expected
+
+    @pytest.mark.parametrize(
+        "unique,shared,expected",
+        [
+            pytest.param(0, 50, "safe to remove", id="no_unique"),
+            pytest.param(80, 20, "high impact", id="high"),
+            pytest.param(50, 50, "medium impact", id="medium"),
+            pytest.param(10, 90, "low impact", id="low"),
+        ],
+    )
+    def test_removal_impact(self, shared_contribution, unique, shared, expected):
+        """Removal impact should reflect the unique share of the closure"""
+        contrib = shared_contribution(unique, shared)
+        assert expected in contrib.removal_impact.lower()
+
+    def test_derived_values_follow_field_changes(self):
+        """Derived values should reflect the current fields, not earlier reads"""
+        contrib = _make_contribution(50, 0)
         assert contrib.unique_percentage == 100.0
+        assert "high impact" in contrib.removal_impact.lower()
 
-    def test_unique_percentage_all_shared(self):
-        """When all contributions are shared, percentage should be 0"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=0,
-            shared_contribution=50,
-            total_contribution=50,
-            closure_size=50,
-        )
-        assert contrib.unique_percentage == 0.0
+        contrib.unique_contribution = 0
 
-    def test_unique_percentage_zero_total(self):
-        """When total is zero, percentage should be 0"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=0,
-            shared_contribution=0,
-            total_contribution=0,
-            closure_size=0,
-        )
         assert contrib.unique_percentage == 0.0
-
-    def test_removal_impact_no_unique(self):
-        """Removal impact should indicate safe removal when no unique deps"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=0,
-            shared_contribution=50,
-            total_contribution=50,
-            closure_size=50,
-        )
         assert "safe to remove" in contrib.removal_impact.lower()
+        dumped = contrib.model_dump()
+        assert dumped["unique_percentage"] == 0.0
+        assert "safe to remove" in dumped["removal_impact"].lower()
 
-    def test_removal_impact_high_unique(self):
-        """Removal impact should indicate high impact when mostly unique"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=80,
-            shared_contribution=20,
-            total_contribution=100,
-            closure_size=100,
-        )
-        assert "high impact" in contrib.removal_impact.lower()
+        copied = contrib.model_copy(update={"unique_contribution": 50})
+        assert copied.unique_percentage == 100.0
 
-    def test_removal_impact_medium_unique(self):
-        """Removal impact should indicate medium impact when partially unique"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=50,
-            shared_contribution=50,
-            total_contribution=100,
-            closure_size=100,
-        )
-        assert "medium impact" in contrib.removal_impact.lower()
+    def test_reading_derived_values_does_not_affect_equality(self):
+        """Reading a derived property must not make equal models compare unequal"""
+        left = _make_contribution(30, 70)
+        right = _make_contribution(30, 70)
+        left.removal_impact
 
-    def test_removal_impact_low_unique(self):
-        """Removal impact should indicate low impact when mostly shared"""
-        contrib = ClosureContribution(
-            node_id=1,
-            label="test-pkg",
-            package_type="app",
-            unique_contribution=10,
-            shared_contribution=90,
-            total_contribution=100,
-            closure_size=100,
-        )
-        assert "low impact" in contrib.removal_impact.lower()
+        assert left == right
+        assert left.model_dump() == right.model_dump()
 
 
 class TestClosureContributionSummary:
     """Test the ClosureContributionSummary model"""
 
-    def _make_contribution(
-        self, node_id: int, label: str, unique: int, shared: int
-    ) -> ClosureContribution:
-        """Helper to create a ClosureContribution"""
-        return ClosureContribution(
-            node_id=node_id,
-            label=label,
-            package_type="app",
-            unique_contribution=unique,
-            shared_contribution=shared,
-            total_contribution=unique + shared,
-            closure_size=unique + shared,
-        )
-
     def test_average_unique_contribution(self):
         """Average unique should be correctly calculated"""
-        contrib1 = self._make_contribution(1, "pkg1", 50, 50)
-        contrib2 = self._make_contribution(2, "pkg2", 100, 0)
+        contrib1 = _make_contribution(50, 50, node_id=1, label="pkg1")
+        contrib2 = _make_contribution(100, 0, node_id=2, label="pkg2")
 
         summary = ClosureContributionSummary(
             import_id=1,
@@ -161,48 +210,28 @@ class TestClosureContributionSummary:
 
         assert summary.average_unique_contribution == 0.0
 
-    def test_sharing_ratio_high_sharing(self):
-        """Sharing ratio should be high when most deps are shared"""
-        contrib = self._make_contribution(1, "pkg1", 10, 90)
-
-        summary = ClosureContributionSummary(
-            import_id=1,
-            total_top_level_packages=1,
-            total_unique_contributions=10,
-            total_shared_contributions=90,
-            top_unique_contributors=[contrib],
-            top_total_contributors=[contrib],
-        )
-
-        assert summary.sharing_ratio == 0.9  # 90 / 100
-
-    def test_sharing_ratio_no_sharing(self):
-        """Sharing ratio should be 0 when no shared deps"""
-        contrib = self._make_contribution(1, "pkg1", 100, 0)
-
-        summary = ClosureContributionSummary(
-            import_id=1,
-            total_top_level_packages=1,
-            total_unique_contributions=100,
-            total_shared_contributions=0,
-            top_unique_contributors=[contrib],
-            top_total_contributors=[contrib],
-        )
-
-        assert summary.sharing_ratio == 0.0
+    @pytest.mark.parametrize(
+        "unique,shared,expected",
+        [
+            pytest.param(10, 90, 0.9, id="high_sharing"),
+            pytest.param(100, 0, 0.0, id="no_sharing"),
+            pytest.param(0, 0, 0.0, id="zero_total"),
+        ],
+    )
+    def test_sharing_ratio(self, shared_contribution, unique, shared, expected):
+        """Sharing ratio should be shared / total, or 0 when empty"""
+        contributors = [shared_contribution(unique, shared)] if unique + shared else []
 
-    def test_sharing_ratio_zero_total(self):
-        """Sharing ratio should be 0 when no contributions at all"""
         summary = ClosureContributionSummary(
             import_id=1,
-            total_top_level_packages=0,
-            total_unique_contributions=0,
-            total_shared_contributions=0,
-            top_unique_contributors=[],
-            top_total_contributors=[],
+            total_top_level_packages=len(contributors),
+            total_unique_contributions=unique,
+            total_shared_contributions=shared,
+            top_unique_contributors=contributors,
+            top_total_contributors=contributors,
         )
 
-        assert summary.sharing_ratio == 0.0
+        assert summary.sharing_ratio == expected
 
 
 class TestContributionDiff:
@@ -253,437 +282,279 @@ class TestComputeClosure:
 
     def test_compute_closure_simple(self):
         """Should compute transitive closure correctly"""
-        from vizzy.services.contribution import compute_closure
-
-        with patch('vizzy.services.contribution.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-            # Simulate a simple graph: 1 -> 2 -> 3
-            # Closure of 1 should be {2, 3}
-            mock_cursor.fetchall.return_value = [
-                {'dep_id': 2},
-                {'dep_id': 3},
-            ]
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = _CMStub(mock_cursor)
+
+        # Simulate a simple graph: 1 -> 2 -> 3
+        # Closure of 1 should be {2, 3}
+        mock_cursor.fetchall.return_value = [
+            {'dep_id': 2},
+            {'dep_id': 3},
+        ]
 
-            result = compute_closure(1, mock_conn)
+        result = compute_closure(1, mock_conn)
 
-            assert result == {2, 3}
+        assert result == {2, 3}
 
     def test_compute_closure_empty(self):
         """Should return empty set when no dependencies"""
-        from vizzy.services.contribution import compute_closure
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = _CMStub(mock_cursor)
 
-        with patch('vizzy.services.contribution.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = _EMPTY_ROWS
 
-            mock_cursor.fetchall.return_value = []
+        result = compute_closure(1, mock_conn)
 
-            result = compute_closure(1, mock_conn)
-
-            assert result == set()
+        assert result == set()
 
 
 class TestComputeContributions:
     """Test the compute_contributions function"""
 
-    def test_compute_contributions_no_top_level(self):
+    def test_compute_contributions_no_top_level(self, contribution_mocks):
         """Should return 0 when no top-level nodes exist"""
-        from vizzy.services.contribution import compute_contributions
-
-        with patch('vizzy.services.contribution.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        _, mock_cursor, _ = contribution_mocks
 
-            # No top-level nodes
-            mock_cursor.fetchall.return_value = []
+        # No top-level nodes
+        mock_cursor.fetchall.return_value = _EMPTY_ROWS
 
-            result = compute_contributions(1)
+        result = compute_contributions(1)
 
-            assert result == 0
+        assert result == 0
 
-    def test_compute_contributions_single_package(self):
+    def test_compute_contributions_single_package(self, contribution_mocks):
         """Should compute contributions for a single top-level package"""
-        from vizzy.services.contribution import compute_contributions
+        _, mock_cursor, _ = contribution_mocks
 
-        with patch('vizzy.services.contribution.get_db') as mock_get_db:
-            with patch('vizzy.services.contribution.compute_closure') as mock_closure:
-                with patch('vizzy.services.contribution.cache') as mock_cache:
-                    mock_conn = MagicMock()
-                    mock_cursor = MagicMock()
-                    mock_get_db.return_value.__enter__.return_value = mock_conn
-                    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        with patch.object(contribution_service, 'compute_closure') as mock_closure:
+            # One top-level node with id=1
+            mock_cursor.fetchall.return_value = [{'id': 1, 'label': 'pkg1'}]
 
-                    # One top-level node with id=1
-                    mock_cursor.fetchall.return_value = [{'id': 1, 'label': 'pkg1'}]
+            # It has 5 dependencies
+            mock_closure.return_value = {2, 3, 4, 5, 6}
 
-                    # It has 5 dependencies
-                    mock_closure.return_value = {2, 3, 4, 5, 6}
-
-                    result = compute_contributions(1)
+            result = compute_contributions(1)
 
-                    # Should update 1 node
-                    assert result == 1
+            # Should update 1 node
+            assert result == 1
 
-                    # Verify UPDATE was called
-                    assert mock_cursor.execute.call_count >= 2
+            # Verify UPDATE was called
+            assert mock_cursor.execute.call_count >= 2
 
-    def test_compute_contributions_shared_deps(self):
+    def test_compute_contributions_shared_deps(self, contribution_mocks):
         """Should correctly identify shared vs unique dependencies"""
-        from vizzy.services.contribution import compute_contributions
-
-        with patch('vizzy.services.contribution.get_db') as mock_get_db:
-            with patch('vizzy.services.contribution.compute_closure') as mock_closure:
-                with patch('vizzy.services.contribution.cache') as mock_cache:
-                    mock_conn = MagicMock()
-                    mock_cursor = MagicMock()
-                    mock_get_db.return_value.__enter__.return_value = mock_conn
-                    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        _, mock_cursor, _ = contribution_mocks
 
-                    # Two top-level nodes
-                    mock_cursor.fetchall.return_value = [
-                        {'id': 1, 'label': 'pkg1'},
-                        {'id': 2, 'label': 'pkg2'},
-                    ]
-
-                    # pkg1 has deps {10, 11, 12}
-                    # pkg2 has deps {11, 12, 13}
-                    # Shared: {11, 12}
-                    # pkg1 unique: {10}
-                    # pkg2 unique: {13}
-                    def closure_side_effect(node_id, conn):
-                        if node_id == 1:
-                            return {10, 11, 12}
-                        else:
-                            return {11, 12, 13}
+        with patch.object(contribution_service, 'compute_closure') as mock_closure:
+            # Two top-level nodes
+            mock_cursor.fetchall.return_value = [
+                {'id': 1, 'label': 'pkg1'},
+                {'id': 2, 'label': 'pkg2'},
+            ]
 
-                    mock_closure.side_effect = closure_side_effect
+            # Shared: {11, 12}
+            # pkg1 unique: {10}
+            # pkg2 unique: {13}
+            closures = {
+                1: frozenset({10, 11, 12}),
+                2: frozenset({11, 12, 13}),
+            }
+            mock_closure.side_effect = lambda node_id, _conn: closures[node_id]
 
-                    result = compute_contributions(1)
+            result = compute_contributions(1)
 
-                    # Should update 2 nodes
-                    assert result == 2
+            # Should update 2 nodes
+            assert result == 2
 
 
 class TestGetContributionData:
     """Test the get_contribution_data function"""
 
-    def test_get_contribution_data_returns_list(self):
+    def test_get_contribution_data_returns_list(self, contribution_mocks):
         """Should return list of ClosureContribution objects"""
-        from vizzy.services.contribution import get_contribution_data
-
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
-
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchall.return_value = [
-                    {
-                        'id': 1,
-                        'label': 'pkg1',
-                        'package_type': 'app',
-                        'unique_contribution': 50,
-                        'shared_contribution': 50,
-                        'total_contribution': 100,
-                        'closure_size': 100,
-                    }
-                ]
-
-                result = get_contribution_data(1)
-
-                assert len(result) == 1
-                assert isinstance(result[0], ClosureContribution)
-                assert result[0].label == 'pkg1'
-                assert result[0].unique_contribution == 50
-
-    def test_get_contribution_data_respects_sort(self):
-        """Should sort by specified column"""
-        from vizzy.services.contribution import get_contribution_data
+        _, mock_cursor, _ = contribution_mocks
 
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
+        mock_cursor.fetchall.return_value = [_ROW_PKG1]
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        result = get_contribution_data(1)
 
-                mock_cursor.fetchall.return_value = []
+        assert len(result) == 1
+        assert isinstance(result[0], ClosureContribution)
+        assert result[0].label == 'pkg1'
+        assert result[0].unique_contribution == 50
 
-                get_contribution_data(1, sort_by='total')
+    def test_get_contribution_data_respects_sort(self, contribution_mocks):
+        """Should sort by specified column"""
+        _, mock_cursor, _ = contribution_mocks
 
-                # Verify the SQL contains ORDER BY with total_contribution
-                call_args = mock_cursor.execute.call_args[0][0]
-                assert 'total_contribution DESC' in call_args
+        mock_cursor.fetchall.return_value = _EMPTY_ROWS
 
-    def test_get_contribution_data_respects_limit(self):
-        """Should limit results as specified"""
-        from vizzy.services.contribution import get_contribution_data
+        get_contribution_data(1, sort_by='total')
 
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
+        # Verify the SQL contains ORDER BY with total_contribution
+        sql = mock_cursor.execute.call_args[0][0]
+        assert _SORT_TOTAL_RE.search(sql)
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    def test_get_contribution_data_respects_limit(self, contribution_mocks):
+        """Should limit results as specified"""
+        _, mock_cursor, _ = contribution_mocks
 
-                mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchall.return_value = _EMPTY_ROWS
 
-                get_contribution_data(1, limit=5)
+        get_contribution_data(1, limit=5)
 
-                # Verify the SQL contains LIMIT 5
-                call_args = mock_cursor.execute.call_args[0]
-                assert call_args[1] == (1, 5)
+        # Verify the SQL contains LIMIT 5
+        call_args = mock_cursor.execute.call_args[0]
+        assert call_args[1] == (1, 5)
 
-    def test_get_contribution_data_uses_cache(self):
+    def test_get_contribution_data_uses_cache(self, contribution_mocks):
         """Should return cached data when available"""
-        from vizzy.services.contribution import get_contribution_data
-
-        cached_result = [
-            ClosureContribution(
-                node_id=1,
-                label='cached-pkg',
-                package_type='app',
-                unique_contribution=10,
-                shared_contribution=10,
-                total_contribution=20,
-                closure_size=20,
-            )
-        ]
+        mock_conn, _, mock_cache = contribution_mocks
 
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            mock_cache.get.return_value = cached_result
+        cached_result = [Mock(spec=ClosureContribution, label='cached-pkg')]
+        mock_cache.get.return_value = cached_result
 
-            result = get_contribution_data(1)
+        result = get_contribution_data(1)
 
-            assert result == cached_result
-            # get_db should not be called when cache hit
-            assert result[0].label == 'cached-pkg'
+        assert result is cached_result
+        # get_db should not be called when cache hit
+        mock_conn.cursor.assert_not_called()
+        assert result[0].label == 'cached-pkg'
 
 
 class TestGetContributionSummary:
     """Test the get_contribution_summary function"""
 
-    def test_get_contribution_summary_returns_summary(self):
+    def test_get_contribution_summary_returns_summary(self, contribution_mocks):
         """Should return ClosureContributionSummary when data exists"""
-        from vizzy.services.contribution import get_contribution_summary
-
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                with patch('vizzy.services.contribution.get_contribution_data') as mock_data:
-                    mock_cache.get.return_value = None
-
-                    mock_conn = MagicMock()
-                    mock_cursor = MagicMock()
-                    mock_get_db.return_value.__enter__.return_value = mock_conn
-                    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                    # First query: aggregate metrics
-                    # Second query: computed count
-                    mock_cursor.fetchone.side_effect = [
-                        {
-                            'total_top_level': 5,
-                            'total_unique': 100,
-                            'total_shared': 200,
-                            'computed_at': datetime.now(),
-                        },
-                        {'computed_count': 5},
-                    ]
-
-                    mock_data.return_value = []
-
-                    result = get_contribution_summary(1)
-
-                    assert result is not None
-                    assert isinstance(result, ClosureContributionSummary)
-                    assert result.total_top_level_packages == 5
-                    assert result.total_unique_contributions == 100
-                    assert result.total_shared_contributions == 200
-
-    def test_get_contribution_summary_returns_none_when_no_data(self):
-        """Should return None when no top-level nodes exist"""
-        from vizzy.services.contribution import get_contribution_summary
-
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
+        _, mock_cursor, _ = contribution_mocks
+
+        with patch.object(contribution_service, 'get_contribution_data') as mock_data:
+            # First query: aggregate metrics
+            # Second query: computed count
+            mock_cursor.fetchone.side_effect = [
+                {
+                    'total_top_level': 5,
+                    'total_unique': 100,
+                    'total_shared': 200,
+                    'computed_at': _FIXED_NOW,
+                },
+                {'computed_count': 5},
+            ]
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+            mock_data.return_value = []
 
-                mock_cursor.fetchone.return_value = {
-                    'total_top_level': 0,
-                    'total_unique': 0,
-                    'total_shared': 0,
-                    'computed_at': None,
-                }
+            result = get_contribution_summary(1)
 
-                result = get_contribution_summary(1)
+            assert result is not None
+            assert isinstance(result, ClosureContributionSummary)
+            assert result.total_top_level_packages == 5
+            assert result.total_unique_contributions == 100
+            assert result.total_shared_contributions == 200
 
-                assert result is None
+    def test_get_contribution_summary_returns_none_when_no_data(self, contribution_mocks):
+        """Should return None when no top-level nodes exist"""
+        _, mock_cursor, _ = contribution_mocks
 
-    def test_get_contribution_summary_returns_none_when_not_computed(self):
-        """Should return None when contributions not yet computed"""
-        from vizzy.services.contribution import get_contribution_summary
+        mock_cursor.fetchone.return_value = _EMPTY_TOP
 
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
+        result = get_contribution_summary(1)
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        assert result is None
 
-                mock_cursor.fetchone.side_effect = [
-                    {
-                        'total_top_level': 5,
-                        'total_unique': 0,
-                        'total_shared': 0,
-                        'computed_at': None,
-                    },
-                    {'computed_count': 0},  # No computed contributions
-                ]
+    def test_get_contribution_summary_returns_none_when_not_computed(self, contribution_mocks):
+        """Should return None when contributions not yet computed"""
+        _, mock_cursor, _ = contribution_mocks
+
+        mock_cursor.fetchone.side_effect = [
+            {
+                'total_top_level': 5,
+                'total_unique': 0,
+                'total_shared': 0,
+                'computed_at': None,
+            },
+            {'computed_count': 0},  # No computed contributions
+        ]
 
-                result = get_contribution_summary(1)
+        result = get_contribution_summary(1)
 
-                assert result is None
+        assert result is None
 
 
 class TestIdentifyRemovalCandidates:
     """Test the identify_removal_candidates function"""
 
-    def test_identify_removal_candidates_returns_low_unique(self):
+    def test_identify_removal_candidates_returns_low_unique(self, contribution_mocks):
         """Should return packages with low unique contribution"""
-        from vizzy.services.contribution import identify_removal_candidates
-
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
-
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchall.return_value = [
-                    {
-                        'id': 1,
-                        'label': 'removable-pkg',
-                        'package_type': 'app',
-                        'unique_contribution': 0,
-                        'shared_contribution': 50,
-                        'total_contribution': 50,
-                        'closure_size': 50,
-                    }
-                ]
-
-                result = identify_removal_candidates(1, max_unique_threshold=0)
-
-                assert len(result) == 1
-                assert result[0].unique_contribution == 0
-
-    def test_identify_removal_candidates_respects_threshold(self):
-        """Should filter by max_unique_threshold"""
-        from vizzy.services.contribution import identify_removal_candidates
+        _, mock_cursor, _ = contribution_mocks
+
+        mock_cursor.fetchall.return_value = [_ROW_REMOVABLE]
+
+        result = identify_removal_candidates(1, max_unique_threshold=0)
 
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
+        assert len(result) == 1
+        assert result[0].unique_contribution == 0
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    def test_identify_removal_candidates_respects_threshold(self, contribution_mocks):
+        """Should filter by max_unique_threshold"""
+        _, mock_cursor, _ = contribution_mocks
 
-                mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchall.return_value = _EMPTY_ROWS
 
-                identify_removal_candidates(1, max_unique_threshold=5)
+        identify_removal_candidates(1, max_unique_threshold=5)
 
-                # Verify SQL contains threshold
-                call_args = mock_cursor.execute.call_args[0]
-                assert call_args[1] == (1, 5, 20)
+        # Verify SQL contains threshold
+        call_args = mock_cursor.execute.call_args[0]
+        assert call_args[1] == (1, 5, 20)
 
 
 class TestGetContributionByType:
     """Test the get_contribution_by_type function"""
 
-    def test_get_contribution_by_type_returns_dict(self):
+    def test_get_contribution_by_type_returns_dict(self, contribution_mocks):
         """Should return dictionary of contributions by package type"""
-        from vizzy.services.contribution import get_contribution_by_type
-
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
-
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchall.return_value = [
-                    {
-                        'package_type': 'app',
-                        'package_count': 10,
-                        'total_unique': 100,
-                        'total_shared': 200,
-                        'total_overall': 300,
-                    },
-                    {
-                        'package_type': 'lib',
-                        'package_count': 50,
-                        'total_unique': 50,
-                        'total_shared': 500,
-                        'total_overall': 550,
-                    },
-                ]
-
-                result = get_contribution_by_type(1)
-
-                assert 'app' in result
-                assert 'lib' in result
-                assert result['app']['package_count'] == 10
-                assert result['lib']['total_overall'] == 550
-
-    def test_get_contribution_by_type_handles_unknown(self):
+        _, mock_cursor, _ = contribution_mocks
+
+        mock_cursor.fetchall.return_value = [
+            {
+                'package_type': 'app',
+                'package_count': 10,
+                'total_unique': 100,
+                'total_shared': 200,
+                'total_overall': 300,
+            },
+            {
+                'package_type': 'lib',
+                'package_count': 50,
+                'total_unique': 50,
+                'total_shared': 500,
+                'total_overall': 550,
+            },
+        ]
+
+        result = get_contribution_by_type(1)
+
+        assert 'app' in result
+        assert 'lib' in result
+        assert result['app']['package_count'] == 10
+        assert result['lib']['total_overall'] == 550
+
+    def test_get_contribution_by_type_handles_unknown(self, contribution_mocks):
         """Should handle packages with unknown type"""
-        from vizzy.services.contribution import get_contribution_by_type
-
-        with patch('vizzy.services.contribution.cache') as mock_cache:
-            with patch('vizzy.services.contribution.get_db') as mock_get_db:
-                mock_cache.get.return_value = None
-
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-
-                mock_cursor.fetchall.return_value = [
-                    {
-                        'package_type': 'unknown',
-                        'package_count': 5,
-                        'total_unique': 10,
-                        'total_shared': 20,
-                        'total_overall': 30,
-                    }
-                ]
-
-                result = get_contribution_by_type(1)
-
-                assert 'unknown' in result
+        _, mock_cursor, _ = contribution_mocks
+
+        mock_cursor.fetchall.return_value = [
+            {
+                'package_type': 'unknown',
+                'package_count': 5,
+                'total_unique': 10,
+                'total_shared': 20,
+                'total_overall': 30,
+            }
+        ]
+
+        result = get_contribution_by_type(1)
+
+        assert 'unknown' in result
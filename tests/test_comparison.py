@@ -1,8 +1,12 @@
 """Tests for import comparison functionality (Phase 5)"""
 
+import re
+from collections import Counter
+
 import pytest
 from unittest.mock import patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timezone
+from types import MappingProxyType
 
 from vizzy.models import (
     DiffType,
@@ -19,53 +23,69 @@ from vizzy.services.comparison import (
     get_closure_comparison,
     match_nodes,
     generate_diff_summary,
-)
-from vizzy.routes.compare import (
-    categorize_diff,
-    categorize_diffs,
-    score_diff_importance,
-    sort_diffs_by_importance,
-    DiffCategory,
-    compare_package_traces,
-)
-from vizzy.services.comparison import (
     get_category_summaries,
     get_top_changes,
     generate_category_summary_text,
     generate_enhanced_diff_summary,
+    CategoryMatcher,
     CategorySummary,
+    categorize_diff as service_categorize_diff,
+    _build_node_from_row,
+    score_diff_importance,
+    sort_diffs_by_importance,
+    top_n_by_importance,
     DiffCategory as ServiceDiffCategory,
+    CATEGORY_PATTERNS as SERVICE_CATEGORY_PATTERNS,
 )
 
 
-class TestClassifyDiff:
-    """Test the classify_diff helper function"""
+pytestmark = [
+    # Keep this module on one xdist worker so its shared fixtures are built once
+    pytest.mark.xdist_group("comparison"),
+    # Surface Pydantic v1-style API use (.dict(), .json(), ...) as failures
+    pytest.mark.filterwarnings("error::pydantic.PydanticDeprecatedSince20"),
+]
 
-    def test_both_hashes_same(self):
-        """When both hashes are present and equal, should be SAME"""
-        result = classify_diff("abc123", "abc123")
-        assert result == DiffType.SAME
+# Resolve the comparison models' schemas at collection time so any pending
+# forward references fail here rather than inside whichever test runs first.
+for _model in (Node, NodeDiff, ImportInfo, ImportComparison, ClosureComparison):
+    _model.model_rebuild()
 
-    def test_both_hashes_different(self):
-        """When both hashes are present but different, should be DIFFERENT_HASH"""
-        result = classify_diff("abc123", "xyz789")
-        assert result == DiffType.DIFFERENT_HASH
+# Fixed timestamp so fixtures are deterministic
+FIXED_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
-    def test_only_left_hash(self):
-        """When only left hash is present, should be ONLY_LEFT"""
-        result = classify_diff("abc123", None)
-        assert result == DiffType.ONLY_LEFT
 
-    def test_only_right_hash(self):
-        """When only right hash is present, should be ONLY_RIGHT"""
-        result = classify_diff(None, "xyz789")
-        assert result == DiffType.ONLY_RIGHT
+def make_node(
+    id: int,
+    drv_hash: str,
+    label: str,
+    package_type: str = "app",
+    import_id: int = 1,
+    depth: int = 0,
+    closure_size: int = 100,
+) -> Node:
+    """Return a new Node for testing"""
+    return Node(
+        id=id, import_id=import_id, drv_hash=drv_hash, drv_name=f"{label}.drv",
+        label=label, package_type=package_type, depth=depth,
+        closure_size=closure_size, metadata=None
+    )
 
-    def test_neither_hash(self):
-        """When neither hash is present, should be ONLY_RIGHT (edge case)"""
+
+class TestClassifyDiff:
+    """Test the classify_diff helper function"""
+
+    @pytest.mark.parametrize("left,right,expected", [
+        ("abc123", "abc123", DiffType.SAME),
+        ("abc123", "xyz789", DiffType.DIFFERENT_HASH),
+        ("abc123", None, DiffType.ONLY_LEFT),
+        (None, "xyz789", DiffType.ONLY_RIGHT),
         # This shouldn't happen in practice, but the logic defaults to ONLY_RIGHT
-        result = classify_diff(None, None)
-        assert result == DiffType.ONLY_RIGHT
+        (None, None, DiffType.ONLY_RIGHT),
+    ], ids=["same", "different_hash", "only_left", "only_right", "neither"])
+    def test_classify_diff(self, left, right, expected):
+        """Hash presence and equality should map onto the matching DiffType"""
+        assert classify_diff(left, right) == expected
 
 
 class TestNodeDiff:
@@ -73,14 +93,8 @@ class TestNodeDiff:
 
     def test_closure_impact_addition(self):
         """Closure impact should be positive when right has larger closure"""
-        left_node = Node(
-            id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-            label="pkg", package_type="app", depth=0, closure_size=100, metadata=None
-        )
-        right_node = Node(
-            id=2, import_id=2, drv_hash="b", drv_name="b.drv",
-            label="pkg", package_type="app", depth=0, closure_size=150, metadata=None
-        )
+        left_node = make_node(1, "a", "pkg", "app")
+        right_node = make_node(2, "b", "pkg", "app", import_id=2, closure_size=150)
         diff = NodeDiff(
             label="pkg",
             package_type="app",
@@ -92,14 +106,8 @@ class TestNodeDiff:
 
     def test_closure_impact_removal(self):
         """Closure impact should be negative when left has larger closure"""
-        left_node = Node(
-            id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-            label="pkg", package_type="app", depth=0, closure_size=200, metadata=None
-        )
-        right_node = Node(
-            id=2, import_id=2, drv_hash="b", drv_name="b.drv",
-            label="pkg", package_type="app", depth=0, closure_size=100, metadata=None
-        )
+        left_node = make_node(1, "a", "pkg", "app", closure_size=200)
+        right_node = make_node(2, "b", "pkg", "app", import_id=2)
         diff = NodeDiff(
             label="pkg",
             package_type="app",
@@ -111,10 +119,7 @@ class TestNodeDiff:
 
     def test_closure_impact_only_left(self):
         """Closure impact should be negative when node only exists in left"""
-        left_node = Node(
-            id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-            label="pkg", package_type="app", depth=0, closure_size=100, metadata=None
-        )
+        left_node = make_node(1, "a", "pkg", "app")
         diff = NodeDiff(
             label="pkg",
             package_type="app",
@@ -126,10 +131,7 @@ class TestNodeDiff:
 
     def test_closure_impact_only_right(self):
         """Closure impact should be positive when node only exists in right"""
-        right_node = Node(
-            id=2, import_id=2, drv_hash="b", drv_name="b.drv",
-            label="pkg", package_type="app", depth=0, closure_size=150, metadata=None
-        )
+        right_node = make_node(2, "b", "pkg", "app", import_id=2, closure_size=150)
         diff = NodeDiff(
             label="pkg",
             package_type="app",
@@ -140,647 +142,469 @@ class TestNodeDiff:
         assert diff.closure_impact == 150
 
 
-class TestImportComparison:
-    """Test ImportComparison model functionality"""
+@pytest.fixture(scope="module")
+def sample_comparison() -> ImportComparison:
+    """Sample comparison shared by the ImportComparison model tests.
+
+    Built once per module; the tests only read from it.
+    """
+    left_import = ImportInfo(
+        id=1, name="host1", config_path="/etc/nixos",
+        drv_path="/nix/store/abc", imported_at=FIXED_NOW,
+        node_count=100, edge_count=200
+    )
+    right_import = ImportInfo(
+        id=2, name="host2", config_path="/etc/nixos",
+        drv_path="/nix/store/xyz", imported_at=FIXED_NOW,
+        node_count=120, edge_count=240
+    )
+
+    diffs = [
+        NodeDiff(label="pkg1", package_type="app", diff_type=DiffType.ONLY_LEFT,
+                 left_node=make_node(1, "a", "pkg1", "app", closure_size=10)),
+        NodeDiff(label="pkg2", package_type="app", diff_type=DiffType.ONLY_RIGHT,
+                 right_node=make_node(2, "b", "pkg2", "app", import_id=2, closure_size=20)),
+        NodeDiff(label="pkg3", package_type="lib", diff_type=DiffType.ONLY_RIGHT,
+                 right_node=make_node(3, "c", "pkg3", "lib", import_id=2, depth=1, closure_size=30)),
+        NodeDiff(label="pkg4", package_type="lib", diff_type=DiffType.SAME,
+                 left_node=make_node(4, "d", "pkg4", "lib", depth=1, closure_size=40),
+                 right_node=make_node(5, "d", "pkg4", "lib", import_id=2, depth=1, closure_size=40)),
+        NodeDiff(label="pkg5", package_type="service", diff_type=DiffType.DIFFERENT_HASH,
+                 left_node=make_node(6, "e", "pkg5", "service", closure_size=50),
+                 right_node=make_node(7, "f", "pkg5", "service", import_id=2, closure_size=60)),
+    ]
+
+    return ImportComparison(
+        left_import=left_import,
+        right_import=right_import,
+        left_only_count=1,
+        right_only_count=2,
+        different_count=1,
+        same_count=1,
+        all_diffs=diffs,
+    )
 
-    def _create_sample_comparison(self) -> ImportComparison:
-        """Create a sample comparison for testing"""
-        left_import = ImportInfo(
-            id=1, name="host1", config_path="/etc/nixos",
-            drv_path="/nix/store/abc", imported_at=datetime.now(),
-            node_count=100, edge_count=200
-        )
-        right_import = ImportInfo(
-            id=2, name="host2", config_path="/etc/nixos",
-            drv_path="/nix/store/xyz", imported_at=datetime.now(),
-            node_count=120, edge_count=240
-        )
 
-        diffs = [
-            NodeDiff(label="pkg1", package_type="app", diff_type=DiffType.ONLY_LEFT,
-                     left_node=Node(id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-                                   label="pkg1", package_type="app", depth=0,
-                                   closure_size=10, metadata=None)),
-            NodeDiff(label="pkg2", package_type="app", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=2, import_id=2, drv_hash="b", drv_name="b.drv",
-                                    label="pkg2", package_type="app", depth=0,
-                                    closure_size=20, metadata=None)),
-            NodeDiff(label="pkg3", package_type="lib", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=3, import_id=2, drv_hash="c", drv_name="c.drv",
-                                    label="pkg3", package_type="lib", depth=1,
-                                    closure_size=30, metadata=None)),
-            NodeDiff(label="pkg4", package_type="lib", diff_type=DiffType.SAME,
-                     left_node=Node(id=4, import_id=1, drv_hash="d", drv_name="d.drv",
-                                   label="pkg4", package_type="lib", depth=1,
-                                   closure_size=40, metadata=None),
-                     right_node=Node(id=5, import_id=2, drv_hash="d", drv_name="d.drv",
-                                    label="pkg4", package_type="lib", depth=1,
-                                    closure_size=40, metadata=None)),
-            NodeDiff(label="pkg5", package_type="service", diff_type=DiffType.DIFFERENT_HASH,
-                     left_node=Node(id=6, import_id=1, drv_hash="e", drv_name="e.drv",
-                                   label="pkg5", package_type="service", depth=0,
-                                   closure_size=50, metadata=None),
-                     right_node=Node(id=7, import_id=2, drv_hash="f", drv_name="f.drv",
-                                    label="pkg5", package_type="service", depth=0,
-                                    closure_size=60, metadata=None)),
-        ]
-
-        return ImportComparison(
-            left_import=left_import,
-            right_import=right_import,
-            left_only_count=1,
-            right_only_count=2,
-            different_count=1,
-            same_count=1,
-            all_diffs=diffs,
-        )
+class TestImportComparison:
+    """Test ImportComparison model functionality"""
 
-    def test_total_nodes_compared(self):
+    def test_total_nodes_compared(self, sample_comparison):
         """Total should be sum of all diff categories"""
-        comparison = self._create_sample_comparison()
-        assert comparison.total_nodes_compared == 5  # 1 + 2 + 1 + 1
+        assert sample_comparison.total_nodes_compared == 5  # 1 + 2 + 1 + 1
 
-    def test_net_package_change(self):
+    def test_net_package_change(self, sample_comparison):
         """Net change should be right_only - left_only"""
-        comparison = self._create_sample_comparison()
-        assert comparison.net_package_change == 1  # 2 - 1
-
-    def test_get_diffs_by_type_only_left(self):
-        """Should filter correctly by diff type"""
-        comparison = self._create_sample_comparison()
-        only_left = comparison.get_diffs_by_type(DiffType.ONLY_LEFT)
-        assert len(only_left) == 1
-        assert only_left[0].label == "pkg1"
-
-    def test_get_diffs_by_type_only_right(self):
-        """Should filter correctly by diff type"""
-        comparison = self._create_sample_comparison()
-        only_right = comparison.get_diffs_by_type(DiffType.ONLY_RIGHT)
-        assert len(only_right) == 2
-        labels = {d.label for d in only_right}
-        assert labels == {"pkg2", "pkg3"}
+        assert sample_comparison.net_package_change == 1  # 2 - 1
 
-    def test_get_diffs_by_package_type(self):
-        """Should filter correctly by package type"""
-        comparison = self._create_sample_comparison()
-        libs = comparison.get_diffs_by_package_type("lib")
-        assert len(libs) == 2
-        labels = {d.label for d in libs}
-        assert labels == {"pkg3", "pkg4"}
+    @pytest.mark.parametrize("select,expected_labels", [
+        (lambda c: c.get_diffs_by_type(DiffType.ONLY_LEFT), {"pkg1"}),
+        (lambda c: c.get_diffs_by_type(DiffType.ONLY_RIGHT), {"pkg2", "pkg3"}),
+        (lambda c: c.get_diffs_by_package_type("lib"), {"pkg3", "pkg4"}),
+    ], ids=["only_left", "only_right", "package_type_lib"])
+    def test_diff_filters(self, sample_comparison, select, expected_labels):
+        """Should filter correctly by diff type and package type"""
+        selected = select(sample_comparison)
+        assert len(selected) == len(expected_labels)
+        assert {d.label for d in selected} == expected_labels
 
 
-class TestCompareImports:
-    """Test the compare_imports function"""
+class _StubCursor:
+    """Minimal cursor stand-in: execute is a no-op, fetchall returns preset rows"""
 
-    def _mock_import_info(self, id: int, name: str) -> dict:
-        """Create mock import info for database returns"""
-        return {
-            "id": id,
-            "name": name,
-            "config_path": "/etc/nixos",
-            "drv_path": f"/nix/store/{name}",
-            "imported_at": datetime.now(),
-            "node_count": 100,
-            "edge_count": 200,
-        }
+    def __init__(self, rows=()):
+        self.rows = rows
 
-    def test_compare_identical_imports(self):
-        """Compare two imports with identical nodes"""
-        mock_left_import = self._mock_import_info(1, "host1")
-        mock_right_import = self._mock_import_info(2, "host2")
+    def __enter__(self):
+        return self
 
-        mock_rows = [
-            {
-                "label": "pkg1",
-                "left_id": 1, "left_import_id": 1, "left_hash": "abc",
-                "left_name": "pkg1.drv", "left_type": "app",
-                "left_depth": 0, "left_closure": 100, "left_metadata": None,
-                "right_id": 2, "right_import_id": 2, "right_hash": "abc",
-                "right_name": "pkg1.drv", "right_type": "app",
-                "right_depth": 0, "right_closure": 100, "right_metadata": None,
-            },
-        ]
+    def __exit__(self, *exc_info):
+        return False
 
-        with patch('vizzy.services.comparison.graph.get_import') as mock_get_import:
-            with patch('vizzy.services.comparison.get_db') as mock_get_db:
-                mock_get_import.side_effect = [
-                    ImportInfo(**mock_left_import),
-                    ImportInfo(**mock_right_import),
-                ]
+    def execute(self, query, params=None):
+        pass
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_rows
+    def fetchall(self):
+        return self.rows
 
-                comparison = compare_imports(1, 2)
 
-                assert comparison.left_only_count == 0
-                assert comparison.right_only_count == 0
-                assert comparison.different_count == 0
-                assert comparison.same_count == 1
-                assert len(comparison.all_diffs) == 1
-                assert comparison.all_diffs[0].diff_type == DiffType.SAME
+class _StubConn:
+    """Minimal connection stand-in whose cursor() always returns the same stub"""
 
-    def test_compare_with_only_left(self):
-        """Compare when a node exists only in left import"""
-        mock_left_import = self._mock_import_info(1, "host1")
-        mock_right_import = self._mock_import_info(2, "host2")
+    def __init__(self, cursor: _StubCursor):
+        self._cursor = cursor
 
-        mock_rows = [
-            {
-                "label": "pkg1",
-                "left_id": 1, "left_import_id": 1, "left_hash": "abc",
-                "left_name": "pkg1.drv", "left_type": "app",
-                "left_depth": 0, "left_closure": 100, "left_metadata": None,
-                "right_id": None, "right_import_id": None, "right_hash": None,
-                "right_name": None, "right_type": None,
-                "right_depth": None, "right_closure": None, "right_metadata": None,
-            },
-        ]
+    def __enter__(self):
+        return self
 
-        with patch('vizzy.services.comparison.graph.get_import') as mock_get_import:
-            with patch('vizzy.services.comparison.get_db') as mock_get_db:
-                mock_get_import.side_effect = [
-                    ImportInfo(**mock_left_import),
-                    ImportInfo(**mock_right_import),
-                ]
+    def __exit__(self, *exc_info):
+        return False
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_rows
+    def cursor(self):
+        return self._cursor
 
-                comparison = compare_imports(1, 2)
 
-                assert comparison.left_only_count == 1
-                assert comparison.right_only_count == 0
-                assert len(comparison.all_diffs) == 1
-                assert comparison.all_diffs[0].diff_type == DiffType.ONLY_LEFT
-                assert comparison.all_diffs[0].left_node is not None
-                assert comparison.all_diffs[0].right_node is None
+@pytest.fixture(scope="class")
+def _db_mocks():
+    """Patch graph.get_import and get_db once per test class.
 
-    def test_compare_with_only_right(self):
-        """Compare when a node exists only in right import"""
-        mock_left_import = self._mock_import_info(1, "host1")
-        mock_right_import = self._mock_import_info(2, "host2")
+    get_db hands out a stub connection whose cursor returns whatever rows
+    the test assigns; mocked_db resets both between tests.
+    """
+    mock_get_import = MagicMock()
+    stub_cursor = _StubCursor()
+    stub_conn = _StubConn(stub_cursor)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('vizzy.services.comparison.graph.get_import', mock_get_import)
+        mp.setattr('vizzy.services.comparison.get_db', lambda: stub_conn)
+        yield mock_get_import, stub_cursor
 
-        mock_rows = [
-            {
-                "label": "pkg2",
-                "left_id": None, "left_import_id": None, "left_hash": None,
-                "left_name": None, "left_type": None,
-                "left_depth": None, "left_closure": None, "left_metadata": None,
-                "right_id": 2, "right_import_id": 2, "right_hash": "xyz",
-                "right_name": "pkg2.drv", "right_type": "lib",
-                "right_depth": 1, "right_closure": 50, "right_metadata": None,
-            },
-        ]
 
-        with patch('vizzy.services.comparison.graph.get_import') as mock_get_import:
-            with patch('vizzy.services.comparison.get_db') as mock_get_db:
-                mock_get_import.side_effect = [
-                    ImportInfo(**mock_left_import),
-                    ImportInfo(**mock_right_import),
-                ]
+@pytest.fixture
+def mocked_db(_db_mocks):
+    """Yield (mock_get_import, stub_cursor) with state from earlier tests cleared.
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_rows
-
-                comparison = compare_imports(1, 2)
+    Tests only need to set the import side effects and the cursor rows.
+    """
+    mock_get_import, stub_cursor = _db_mocks
+    mock_get_import.reset_mock(return_value=True, side_effect=True)
+    stub_cursor.rows = ()
+    yield mock_get_import, stub_cursor
 
-                assert comparison.left_only_count == 0
-                assert comparison.right_only_count == 1
-                assert len(comparison.all_diffs) == 1
-                assert comparison.all_diffs[0].diff_type == DiffType.ONLY_RIGHT
-                assert comparison.all_diffs[0].left_node is None
-                assert comparison.all_diffs[0].right_node is not None
 
-    def test_compare_with_different_hash(self):
-        """Compare when same label has different hashes"""
-        mock_left_import = self._mock_import_info(1, "host1")
-        mock_right_import = self._mock_import_info(2, "host2")
+def _row(label: str, left: tuple | None, right: tuple | None) -> MappingProxyType:
+    """Build a read-only compare_imports result row.
 
-        mock_rows = [
-            {
-                "label": "pkg1",
-                "left_id": 1, "left_import_id": 1, "left_hash": "abc",
-                "left_name": "pkg1.drv", "left_type": "app",
-                "left_depth": 0, "left_closure": 100, "left_metadata": None,
-                "right_id": 2, "right_import_id": 2, "right_hash": "xyz",
-                "right_name": "pkg1.drv", "right_type": "app",
-                "right_depth": 0, "right_closure": 120, "right_metadata": None,
-            },
-        ]
+    Each side is an (id, hash, type, depth, closure) tuple, or None when the
+    label is missing from that import.
+    """
+    row = {"label": label}
+    for side, values in (("left", left), ("right", right)):
+        node_id, drv_hash, package_type, depth, closure = values or (None,) * 5
+        row.update({
+            f"{side}_id": node_id,
+            f"{side}_import_id": None if values is None else (1 if side == "left" else 2),
+            f"{side}_hash": drv_hash,
+            f"{side}_name": None if values is None else f"{label}.drv",
+            f"{side}_type": package_type,
+            f"{side}_depth": depth,
+            f"{side}_closure": closure,
+            f"{side}_metadata": None,
+        })
+    return MappingProxyType(row)
 
-        with patch('vizzy.services.comparison.graph.get_import') as mock_get_import:
-            with patch('vizzy.services.comparison.get_db') as mock_get_db:
-                mock_get_import.side_effect = [
-                    ImportInfo(**mock_left_import),
-                    ImportInfo(**mock_right_import),
-                ]
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_rows
-
-                comparison = compare_imports(1, 2)
-
-                assert comparison.left_only_count == 0
-                assert comparison.right_only_count == 0
-                assert comparison.different_count == 1
-                assert comparison.same_count == 0
-                assert len(comparison.all_diffs) == 1
-                assert comparison.all_diffs[0].diff_type == DiffType.DIFFERENT_HASH
-                assert comparison.all_diffs[0].left_node is not None
-                assert comparison.all_diffs[0].right_node is not None
-
-    def test_compare_mixed_diffs(self):
-        """Compare with a mix of diff types"""
-        mock_left_import = self._mock_import_info(1, "host1")
-        mock_right_import = self._mock_import_info(2, "host2")
-
-        mock_rows = [
-            # Same node
-            {
-                "label": "common",
-                "left_id": 1, "left_import_id": 1, "left_hash": "abc",
-                "left_name": "common.drv", "left_type": "lib",
-                "left_depth": 0, "left_closure": 50, "left_metadata": None,
-                "right_id": 2, "right_import_id": 2, "right_hash": "abc",
-                "right_name": "common.drv", "right_type": "lib",
-                "right_depth": 0, "right_closure": 50, "right_metadata": None,
-            },
-            # Only left
-            {
-                "label": "left-only",
-                "left_id": 3, "left_import_id": 1, "left_hash": "def",
-                "left_name": "left-only.drv", "left_type": "app",
-                "left_depth": 1, "left_closure": 100, "left_metadata": None,
-                "right_id": None, "right_import_id": None, "right_hash": None,
-                "right_name": None, "right_type": None,
-                "right_depth": None, "right_closure": None, "right_metadata": None,
-            },
-            # Only right
-            {
-                "label": "right-only",
-                "left_id": None, "left_import_id": None, "left_hash": None,
-                "left_name": None, "left_type": None,
-                "left_depth": None, "left_closure": None, "left_metadata": None,
-                "right_id": 4, "right_import_id": 2, "right_hash": "ghi",
-                "right_name": "right-only.drv", "right_type": "service",
-                "right_depth": 0, "right_closure": 75, "right_metadata": None,
-            },
-            # Different hash
-            {
-                "label": "changed",
-                "left_id": 5, "left_import_id": 1, "left_hash": "jkl",
-                "left_name": "changed.drv", "left_type": "app",
-                "left_depth": 0, "left_closure": 200, "left_metadata": None,
-                "right_id": 6, "right_import_id": 2, "right_hash": "mno",
-                "right_name": "changed.drv", "right_type": "app",
-                "right_depth": 0, "right_closure": 250, "right_metadata": None,
-            },
-        ]
+IDENTICAL_ROWS = (
+    _row("pkg1", (1, "abc", "app", 0, 100), (2, "abc", "app", 0, 100)),
+)
+LEFT_ONLY_ROWS = (
+    _row("pkg1", (1, "abc", "app", 0, 100), None),
+)
+RIGHT_ONLY_ROWS = (
+    _row("pkg2", None, (2, "xyz", "lib", 1, 50)),
+)
+DIFFERENT_HASH_ROWS = (
+    _row("pkg1", (1, "abc", "app", 0, 100), (2, "xyz", "app", 0, 120)),
+)
+MIXED_ROWS = (
+    _row("common", (1, "abc", "lib", 0, 50), (2, "abc", "lib", 0, 50)),
+    _row("left-only", (3, "def", "app", 1, 100), None),
+    _row("right-only", None, (4, "ghi", "service", 0, 75)),
+    _row("changed", (5, "jkl", "app", 0, 200), (6, "mno", "app", 0, 250)),
+)
 
-        with patch('vizzy.services.comparison.graph.get_import') as mock_get_import:
-            with patch('vizzy.services.comparison.get_db') as mock_get_db:
-                mock_get_import.side_effect = [
-                    ImportInfo(**mock_left_import),
-                    ImportInfo(**mock_right_import),
-                ]
 
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_rows
+def _import_info(id: int, name: str) -> ImportInfo:
+    """Return the ImportInfo graph.get_import would yield for compare_imports"""
+    return ImportInfo(
+        id=id, name=name, config_path="/etc/nixos",
+        drv_path=f"/nix/store/{name}", imported_at=FIXED_NOW,
+        node_count=100, edge_count=200
+    )
 
-                comparison = compare_imports(1, 2)
 
-                assert comparison.same_count == 1
-                assert comparison.left_only_count == 1
-                assert comparison.right_only_count == 1
-                assert comparison.different_count == 1
-                assert comparison.total_nodes_compared == 4
-                assert comparison.net_package_change == 0  # 1 - 1
+class TestCompareImports:
+    """Test the compare_imports function"""
 
-    def test_compare_import_not_found(self):
+    @pytest.fixture(params=[
+        (IDENTICAL_ROWS, (1, 0, 0, 0)),
+        (LEFT_ONLY_ROWS, (0, 1, 0, 0)),
+        (RIGHT_ONLY_ROWS, (0, 0, 1, 0)),
+        (DIFFERENT_HASH_ROWS, (0, 0, 0, 1)),
+        (MIXED_ROWS, (1, 1, 1, 1)),
+    ], ids=["identical", "only_left", "only_right", "different_hash", "mixed"])
+    def comparison(self, request, mocked_db):
+        """Run compare_imports over one row table.
+
+        Returns (comparison, rows, expected) where expected is the
+        (same, left_only, right_only, different) count tuple.
+        """
+        rows, expected = request.param
+        mock_get_import, stub_cursor = mocked_db
+        mock_get_import.side_effect = [
+            _import_info(1, "host1"),
+            _import_info(2, "host2"),
+        ]
+        stub_cursor.rows = rows
+        return compare_imports(1, 2), rows, expected
+
+    def test_counts(self, comparison):
+        """Rows should be counted by diff type"""
+        result, rows, (same, left_only, right_only, different) = comparison
+
+        assert result.same_count == same
+        assert result.left_only_count == left_only
+        assert result.right_only_count == right_only
+        assert result.different_count == different
+        assert result.total_nodes_compared == len(rows)
+        assert result.net_package_change == right_only - left_only
+
+    def test_diff_types(self, comparison):
+        """Each row should yield one diff with the matching node sides attached"""
+        result, rows, _ = comparison
+
+        assert len(result.all_diffs) == len(rows)
+        for diff in result.all_diffs:
+            assert (diff.left_node is None) == (diff.diff_type == DiffType.ONLY_RIGHT)
+            assert (diff.right_node is None) == (diff.diff_type == DiffType.ONLY_LEFT)
+
+    def test_constructed_nodes_intern_category_fields(self):
+        """Nodes built without validation should still share category strings"""
+        def row():
+            # join() builds fresh string objects that aren't interned yet
+            return {
+                "left_id": 1,
+                "label": "firefox-121.0",
+                "left_type": "".join(["ap", "p"]),
+                "left_top_level_source": "".join(["systemPack", "ages"]),
+            }
+
+        first = _build_node_from_row(row(), "left")
+        second = _build_node_from_row(row(), "left")
+
+        assert first.package_type is second.package_type
+        assert first.top_level_source is second.top_level_source
+
+    def test_compare_import_not_found(self, mocked_db):
         """Should raise ValueError when import doesn't exist"""
-        with patch('vizzy.services.comparison.graph.get_import') as mock_get_import:
-            mock_get_import.return_value = None
+        mock_get_import, _ = mocked_db
+        mock_get_import.return_value = None
 
-            with pytest.raises(ValueError, match="Left import 999 not found"):
-                compare_imports(999, 1)
+        with pytest.raises(ValueError, match="Left import 999 not found"):
+            compare_imports(999, 1)
 
 
 class TestClosureComparison:
     """Test the ClosureComparison model"""
 
-    def test_difference_calculation(self):
-        """Difference should be right - left"""
+    @pytest.mark.parametrize("left_total,right_total,difference,percentage", [
+        (1000, 1500, 500, 50.0),
+        (1000, 800, -200, -20.0),
+        # Zero left total is handled gracefully
+        (0, 100, 100, 100.0),
+        (0, 0, 0, 0.0),
+    ], ids=["positive", "negative", "zero_left", "both_zero"])
+    def test_closure_math(self, left_total, right_total, difference, percentage):
+        """Difference should be right - left, percentage relative to left"""
         comparison = ClosureComparison(
-            left_total=1000,
-            right_total=1500,
+            left_total=left_total,
+            right_total=right_total,
             largest_additions=[],
             largest_removals=[],
         )
-        assert comparison.difference == 500
-
-    def test_percentage_diff_positive(self):
-        """Percentage should be positive when right is larger"""
-        comparison = ClosureComparison(
-            left_total=1000,
-            right_total=1500,
-            largest_additions=[],
-            largest_removals=[],
-        )
-        assert comparison.percentage_diff == 50.0
-
-    def test_percentage_diff_negative(self):
-        """Percentage should be negative when left is larger"""
-        comparison = ClosureComparison(
-            left_total=1000,
-            right_total=800,
-            largest_additions=[],
-            largest_removals=[],
-        )
-        assert comparison.percentage_diff == -20.0
-
-    def test_percentage_diff_zero_left(self):
-        """Should handle zero left total gracefully"""
-        comparison = ClosureComparison(
-            left_total=0,
-            right_total=100,
-            largest_additions=[],
-            largest_removals=[],
-        )
-        assert comparison.percentage_diff == 100.0
-
-    def test_percentage_diff_both_zero(self):
-        """Should handle both zero gracefully"""
-        comparison = ClosureComparison(
-            left_total=0,
-            right_total=0,
-            largest_additions=[],
-            largest_removals=[],
-        )
-        assert comparison.percentage_diff == 0.0
+        assert comparison.difference == difference
+        assert comparison.percentage_diff == percentage
 
 
 class TestMatchNodes:
     """Test the match_nodes utility function"""
 
-    def _make_node(self, id: int, drv_hash: str, label: str, package_type: str = "app") -> Node:
-        """Helper to create a Node for testing"""
-        return Node(
-            id=id, import_id=1, drv_hash=drv_hash, drv_name=f"{label}.drv",
-            label=label, package_type=package_type, depth=0, closure_size=100, metadata=None
-        )
-
-    def test_match_identical_nodes(self):
-        """Nodes with same hash should be SAME"""
-        left = [self._make_node(1, "abc", "pkg1")]
-        right = [self._make_node(2, "abc", "pkg1")]
-
-        diffs = match_nodes(left, right)
-
-        assert len(diffs) == 1
-        assert diffs[0].diff_type == DiffType.SAME
-        assert diffs[0].left_node is not None
-        assert diffs[0].right_node is not None
-
-    def test_match_different_hash_same_label(self):
-        """Nodes with same label but different hash should be DIFFERENT_HASH"""
-        left = [self._make_node(1, "abc", "pkg1")]
-        right = [self._make_node(2, "xyz", "pkg1")]
-
-        diffs = match_nodes(left, right)
-
-        assert len(diffs) == 1
-        assert diffs[0].diff_type == DiffType.DIFFERENT_HASH
-        assert diffs[0].left_node is not None
-        assert diffs[0].right_node is not None
-
-    def test_match_only_left(self):
-        """Nodes only in left should be ONLY_LEFT"""
-        left = [self._make_node(1, "abc", "pkg1")]
-        right = []
-
-        diffs = match_nodes(left, right)
-
-        assert len(diffs) == 1
-        assert diffs[0].diff_type == DiffType.ONLY_LEFT
-        assert diffs[0].left_node is not None
-        assert diffs[0].right_node is None
-
-    def test_match_only_right(self):
-        """Nodes only in right should be ONLY_RIGHT"""
-        left = []
-        right = [self._make_node(2, "xyz", "pkg1")]
-
-        diffs = match_nodes(left, right)
-
-        assert len(diffs) == 1
-        assert diffs[0].diff_type == DiffType.ONLY_RIGHT
-        assert diffs[0].left_node is None
-        assert diffs[0].right_node is not None
-
-    def test_match_mixed_nodes(self):
-        """Test matching with multiple nodes of different types"""
-        left = [
-            self._make_node(1, "aaa", "same-pkg"),
-            self._make_node(2, "bbb", "different-pkg"),
-            self._make_node(3, "ccc", "left-only-pkg"),
-        ]
-        right = [
-            self._make_node(4, "aaa", "same-pkg"),
-            self._make_node(5, "ddd", "different-pkg"),
-            self._make_node(6, "eee", "right-only-pkg"),
-        ]
+    @pytest.mark.parametrize("left_specs,right_specs,expected_counts", [
+        ([(1, "abc", "pkg1")], [(2, "abc", "pkg1")], {DiffType.SAME: 1}),
+        ([(1, "abc", "pkg1")], [(2, "xyz", "pkg1")], {DiffType.DIFFERENT_HASH: 1}),
+        ([(1, "abc", "pkg1")], [], {DiffType.ONLY_LEFT: 1}),
+        ([], [(2, "xyz", "pkg1")], {DiffType.ONLY_RIGHT: 1}),
+        (
+            [(1, "aaa", "same-pkg"), (2, "bbb", "different-pkg"), (3, "ccc", "left-only-pkg")],
+            [(4, "aaa", "same-pkg"), (5, "ddd", "different-pkg"), (6, "eee", "right-only-pkg")],
+            {
+                DiffType.SAME: 1,
+                DiffType.DIFFERENT_HASH: 1,
+                DiffType.ONLY_LEFT: 1,
+                DiffType.ONLY_RIGHT: 1,
+            },
+        ),
+        # Same label on both sides: aaa matches aaa (SAME), bbb matches ccc (DIFFERENT_HASH)
+        (
+            [(1, "aaa", "pkg1"), (2, "bbb", "pkg1")],
+            [(3, "aaa", "pkg1"), (4, "ccc", "pkg1")],
+            {DiffType.SAME: 1, DiffType.DIFFERENT_HASH: 1},
+        ),
+        ([], [], {}),
+    ], ids=["identical", "different_hash", "only_left", "only_right", "mixed", "duplicates", "empty"])
+    def test_match_nodes(self, left_specs, right_specs, expected_counts):
+        """match_nodes should classify each pairing and attach the matching sides"""
+        left = [make_node(*spec) for spec in left_specs]
+        right = [make_node(*spec) for spec in right_specs]
 
         diffs = match_nodes(left, right)
 
-        # Check counts by type
-        same_count = len([d for d in diffs if d.diff_type == DiffType.SAME])
-        different_count = len([d for d in diffs if d.diff_type == DiffType.DIFFERENT_HASH])
-        left_only_count = len([d for d in diffs if d.diff_type == DiffType.ONLY_LEFT])
-        right_only_count = len([d for d in diffs if d.diff_type == DiffType.ONLY_RIGHT])
-
-        assert same_count == 1
-        assert different_count == 1
-        assert left_only_count == 1
-        assert right_only_count == 1
-
-    def test_match_with_duplicates(self):
-        """Test that duplicates in right are handled correctly"""
-        left = [
-            self._make_node(1, "aaa", "pkg1"),
-            self._make_node(2, "bbb", "pkg1"),  # Same label, different hash
-        ]
-        right = [
-            self._make_node(3, "aaa", "pkg1"),
-            self._make_node(4, "ccc", "pkg1"),  # Same label, yet another hash
-        ]
+        assert Counter(d.diff_type for d in diffs) == expected_counts
+        for diff in diffs:
+            assert (diff.left_node is None) == (diff.diff_type == DiffType.ONLY_RIGHT)
+            assert (diff.right_node is None) == (diff.diff_type == DiffType.ONLY_LEFT)
 
-        diffs = match_nodes(left, right)
 
-        # aaa matches aaa (SAME), bbb matches ccc (DIFFERENT_HASH)
-        same_count = len([d for d in diffs if d.diff_type == DiffType.SAME])
-        different_count = len([d for d in diffs if d.diff_type == DiffType.DIFFERENT_HASH])
+_SUMMARY_LEFT_IMPORT = ImportInfo(
+    id=1, name="host1", config_path="/etc/nixos",
+    drv_path="/nix/store/left", imported_at=FIXED_NOW,
+    node_count=0, edge_count=0
+)
+_SUMMARY_RIGHT_IMPORT = ImportInfo(
+    id=2, name="host2", config_path="/etc/nixos",
+    drv_path="/nix/store/right", imported_at=FIXED_NOW,
+    node_count=0, edge_count=0
+)
 
-        assert same_count == 1
-        assert different_count == 1
 
-    def test_match_empty_lists(self):
-        """Empty lists should produce empty result"""
-        diffs = match_nodes([], [])
-        assert len(diffs) == 0
+def _summary_comparison(
+    left_count: int,
+    right_count: int,
+    left_only: int = 0,
+    right_only: int = 0,
+    different: int = 0,
+) -> ImportComparison:
+    """Build a diff-summary comparison from the shared host1/host2 imports"""
+    return ImportComparison(
+        left_import=_SUMMARY_LEFT_IMPORT.model_copy(update={"node_count": left_count}),
+        right_import=_SUMMARY_RIGHT_IMPORT.model_copy(update={"node_count": right_count}),
+        left_only_count=left_only,
+        right_only_count=right_only,
+        different_count=different,
+        same_count=0,
+        all_diffs=[],
+    )
+
+
+# Scenario name -> (_summary_comparison kwargs, phrases the summary must contain)
+_SUMMARY_CASES = {
+    "more_packages": (
+        {"left_count": 100, "right_count": 150, "right_only": 50},
+        ("host2 has 50 more packages than host1", "50 packages only in host2"),
+    ),
+    "fewer_packages": (
+        {"left_count": 150, "right_count": 100, "left_only": 50},
+        ("host2 has 50 fewer packages than host1", "50 packages only in host1"),
+    ),
+    "same_count": (
+        {"left_count": 100, "right_count": 100},
+        ("host2 and host1 have the same number of packages",),
+    ),
+    "different_versions": (
+        {"left_count": 100, "right_count": 100, "different": 25},
+        ("25 packages have different versions",),
+    ),
+    "comprehensive": (
+        {"left_count": 100, "right_count": 120, "left_only": 10, "right_only": 30, "different": 5},
+        (
+            "host2 has 20 more packages than host1",
+            "5 packages have different versions",
+            "10 packages only in host1",
+            "30 packages only in host2",
+        ),
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def summary(request):
+    """Return the diff summary text for the scenario named by request.param.
+
+    generate_diff_summary is pure, so each scenario is rendered once per module
+    however many phrases are checked against it.
+    """
+    fields, _ = _SUMMARY_CASES[request.param]
+    return generate_diff_summary(_summary_comparison(**fields))
 
 
 class TestGenerateDiffSummary:
     """Test the generate_diff_summary function"""
 
-    def _create_comparison(
-        self,
-        left_name: str,
-        right_name: str,
-        left_count: int,
-        right_count: int,
-        left_only: int = 0,
-        right_only: int = 0,
-        different: int = 0,
-    ) -> ImportComparison:
-        """Helper to create a comparison for testing"""
-        left_import = ImportInfo(
-            id=1, name=left_name, config_path="/etc/nixos",
-            drv_path="/nix/store/left", imported_at=datetime.now(),
-            node_count=left_count, edge_count=0
-        )
-        right_import = ImportInfo(
-            id=2, name=right_name, config_path="/etc/nixos",
-            drv_path="/nix/store/right", imported_at=datetime.now(),
-            node_count=right_count, edge_count=0
-        )
-        return ImportComparison(
-            left_import=left_import,
-            right_import=right_import,
-            left_only_count=left_only,
-            right_only_count=right_only,
-            different_count=different,
-            same_count=0,
-            all_diffs=[],
-        )
-
-    def test_summary_more_packages(self):
-        """Summary should describe when right has more packages"""
-        comparison = self._create_comparison("host1", "host2", 100, 150, right_only=50)
-        summary = generate_diff_summary(comparison)
-
-        assert "host2 has 50 more packages than host1" in summary
-        assert "50 packages only in host2" in summary
+    @pytest.mark.parametrize("summary,needle", [
+        (case, needle)
+        for case, (_, needles) in _SUMMARY_CASES.items()
+        for needle in needles
+    ], indirect=["summary"])
+    def test_summary_contains(self, summary, needle):
+        """Summary should describe package count changes, versions and one-sided packages"""
+        assert needle in summary
 
-    def test_summary_fewer_packages(self):
-        """Summary should describe when right has fewer packages"""
-        comparison = self._create_comparison("host1", "host2", 150, 100, left_only=50)
-        summary = generate_diff_summary(comparison)
 
-        assert "host2 has 50 fewer packages than host1" in summary
-        assert "50 packages only in host1" in summary
-
-    def test_summary_same_count(self):
-        """Summary should describe when counts are equal"""
-        comparison = self._create_comparison("host1", "host2", 100, 100)
-        summary = generate_diff_summary(comparison)
-
-        assert "host2 and host1 have the same number of packages" in summary
-
-    def test_summary_different_versions(self):
-        """Summary should mention different versions"""
-        comparison = self._create_comparison("host1", "host2", 100, 100, different=25)
-        summary = generate_diff_summary(comparison)
-
-        assert "25 packages have different versions" in summary
-
-    def test_summary_comprehensive(self):
-        """Summary should include all relevant information"""
-        comparison = self._create_comparison(
-            "host1", "host2", 100, 120,
-            left_only=10, right_only=30, different=5
-        )
-        summary = generate_diff_summary(comparison)
+@pytest.fixture(scope="module")
+def compare_routes():
+    """Import vizzy.routes.compare on first use.
 
-        assert "host2 has 20 more packages than host1" in summary
-        assert "5 packages have different versions" in summary
-        assert "10 packages only in host1" in summary
-        assert "30 packages only in host2" in summary
+    The routes module pulls in FastAPI and Jinja2, so only the tests that
+    exercise it pay for that import.
+    """
+    import vizzy.routes.compare as compare_routes
+    return compare_routes
 
 
 class TestCategorizeDiff:
     """Test the diff categorization functions (Task 5-003)"""
 
-    def test_categorize_desktop_env(self):
-        """Desktop environment packages should be categorized correctly"""
-        assert categorize_diff("gnome-shell-42", None) == DiffCategory.DESKTOP_ENV
-        assert categorize_diff("kde-plasma-5.24", None) == DiffCategory.DESKTOP_ENV
-        assert categorize_diff("gtk3-3.24", None) == DiffCategory.DESKTOP_ENV
-        assert categorize_diff("wayland-1.20", None) == DiffCategory.DESKTOP_ENV
-
-    def test_categorize_system_services(self):
-        """System service packages should be categorized correctly"""
-        assert categorize_diff("systemd-253", None) == DiffCategory.SYSTEM_SERVICES
-        assert categorize_diff("dbus-1.14", None) == DiffCategory.SYSTEM_SERVICES
-        assert categorize_diff("polkit-0.120", None) == DiffCategory.SYSTEM_SERVICES
-
-    def test_categorize_development(self):
-        """Development tools should be categorized correctly"""
-        assert categorize_diff("gcc-13.2", None) == DiffCategory.DEVELOPMENT
-        assert categorize_diff("rustc-1.72", None) == DiffCategory.DEVELOPMENT
-        assert categorize_diff("python3-3.11", None) == DiffCategory.DEVELOPMENT
-        assert categorize_diff("libfoo-dev", None) == DiffCategory.DEVELOPMENT
-
-    def test_categorize_networking(self):
-        """Networking packages should be categorized correctly"""
-        assert categorize_diff("openssh-9.4", None) == DiffCategory.NETWORKING
-        assert categorize_diff("curl-8.0", None) == DiffCategory.NETWORKING
-        assert categorize_diff("openssl-3.1", None) == DiffCategory.NETWORKING
-
-    def test_categorize_multimedia(self):
-        """Multimedia packages should be categorized correctly"""
-        assert categorize_diff("pipewire-0.3", None) == DiffCategory.MULTIMEDIA
-        assert categorize_diff("ffmpeg-6.0", None) == DiffCategory.MULTIMEDIA
-        assert categorize_diff("alsa-lib-1.2", None) == DiffCategory.MULTIMEDIA
-
-    def test_categorize_libraries(self):
-        """Library packages should be categorized correctly"""
-        assert categorize_diff("glibc-2.38", None) == DiffCategory.LIBRARIES
-        assert categorize_diff("zlib-1.3", None) == DiffCategory.LIBRARIES
-        assert categorize_diff("ncurses-6.4", None) == DiffCategory.LIBRARIES
-
-    def test_categorize_fonts(self):
-        """Font packages should be categorized correctly"""
-        assert categorize_diff("noto-fonts-24", None) == DiffCategory.FONTS
-        assert categorize_diff("dejavu-fonts-2.37", None) == DiffCategory.FONTS
-        assert categorize_diff("font-awesome", None) == DiffCategory.FONTS
-
-    def test_categorize_by_package_type(self):
+    # Expected categories are DiffCategory member names, resolved once the
+    # routes module has been imported by the compare_routes fixture
+    @pytest.mark.parametrize("label,package_type,expected", [
+        ("gnome-shell-42", None, "DESKTOP_ENV"),
+        ("kde-plasma-5.24", None, "DESKTOP_ENV"),
+        ("gtk3-3.24", None, "DESKTOP_ENV"),
+        ("wayland-1.20", None, "DESKTOP_ENV"),
+        ("systemd-253", None, "SYSTEM_SERVICES"),
+        ("dbus-1.14", None, "SYSTEM_SERVICES"),
+        ("polkit-0.120", None, "SYSTEM_SERVICES"),
+        ("gcc-13.2", None, "DEVELOPMENT"),
+        ("rustc-1.72", None, "DEVELOPMENT"),
+        ("python3-3.11", None, "DEVELOPMENT"),
+        ("libfoo-dev", None, "DEVELOPMENT"),
+        ("openssh-9.4", None, "NETWORKING"),
+        ("curl-8.0", None, "NETWORKING"),
+        ("openssl-3.1", None, "NETWORKING"),
+        ("pipewire-0.3", None, "MULTIMEDIA"),
+        ("ffmpeg-6.0", None, "MULTIMEDIA"),
+        ("alsa-lib-1.2", None, "MULTIMEDIA"),
+        ("glibc-2.38", None, "LIBRARIES"),
+        ("zlib-1.3", None, "LIBRARIES"),
+        ("ncurses-6.4", None, "LIBRARIES"),
+        ("noto-fonts-24", None, "FONTS"),
+        ("dejavu-fonts-2.37", None, "FONTS"),
+        ("font-awesome", None, "FONTS"),
+        # Unknown packages fall back to OTHER
+        ("random-package-1.0", None, "OTHER"),
+        ("some-unknown-thing", None, "OTHER"),
+    ], ids=[
+        "gnome", "kde", "gtk", "wayland",
+        "systemd", "dbus", "polkit",
+        "gcc", "rustc", "python3", "dev-output",
+        "openssh", "curl", "openssl",
+        "pipewire", "ffmpeg", "alsa",
+        "glibc", "zlib", "ncurses",
+        "noto", "dejavu", "font-awesome",
+        "other-random", "other-unknown",
+    ])
+    def test_categorize_diff(self, compare_routes, label, package_type, expected):
+        """Packages should be categorized by label patterns and package type"""
+        category = compare_routes.categorize_diff(label, package_type)
+        assert category == compare_routes.DiffCategory[expected]
+
+    def test_categorize_by_package_type(self, compare_routes):
         """Should use package_type when available"""
+        categorize_diff = compare_routes.categorize_diff
+        DiffCategory = compare_routes.DiffCategory
         assert categorize_diff("some-font", "font") == DiffCategory.FONTS
         assert categorize_diff("mypackage", "python-package") == DiffCategory.PYTHON
 
-    def test_categorize_other(self):
-        """Unknown packages should be categorized as OTHER"""
-        assert categorize_diff("random-package-1.0", None) == DiffCategory.OTHER
-        assert categorize_diff("some-unknown-thing", None) == DiffCategory.OTHER
-
-    def test_categorize_diffs_groups_correctly(self):
+    def test_categorize_diffs_groups_correctly(self, compare_routes):
         """categorize_diffs should group diffs by category"""
         diffs = [
             NodeDiff(label="gnome-shell", package_type=None, diff_type=DiffType.ONLY_LEFT),
@@ -788,7 +612,8 @@ class TestCategorizeDiff:
             NodeDiff(label="unknown-pkg", package_type=None, diff_type=DiffType.ONLY_LEFT),
         ]
 
-        categorized = categorize_diffs(diffs)
+        categorized = compare_routes.categorize_diffs(diffs)
+        DiffCategory = compare_routes.DiffCategory
 
         assert DiffCategory.DESKTOP_ENV in categorized
         assert DiffCategory.SYSTEM_SERVICES in categorized
@@ -798,67 +623,83 @@ class TestCategorizeDiff:
         assert len(categorized[DiffCategory.OTHER]) == 1
 
 
+class TestCategoryMatcher:
+    """Test the trie-backed CategoryMatcher against a linear rule scan"""
+
+    @staticmethod
+    def _linear_match(patterns, label):
+        for category, rules in patterns.items():
+            if any(re.search(rule, label, re.IGNORECASE) for rule in rules):
+                return category
+        return None
+
+    @pytest.mark.parametrize("label", [
+        "gnome-shell-42", "GNOME-shell", "gtk3-3.24", "qt5-base",
+        "systemd-253", "foo-service", "python3-3.11", "python3.11-requests",
+        "noto-fonts-24", "dejavu-fonts-2.37", "my-font", "libfoo-dev",
+        "glibc-2.38", "gnupg-2.4", "man-pages-6", "bash-doc",
+        "make-4.4", "makedepend", "xz-5.4", "random-package-1.0", "",
+    ])
+    def test_matches_linear_scan(self, label):
+        """Trie and residual regexes should pick the same category as scanning rules in order"""
+        matcher = CategoryMatcher(SERVICE_CATEGORY_PATTERNS)
+        assert matcher.match(label) == self._linear_match(SERVICE_CATEGORY_PATTERNS, label)
+
+    def test_rule_order_wins_over_prefix_length(self):
+        """An earlier category should win even when a later one has a longer prefix"""
+        matcher = CategoryMatcher({
+            ServiceDiffCategory.DEVELOPMENT: [r"-dev$"],
+            ServiceDiffCategory.FONTS: [r"^noto-fonts"],
+        })
+        assert matcher.match("noto-fonts-dev") == ServiceDiffCategory.DEVELOPMENT
+        assert matcher.match("noto-fonts-24") == ServiceDiffCategory.FONTS
+        assert matcher.match("other") is None
+
+
 class TestScoreDiffImportance:
     """Test the importance scoring function"""
 
-    def test_score_application_higher(self):
+    def test_score_application_higher(self, compare_routes):
         """Applications should score higher than libraries"""
         app_diff = NodeDiff(
             label="firefox",
             package_type="application",
             diff_type=DiffType.ONLY_RIGHT,
-            right_node=Node(
-                id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-                label="firefox", package_type="application", depth=0,
-                closure_size=100, metadata=None
-            )
+            right_node=make_node(1, "a", "firefox", "application")
         )
         lib_diff = NodeDiff(
             label="libfoo",
             package_type="library",
             diff_type=DiffType.ONLY_RIGHT,
-            right_node=Node(
-                id=2, import_id=1, drv_hash="b", drv_name="b.drv",
-                label="libfoo", package_type="library", depth=0,
-                closure_size=100, metadata=None
-            )
+            right_node=make_node(2, "b", "libfoo", "library")
         )
 
-        assert score_diff_importance(app_diff) > score_diff_importance(lib_diff)
+        score = compare_routes.score_diff_importance
+        assert score(app_diff) > score(lib_diff)
 
-    def test_score_kernel_highest(self):
+    def test_score_kernel_highest(self, compare_routes):
         """Kernel packages should score very high"""
         kernel_diff = NodeDiff(
             label="linux-kernel",
             package_type="kernel",
             diff_type=DiffType.ONLY_RIGHT,
-            right_node=Node(
-                id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-                label="linux-kernel", package_type="kernel", depth=0,
-                closure_size=100, metadata=None
-            )
+            right_node=make_node(1, "a", "linux-kernel", "kernel")
         )
 
-        assert score_diff_importance(kernel_diff) >= 6
+        assert compare_routes.score_diff_importance(kernel_diff) >= 6
 
-    def test_sort_by_importance(self):
+    def test_sort_by_importance(self, compare_routes):
         """sort_diffs_by_importance should order diffs correctly"""
         diffs = [
             NodeDiff(label="libfoo", package_type="library", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-                                    label="libfoo", package_type="library", depth=0,
-                                    closure_size=10, metadata=None)),
+                     right_node=make_node(1, "a", "libfoo", "library", closure_size=10)),
             NodeDiff(label="linux-kernel", package_type="kernel", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=2, import_id=1, drv_hash="b", drv_name="b.drv",
-                                    label="linux-kernel", package_type="kernel", depth=0,
-                                    closure_size=1000, metadata=None)),
+                     right_node=make_node(2, "b", "linux-kernel", "kernel", closure_size=1000)),
             NodeDiff(label="firefox", package_type="application", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=3, import_id=1, drv_hash="c", drv_name="c.drv",
-                                    label="firefox", package_type="application", depth=0,
-                                    closure_size=500, metadata=None)),
+                     right_node=make_node(3, "c", "firefox", "application", closure_size=500)),
         ]
 
-        sorted_diffs = sort_diffs_by_importance(diffs)
+        sorted_diffs = compare_routes.sort_diffs_by_importance(diffs)
 
         # Kernel should be first (highest score)
         assert sorted_diffs[0].label == "linux-kernel"
@@ -869,16 +710,22 @@ class TestScoreDiffImportance:
 class TestPackageTraceComparison:
     """Test the package trace comparison functionality (Task 5-003)"""
 
-    def test_compare_package_traces_package_not_found(self):
+    @pytest.fixture(autouse=True)
+    def _clear_trace_cache(self, compare_routes):
+        compare_routes.cache.invalidate("cmp_trace")
+        yield
+        compare_routes.cache.invalidate("cmp_trace")
+
+    def test_compare_package_traces_package_not_found(self, compare_routes):
         """When package doesn't exist in either, should return empty result"""
         with patch('vizzy.routes.compare.get_db') as mock_get_db:
             mock_conn = MagicMock()
             mock_cursor = MagicMock()
             mock_get_db.return_value.__enter__.return_value = mock_conn
             mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = None
+            mock_cursor.fetchall.return_value = []
 
-            result = compare_package_traces(1, 2, "nonexistent-package")
+            result = compare_routes.compare_package_traces(1, 2, "nonexistent-package")
 
             assert result["package"] == "nonexistent-package"
             assert result["left_node"] is None
@@ -888,7 +735,7 @@ class TestPackageTraceComparison:
             assert result["same_hash"] is False
             assert result["in_both"] is False
 
-    def test_compare_package_traces_only_left(self):
+    def test_compare_package_traces_only_left(self, compare_routes):
         """When package only exists in left, should return left info only"""
         left_node = {
             "id": 1,
@@ -904,21 +751,21 @@ class TestPackageTraceComparison:
                 mock_get_db.return_value.__enter__.return_value = mock_conn
                 mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-                # First call returns left node, second returns None (not in right)
-                mock_cursor.fetchone.side_effect = [left_node, None]
+                # Only the left import has a matching row
+                mock_cursor.fetchall.return_value = [{"import_id": 1, **left_node}]
                 mock_paths.return_value = [[{"id": 1, "label": "openssl-3.0"}]]
 
-                result = compare_package_traces(1, 2, "openssl-3.0")
+                result = compare_routes.compare_package_traces(1, 2, "openssl-3.0")
 
                 assert result["package"] == "openssl-3.0"
                 assert result["left_node"] is not None
-                assert result["left_node"]["drv_hash"] == "abc123"
+                assert result["left_node"] == left_node
                 assert result["right_node"] is None
                 assert len(result["left_paths"]) == 1
                 assert result["right_paths"] == []
                 assert result["in_both"] is False
 
-    def test_compare_package_traces_same_hash(self):
+    def test_compare_package_traces_same_hash(self, compare_routes):
         """When package exists in both with same hash, should indicate same_hash"""
         left_node = {
             "id": 1,
@@ -940,15 +787,18 @@ class TestPackageTraceComparison:
                 mock_get_db.return_value.__enter__.return_value = mock_conn
                 mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-                mock_cursor.fetchone.side_effect = [left_node, right_node]
+                mock_cursor.fetchall.return_value = [
+                    {"import_id": 1, **left_node},
+                    {"import_id": 2, **right_node},
+                ]
                 mock_paths.return_value = [[{"id": 1, "label": "openssl-3.0"}]]
 
-                result = compare_package_traces(1, 2, "openssl-3.0")
+                result = compare_routes.compare_package_traces(1, 2, "openssl-3.0")
 
                 assert result["in_both"] is True
                 assert result["same_hash"] is True
 
-    def test_compare_package_traces_different_hash(self):
+    def test_compare_package_traces_different_hash(self, compare_routes):
         """When package exists in both with different hash, should indicate different"""
         left_node = {
             "id": 1,
@@ -970,14 +820,75 @@ class TestPackageTraceComparison:
                 mock_get_db.return_value.__enter__.return_value = mock_conn
                 mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-                mock_cursor.fetchone.side_effect = [left_node, right_node]
+                mock_cursor.fetchall.return_value = [
+                    {"import_id": 1, **left_node},
+                    {"import_id": 2, **right_node},
+                ]
                 mock_paths.return_value = [[{"id": 1, "label": "openssl-3.0"}]]
 
-                result = compare_package_traces(1, 2, "openssl-3.0")
+                result = compare_routes.compare_package_traces(1, 2, "openssl-3.0")
 
                 assert result["in_both"] is True
                 assert result["same_hash"] is False
 
+    @pytest.mark.parametrize("left_hash,right_hash,in_both,same_hash", [
+        ("abc123", "abc123", True, True),
+        ("abc123", "xyz789", True, False),
+        ("abc123", None, False, False),
+        (None, None, False, False),
+    ])
+    def test_diff_package_nodes(self, compare_routes, left_hash, right_hash, in_both, same_hash):
+        """The pure diff helper should derive the flags from the two rows alone"""
+        left = {"id": 1, "drv_hash": left_hash} if left_hash else None
+        right = {"id": 2, "drv_hash": right_hash} if right_hash else None
+
+        result = compare_routes._diff_package_nodes("openssl-3.0", left, right)
+
+        assert result["in_both"] is in_both
+        assert result["same_hash"] is same_hash
+        assert result["left_node"] == left
+        assert result["right_node"] == right
+        assert result["left_paths"] == result["right_paths"] == []
+
+    def test_compare_package_traces_cached(self, compare_routes):
+        """Repeated traces should be served from cache without touching the DB"""
+        with patch('vizzy.routes.compare.get_db') as mock_get_db:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_get_db.return_value.__enter__.return_value = mock_conn
+            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+            mock_cursor.fetchall.return_value = []
+
+            first = compare_routes.compare_package_traces(1, 2, "nonexistent-package")
+            second = compare_routes.compare_package_traces(1, 2, "nonexistent-package")
+
+            assert second == first
+            assert mock_get_db.call_count == 1
+
+            # Callers get their own copy; mutating one must not leak into later hits
+            first["left_paths"].append(["mutated"])
+            third = compare_routes.compare_package_traces(1, 2, "nonexistent-package")
+            assert third["left_paths"] == []
+            assert mock_get_db.call_count == 1
+
+    @pytest.mark.parametrize("deleted_import", [1, 2])
+    def test_compare_package_traces_cache_dropped_with_either_import(
+        self, compare_routes, deleted_import
+    ):
+        """Deleting either import must drop the cached trace"""
+        with patch('vizzy.routes.compare.get_db') as mock_get_db:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_get_db.return_value.__enter__.return_value = mock_conn
+            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+            mock_cursor.fetchall.return_value = []
+
+            compare_routes.compare_package_traces(1, 2, "nonexistent-package")
+            compare_routes.cache.invalidate_import(deleted_import)
+            compare_routes.compare_package_traces(1, 2, "nonexistent-package")
+
+            assert mock_get_db.call_count == 2
+
 
 class TestSemanticDiffGrouping:
     """Test the semantic diff grouping functions (Task 8F-001)"""
@@ -986,51 +897,35 @@ class TestSemanticDiffGrouping:
         """Create a sample comparison for testing semantic grouping"""
         left_import = ImportInfo(
             id=1, name="host1", config_path="/etc/nixos",
-            drv_path="/nix/store/abc", imported_at=datetime.now(),
+            drv_path="/nix/store/abc", imported_at=FIXED_NOW,
             node_count=100, edge_count=200
         )
         right_import = ImportInfo(
             id=2, name="host2", config_path="/etc/nixos",
-            drv_path="/nix/store/xyz", imported_at=datetime.now(),
+            drv_path="/nix/store/xyz", imported_at=FIXED_NOW,
             node_count=120, edge_count=240
         )
 
         diffs = [
             # Desktop environment packages (only in left)
             NodeDiff(label="gnome-shell-42", package_type="app", diff_type=DiffType.ONLY_LEFT,
-                     left_node=Node(id=1, import_id=1, drv_hash="a", drv_name="a.drv",
-                                   label="gnome-shell-42", package_type="app", depth=0,
-                                   closure_size=500, metadata=None)),
+                     left_node=make_node(1, "a", "gnome-shell-42", "app", closure_size=500)),
             # System services (only in right)
             NodeDiff(label="systemd-253", package_type="service", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=2, import_id=2, drv_hash="b", drv_name="b.drv",
-                                    label="systemd-253", package_type="service", depth=0,
-                                    closure_size=100, metadata=None)),
+                     right_node=make_node(2, "b", "systemd-253", "service", import_id=2)),
             NodeDiff(label="dbus-1.14", package_type="service", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=3, import_id=2, drv_hash="c", drv_name="c.drv",
-                                    label="dbus-1.14", package_type="service", depth=0,
-                                    closure_size=50, metadata=None)),
+                     right_node=make_node(3, "c", "dbus-1.14", "service", import_id=2, closure_size=50)),
             # Libraries (different hash)
             NodeDiff(label="glibc-2.38", package_type="lib", diff_type=DiffType.DIFFERENT_HASH,
-                     left_node=Node(id=4, import_id=1, drv_hash="d", drv_name="d.drv",
-                                   label="glibc-2.38", package_type="lib", depth=0,
-                                   closure_size=200, metadata=None),
-                     right_node=Node(id=5, import_id=2, drv_hash="e", drv_name="e.drv",
-                                    label="glibc-2.38", package_type="lib", depth=0,
-                                    closure_size=220, metadata=None)),
+                     left_node=make_node(4, "d", "glibc-2.38", "lib", closure_size=200),
+                     right_node=make_node(5, "e", "glibc-2.38", "lib", import_id=2, closure_size=220)),
             # Fonts (only in right)
             NodeDiff(label="noto-fonts-24", package_type="font", diff_type=DiffType.ONLY_RIGHT,
-                     right_node=Node(id=6, import_id=2, drv_hash="f", drv_name="f.drv",
-                                    label="noto-fonts-24", package_type="font", depth=0,
-                                    closure_size=30, metadata=None)),
+                     right_node=make_node(6, "f", "noto-fonts-24", "font", import_id=2, closure_size=30)),
             # Same packages (should be counted but not as changes)
             NodeDiff(label="zlib-1.3", package_type="lib", diff_type=DiffType.SAME,
-                     left_node=Node(id=7, import_id=1, drv_hash="g", drv_name="g.drv",
-                                   label="zlib-1.3", package_type="lib", depth=0,
-                                   closure_size=10, metadata=None),
-                     right_node=Node(id=8, import_id=2, drv_hash="g", drv_name="g.drv",
-                                    label="zlib-1.3", package_type="lib", depth=0,
-                                    closure_size=10, metadata=None)),
+                     left_node=make_node(7, "g", "zlib-1.3", "lib", closure_size=10),
+                     right_node=make_node(8, "g", "zlib-1.3", "lib", import_id=2, closure_size=10)),
         ]
 
         return ImportComparison(
@@ -1147,3 +1042,27 @@ class TestSemanticDiffGrouping:
             assert summary.left_only_count == 0
             assert summary.different_count == 0
             assert summary.same_count == 0
+
+    @pytest.mark.parametrize("n", [0, 1, 3, 10])
+    def test_top_n_by_importance_matches_full_sort(self, n):
+        """top_n_by_importance should equal the head of the full importance sort"""
+        diffs = self._create_sample_comparison().all_diffs
+        assert top_n_by_importance(diffs, n) == sort_diffs_by_importance(diffs)[:n]
+
+    @pytest.mark.parametrize("label,package_type,expected", [
+        ("python3-requests-2.31", "library", "LIBRARIES"),
+        ("gnome-fonts-1.0", "font", "FONTS"),
+        ("linux-6.6.8", "kernel", "SYSTEM_SERVICES"),
+        ("python3-requests-2.31", None, "PYTHON"),
+        ("python3-requests-2.31", "unknown", "PYTHON"),
+    ])
+    def test_package_type_takes_precedence(self, label, package_type, expected):
+        """A known package_type should decide the category before label patterns"""
+        category = service_categorize_diff(label, package_type)
+        assert category == ServiceDiffCategory[expected]
+
+    def test_sort_by_importance_matches_float_score(self):
+        """The packed integer sort key should order diffs like the float score"""
+        diffs = self._create_sample_comparison().all_diffs
+        expected = sorted(diffs, key=score_diff_importance, reverse=True)
+        assert sort_diffs_by_importance(diffs) == expected
@@ -15,8 +15,16 @@ from vizzy.services.dashboard import (
     get_dashboard_summary,
     get_top_contributors,
     get_type_distribution,
+    get_dashboard_bundle,
     get_health_indicators,
 )
+from vizzy.routes.api import (
+    DashboardSummaryResponse,
+    DepthStatsResponse,
+    TopContributorResponse,
+    TypeDistributionResponse,
+    TypeDistributionEntryResponse,
+)
 
 
 # =============================================================================
@@ -183,6 +191,69 @@ class TestGetTypeDistribution:
         mock_get_db.assert_not_called()
 
 
+class TestGetDashboardBundle:
+    """Tests for get_dashboard_bundle function."""
+
+    @patch('vizzy.services.dashboard.get_db')
+    @patch('vizzy.services.dashboard.cache')
+    def test_returns_empty_for_missing_import(self, mock_cache, mock_get_db):
+        """Test that a missing import yields no summary and empty lists."""
+        mock_cache.get.return_value = None
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_get_db.return_value.__enter__.return_value = mock_conn
+
+        result = get_dashboard_bundle(999)
+
+        assert result == (None, [], [])
+        mock_cache.set.assert_not_called()
+
+    @patch('vizzy.services.dashboard._attach_baseline_comparison')
+    @patch('vizzy.services.dashboard.get_db')
+    @patch('vizzy.services.dashboard.cache')
+    def test_fetches_everything_over_one_connection(self, mock_cache, mock_get_db, mock_baseline):
+        """Test that a cold bundle uses one connection and fills every cache entry."""
+        mock_cache.get.return_value = None
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.side_effect = [
+            {'node_count': 100, 'edge_count': 200},
+            {'redundant_count': 10, 'total_count': 200},
+            {'runtime_count': 150, 'build_count': 50, 'classified_count': 200},
+            {'max_depth': 6, 'avg_depth': 3.0, 'median_depth': 3.0},
+            {'total': 100},
+        ]
+        mock_cursor.fetchall.side_effect = [
+            [{'id': 1, 'label': 'firefox', 'closure_size': 2340,
+              'package_type': 'application', 'unique_contribution': 1200}],
+            [{'package_type': 'library', 'count': 60, 'total_closure_size': 5000}],
+        ]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_get_db.return_value.__enter__.return_value = mock_conn
+
+        summary, contributors, distribution = get_dashboard_bundle(1)
+
+        assert mock_get_db.call_count == 1
+        assert summary.total_nodes == 100
+        assert summary.redundancy_score == 0.05
+        assert [c.label for c in contributors] == ["firefox"]
+        assert distribution[0].percentage == 60.0
+        assert mock_cache.set.call_count == 3
+
+    @patch('vizzy.services.dashboard.get_db')
+    @patch('vizzy.services.dashboard.cache')
+    def test_returns_cached_bundle(self, mock_cache, mock_get_db):
+        """Test that a fully cached bundle does not touch the database."""
+        mock_cache.get.return_value = []
+
+        result = get_dashboard_bundle(1)
+
+        assert result == ([], [], [])
+        mock_get_db.assert_not_called()
+
+
 class TestGetHealthIndicators:
     """Tests for get_health_indicators function."""
 
@@ -254,11 +325,6 @@ class TestAPIResponseSchemas:
 
     def test_dashboard_summary_response_schema(self):
         """Verify DashboardSummaryResponse matches spec."""
-        from vizzy.routes.api import (
-            DashboardSummaryResponse,
-            DepthStatsResponse,
-        )
-
         response = DashboardSummaryResponse(
             total_nodes=45234,
             total_edges=123456,
@@ -280,8 +346,6 @@ class TestAPIResponseSchemas:
 
     def test_top_contributor_response_schema(self):
         """Verify TopContributorResponse matches spec."""
-        from vizzy.routes.api import TopContributorResponse
-
         response = TopContributorResponse(
             node_id=123,
             label="firefox",
@@ -299,11 +363,6 @@ class TestAPIResponseSchemas:
 
     def test_type_distribution_response_schema(self):
         """Verify TypeDistributionResponse matches spec."""
-        from vizzy.routes.api import (
-            TypeDistributionResponse,
-            TypeDistributionEntryResponse,
-        )
-
         response = TypeDistributionResponse(
             types=[
                 TypeDistributionEntryResponse(type="library", count=20000, percentage=45.0),
@@ -70,89 +70,49 @@ def make_path(
 class TestEssentialityStatusEnum:
     """Test the enhanced EssentialityStatus enum"""
 
-    def test_essential_value(self):
-        """ESSENTIAL should have correct value"""
-        assert EssentialityStatus.ESSENTIAL.value == "essential"
-
-    def test_essential_single_value(self):
-        """ESSENTIAL_SINGLE should have correct value"""
-        assert EssentialityStatus.ESSENTIAL_SINGLE.value == "essential_single"
-
-    def test_essential_deep_value(self):
-        """ESSENTIAL_DEEP should have correct value"""
-        assert EssentialityStatus.ESSENTIAL_DEEP.value == "essential_deep"
-
-    def test_removable_value(self):
-        """REMOVABLE should have correct value"""
-        assert EssentialityStatus.REMOVABLE.value == "removable"
-
-    def test_build_only_value(self):
-        """BUILD_ONLY should have correct value"""
-        assert EssentialityStatus.BUILD_ONLY.value == "build_only"
-
-    def test_orphan_value(self):
-        """ORPHAN should have correct value"""
-        assert EssentialityStatus.ORPHAN.value == "orphan"
-
-    def test_is_essential_category_essential(self):
-        """ESSENTIAL should be in essential category"""
-        assert EssentialityStatus.ESSENTIAL.is_essential_category is True
-
-    def test_is_essential_category_essential_single(self):
-        """ESSENTIAL_SINGLE should be in essential category"""
-        assert EssentialityStatus.ESSENTIAL_SINGLE.is_essential_category is True
-
-    def test_is_essential_category_essential_deep(self):
-        """ESSENTIAL_DEEP should be in essential category"""
-        assert EssentialityStatus.ESSENTIAL_DEEP.is_essential_category is True
-
-    def test_is_essential_category_removable(self):
-        """REMOVABLE should not be in essential category"""
-        assert EssentialityStatus.REMOVABLE.is_essential_category is False
-
-    def test_is_removable_category_removable(self):
-        """REMOVABLE should be in removable category"""
-        assert EssentialityStatus.REMOVABLE.is_removable_category is True
-
-    def test_is_removable_category_build_only(self):
-        """BUILD_ONLY should be in removable category"""
-        assert EssentialityStatus.BUILD_ONLY.is_removable_category is True
-
-    def test_is_removable_category_orphan(self):
-        """ORPHAN should be in removable category"""
-        assert EssentialityStatus.ORPHAN.is_removable_category is True
-
-    def test_is_removable_category_essential(self):
-        """ESSENTIAL should not be in removable category"""
-        assert EssentialityStatus.ESSENTIAL.is_removable_category is False
-
-    def test_display_name_essential(self):
-        """ESSENTIAL should have correct display name"""
-        assert EssentialityStatus.ESSENTIAL.display_name == "Essential"
-
-    def test_display_name_essential_single(self):
-        """ESSENTIAL_SINGLE should have correct display name"""
-        assert EssentialityStatus.ESSENTIAL_SINGLE.display_name == "Essential (Single Dependent)"
-
-    def test_display_name_essential_deep(self):
-        """ESSENTIAL_DEEP should have correct display name"""
-        assert EssentialityStatus.ESSENTIAL_DEEP.display_name == "Essential (Deeply Nested)"
-
-    def test_display_name_orphan(self):
-        """ORPHAN should have correct display name"""
-        assert EssentialityStatus.ORPHAN.display_name == "Orphan"
-
-    def test_description_essential(self):
-        """ESSENTIAL should have correct description"""
-        assert "multiple top-level" in EssentialityStatus.ESSENTIAL.description
-
-    def test_description_essential_single(self):
-        """ESSENTIAL_SINGLE should have correct description"""
-        assert "only one top-level" in EssentialityStatus.ESSENTIAL_SINGLE.description
-
-    def test_description_orphan(self):
-        """ORPHAN should have correct description"""
-        assert "No path" in EssentialityStatus.ORPHAN.description
+    @pytest.mark.parametrize("member,value", [
+        (EssentialityStatus.ESSENTIAL, "essential"),
+        (EssentialityStatus.ESSENTIAL_SINGLE, "essential_single"),
+        (EssentialityStatus.ESSENTIAL_DEEP, "essential_deep"),
+        (EssentialityStatus.REMOVABLE, "removable"),
+        (EssentialityStatus.BUILD_ONLY, "build_only"),
+        (EssentialityStatus.ORPHAN, "orphan"),
+    ])
+    def test_value(self, member, value):
+        """Each status should have the correct value"""
+        assert member.value == value
+
+    @pytest.mark.parametrize("member,essential", [
+        (EssentialityStatus.ESSENTIAL, True),
+        (EssentialityStatus.ESSENTIAL_SINGLE, True),
+        (EssentialityStatus.ESSENTIAL_DEEP, True),
+        (EssentialityStatus.REMOVABLE, False),
+        (EssentialityStatus.BUILD_ONLY, False),
+        (EssentialityStatus.ORPHAN, False),
+    ])
+    def test_category(self, member, essential):
+        """Each status should be in exactly one of the two categories"""
+        assert member.is_essential_category is essential
+        assert member.is_removable_category is not essential
+
+    @pytest.mark.parametrize("member,display_name", [
+        (EssentialityStatus.ESSENTIAL, "Essential"),
+        (EssentialityStatus.ESSENTIAL_SINGLE, "Essential (Single Dependent)"),
+        (EssentialityStatus.ESSENTIAL_DEEP, "Essential (Deeply Nested)"),
+        (EssentialityStatus.ORPHAN, "Orphan"),
+    ])
+    def test_display_name(self, member, display_name):
+        """Statuses should have the correct display name"""
+        assert member.display_name == display_name
+
+    @pytest.mark.parametrize("member,fragment", [
+        (EssentialityStatus.ESSENTIAL, "multiple top-level"),
+        (EssentialityStatus.ESSENTIAL_SINGLE, "only one top-level"),
+        (EssentialityStatus.ORPHAN, "No path"),
+    ])
+    def test_description(self, member, fragment):
+        """Statuses should have the correct description"""
+        assert fragment in member.description
 
 
 # =============================================================================
@@ -185,6 +145,25 @@ class TestRemovalImpactModel:
         assert impact.closure_reduction == 3
         assert impact.removal_safe is False
 
+    def test_derived_fields_follow_model_copy(self):
+        """impact_level and summary should be recomputed for an updated copy"""
+        impact = RemovalImpact(
+            target=make_node(1, "lib"),
+            essentiality=EssentialityStatus.ORPHAN,
+            affected_packages=[],
+            unique_deps_removed=[],
+            closure_reduction=0,
+            removal_safe=True,
+        )
+        assert impact.impact_level == "safe"
+        assert impact.summary == "Safe to remove. No closure impact."
+
+        copied = impact.model_copy(update={"removal_safe": False})
+
+        assert copied.impact_level != "safe"
+        assert copied.summary != "Safe to remove. No closure impact."
+        assert copied.model_dump()["impact_level"] == copied.impact_level
+
     def test_affected_count(self):
         """Should count affected packages correctly"""
         target = make_node(1, "openssl")
@@ -469,23 +448,35 @@ class TestEssentialityAnalysisModel:
 
         assert analysis.depth_category == "direct"
 
-    def test_depth_category_shallow(self):
-        """Should return 'shallow' for low depth"""
-        analysis = self._make_basic_analysis(path_depth_avg=1.5, is_direct=False)
-
+    @pytest.mark.parametrize("path_depth_avg,expected", [
+        (1.5, "shallow"),
+        (2.0, "shallow"),
+        (3.5, "moderate"),
+        (5.0, "moderate"),
+        (7.0, "deep"),
+    ])
+    def test_depth_category(self, path_depth_avg, expected):
+        """Should bin the average depth, with inclusive upper bounds"""
+        analysis = self._make_basic_analysis(path_depth_avg=path_depth_avg, is_direct=False)
+
+        assert analysis.depth_category == expected
+
+    def test_derived_fields_follow_model_copy(self):
+        """Derived fields should be recomputed for a copy with updated inputs"""
+        analysis = self._make_basic_analysis(
+            runtime_dependents=1, build_dependents=0, path_depth_avg=1.5
+        )
+        assert analysis.total_dependents == 1
         assert analysis.depth_category == "shallow"
 
-    def test_depth_category_moderate(self):
-        """Should return 'moderate' for moderate depth"""
-        analysis = self._make_basic_analysis(path_depth_avg=3.5, is_direct=False)
-
-        assert analysis.depth_category == "moderate"
+        copied = analysis.model_copy(update={"path_depth_avg": 9.0, "runtime_dependents": 5})
 
-    def test_depth_category_deep(self):
-        """Should return 'deep' for high depth"""
-        analysis = self._make_basic_analysis(path_depth_avg=7.0, is_direct=False)
-
-        assert analysis.depth_category == "deep"
+        assert copied.total_dependents == 5
+        assert copied.depth_category == "deep"
+        assert "5 runtime dependencies" in copied.dependency_type_summary
+        dumped = copied.model_dump()
+        assert dumped["total_dependents"] == 5
+        assert dumped["depth_category"] == "deep"
 
     def test_action_guidance_orphan(self):
         """Should provide orphan guidance"""
@@ -528,6 +519,19 @@ class TestEssentialityAnalysisModel:
 
         assert "firefox" in analysis.action_guidance
 
+    def test_action_guidance_follows_model_copy(self):
+        """action_guidance should reflect a status updated through model_copy"""
+        analysis = self._make_basic_analysis(status=EssentialityStatus.ESSENTIAL)
+        assert "cannot be removed" in analysis.action_guidance.lower()
+
+        copied = analysis.model_copy(
+            update={"status": EssentialityStatus.ORPHAN, "path_depth_avg": 9.0}
+        )
+
+        assert "unused" in copied.action_guidance.lower()
+        assert copied.depth_category == "deep"
+        assert copied.model_dump()["action_guidance"] == copied.action_guidance
+
     def test_action_guidance_essential_deep(self):
         """Should provide deep dependency guidance"""
         analysis = self._make_basic_analysis(status=EssentialityStatus.ESSENTIAL_DEEP)
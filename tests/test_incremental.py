@@ -1,5 +1,9 @@
 """Tests for incremental recomputation service (Task 8A-008)"""
 
+import dataclasses
+from contextlib import ExitStack
+
+import psycopg
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
@@ -27,78 +31,109 @@ from vizzy.services.incremental import (
 )
 
 
-class TestStalenessReport:
-    """Test the StalenessReport dataclass"""
+# Fixed reference time for computation timestamps in mocked rows and reports
+NOW = datetime(2024, 1, 1, 12, 0, 0)
 
-    def test_stale_percentage_with_nodes(self):
-        """Stale percentage should be calculated correctly"""
-        report = StalenessReport(
-            import_id=1,
-            total_top_level=100,
-            stale_count=25,
-            never_computed_count=10,
-            oldest_computation=None,
-            newest_computation=None,
-            freshness_threshold=timedelta(hours=24),
-            is_fresh=False,
-        )
-        assert report.stale_percentage == 25.0
+# Freshness thresholds and computation ages used across the staleness tests
+TD_1H = timedelta(hours=1)
+TD_24H = timedelta(hours=24)
+TD_7D = timedelta(days=7)
 
-    def test_stale_percentage_zero_total(self):
-        """Stale percentage should be 0 when no top-level nodes"""
-        report = StalenessReport(
-            import_id=1,
-            total_top_level=0,
-            stale_count=0,
-            never_computed_count=0,
-            oldest_computation=None,
-            newest_computation=None,
-            freshness_threshold=timedelta(hours=24),
-            is_fresh=True,
-        )
-        assert report.stale_percentage == 0.0
+# Baseline recomputation result (frozen, so safe to share); tests override only
+# the fields they care about
+_DEFAULT_RESULT = RecomputationResult(
+    import_id=1,
+    nodes_updated=0,
+    nodes_skipped=0,
+    computation_time_ms=0.0,
+    strategy_used='selective',
+)
 
-    def test_needs_recomputation_stale(self):
-        """Needs recomputation when stale count > 0"""
-        report = StalenessReport(
-            import_id=1,
-            total_top_level=100,
-            stale_count=5,
-            never_computed_count=0,
-            oldest_computation=None,
-            newest_computation=None,
-            freshness_threshold=timedelta(hours=24),
-            is_fresh=False,
-        )
-        assert report.needs_recomputation is True
+# Mocked cursor rows, built once and shared; the service only iterates them
+_EDGE_CHANGE_ROWS = ({'top_level_id': 1}, {'top_level_id': 5}, {'top_level_id': 10})
+_NODE_CHANGE_ROWS = ({'id': 1}, {'id': 2})
+_TOP_LEVEL_ROWS = tuple({'id': i} for i in range(1, 5))
+_STALE_60 = tuple({'id': i} for i in range(60))  # 60 of 100 top-level -> full recompute
 
-    def test_needs_recomputation_never_computed(self):
-        """Needs recomputation when never_computed_count > 0"""
+# Expected affected top-level ids for the rows above
+_AFFECTED_EDGE = frozenset((1, 5, 10))
+_AFFECTED_NODE = frozenset((1, 2))
+_AFFECTED_TOPLVL = frozenset((1, 2, 3, 4))
+
+
+def make_result(**overrides) -> RecomputationResult:
+    """Return a copy of the baseline RecomputationResult with overrides applied.
+
+    List fields not overridden are shared with the baseline; don't mutate them.
+    """
+    return dataclasses.replace(_DEFAULT_RESULT, **overrides)
+
+
+# recompute_stale_contributions outcomes for two imports: first fails, second succeeds
+_ERR_RR_SIDE_EFFECTS = (
+    Exception("Database error"),
+    make_result(
+        import_id=2, nodes_updated=10, computation_time_ms=100.0,
+        strategy_used='incremental',
+    ),
+)
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """Patch the incremental service's get_db; returns (connection, cursor) mocks."""
+    # spec_set limits the mocks to the real psycopg API, so typos fail loudly
+    mock_conn = MagicMock(spec_set=psycopg.Connection)
+    mock_cursor = MagicMock(spec_set=psycopg.Cursor)
+    mock_get_db = MagicMock()
+    mock_get_db.return_value.__enter__.return_value = mock_conn
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    monkeypatch.setattr('vizzy.services.incremental.get_db', mock_get_db)
+    return mock_conn, mock_cursor
+
+
+@pytest.fixture
+def patches(request):
+    """Patch the incremental service names given by indirect parametrization.
+
+    All patches are entered on one ExitStack; returns mocks keyed by name.
+    """
+    with ExitStack() as stack:
+        yield {
+            name: stack.enter_context(patch(f'vizzy.services.incremental.{name}'))
+            for name in request.param
+        }
+
+
+class TestStalenessReport:
+    """Test the StalenessReport dataclass"""
+
+    @pytest.mark.parametrize(
+        "total,stale,never_computed,is_fresh,stale_percentage,needs_recomputation",
+        [
+            (100, 25, 10, False, 25.0, True),
+            (0, 0, 0, True, 0.0, False),  # no top-level nodes
+            (100, 5, 0, False, 5.0, True),  # stale only
+            (100, 0, 10, False, 0.0, True),  # never computed only
+            (100, 0, 0, True, 0.0, False),  # fresh
+        ],
+    )
+    def test_derived_fields(
+        self, total, stale, never_computed, is_fresh, stale_percentage, needs_recomputation
+    ):
+        """Stale percentage and recomputation need follow from the counts"""
         report = StalenessReport(
             import_id=1,
-            total_top_level=100,
-            stale_count=0,
-            never_computed_count=10,
+            total_top_level=total,
+            stale_count=stale,
+            never_computed_count=never_computed,
             oldest_computation=None,
             newest_computation=None,
-            freshness_threshold=timedelta(hours=24),
-            is_fresh=False,
+            freshness_threshold=TD_24H,
+            is_fresh=is_fresh,
         )
-        assert report.needs_recomputation is True
-
-    def test_needs_recomputation_fresh(self):
-        """Does not need recomputation when fresh"""
-        report = StalenessReport(
-            import_id=1,
-            total_top_level=100,
-            stale_count=0,
-            never_computed_count=0,
-            oldest_computation=datetime.now(),
-            newest_computation=datetime.now(),
-            freshness_threshold=timedelta(hours=24),
-            is_fresh=True,
-        )
-        assert report.needs_recomputation is False
+        assert report.stale_percentage == stale_percentage
+        assert report.needs_recomputation is needs_recomputation
 
 
 class TestRecomputationResult:
@@ -158,248 +193,193 @@ class TestGraphChange:
 class TestGetStalenessReport:
     """Test the get_staleness_report function"""
 
-    def test_staleness_report_all_fresh(self):
+    def test_staleness_report_all_fresh(self, mock_db):
         """Report should show fresh when all nodes are recently computed"""
         mock_stats = {
             'total_top_level': 50,
             'never_computed': 0,
             'stale': 0,
-            'oldest': datetime.now() - timedelta(hours=1),
-            'newest': datetime.now(),
+            'oldest': NOW - TD_1H,
+            'newest': NOW,
         }
         mock_breakdown = [
             {'source': 'systemPackages', 'total': 50, 'never_computed': 0, 'stale': 0}
         ]
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = mock_stats
-            mock_cursor.fetchall.return_value = mock_breakdown
+        _, mock_cursor = mock_db
+        mock_cursor.fetchone.return_value = mock_stats
+        mock_cursor.fetchall.return_value = mock_breakdown
 
-            report = get_staleness_report(1, timedelta(hours=24))
+        report = get_staleness_report(1, TD_24H)
 
-            assert report.total_top_level == 50
-            assert report.stale_count == 0
-            assert report.never_computed_count == 0
-            assert report.is_fresh is True
-            assert report.needs_recomputation is False
+        assert report.total_top_level == 50
+        assert report.stale_count == 0
+        assert report.never_computed_count == 0
+        assert report.is_fresh is True
+        assert report.needs_recomputation is False
 
-    def test_staleness_report_all_stale(self):
+    def test_staleness_report_all_stale(self, mock_db):
         """Report should show stale when all nodes are old"""
         mock_stats = {
             'total_top_level': 50,
             'never_computed': 10,
             'stale': 40,
-            'oldest': datetime.now() - timedelta(days=7),
-            'newest': datetime.now() - timedelta(days=2),
+            'oldest': NOW - TD_7D,
+            'newest': NOW - timedelta(days=2),
         }
         mock_breakdown = []
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = mock_stats
-            mock_cursor.fetchall.return_value = mock_breakdown
+        _, mock_cursor = mock_db
+        mock_cursor.fetchone.return_value = mock_stats
+        mock_cursor.fetchall.return_value = mock_breakdown
 
-            report = get_staleness_report(1, timedelta(hours=24))
+        report = get_staleness_report(1, TD_24H)
 
-            assert report.stale_count == 40
-            assert report.never_computed_count == 10
-            assert report.is_fresh is False
-            assert report.needs_recomputation is True
+        assert report.stale_count == 40
+        assert report.never_computed_count == 10
+        assert report.is_fresh is False
+        assert report.needs_recomputation is True
 
 
 class TestMarkContributionsStale:
     """Test the mark_contributions_stale function"""
 
-    def test_mark_all_stale(self):
+    @pytest.mark.parametrize('patches', [['cache']], indirect=True)
+    def test_mark_all_stale(self, mock_db, patches):
         """Should mark all top-level nodes stale when no node_ids specified"""
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            with patch('vizzy.services.incremental.cache') as mock_cache:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.rowcount = 25
-
-                count = mark_contributions_stale(1)
-
-                assert count == 25
-                mock_cursor.execute.assert_called_once()
-                assert 'contribution_computed_at = NULL' in mock_cursor.execute.call_args[0][0]
-                mock_conn.commit.assert_called_once()
-                mock_cache.invalidate.assert_called_once()
-
-    def test_mark_specific_nodes_stale(self):
+        mock_cache = patches['cache']
+        mock_conn, mock_cursor = mock_db
+        mock_cursor.rowcount = 25
+
+        count = mark_contributions_stale(1)
+
+        assert count == 25
+        mock_cursor.execute.assert_called_once()
+        assert 'contribution_computed_at = NULL' in mock_cursor.execute.call_args[0][0]
+        mock_conn.commit.assert_called_once()
+        mock_cache.invalidate.assert_called_once()
+
+    @pytest.mark.parametrize('patches', [['cache']], indirect=True)
+    def test_mark_specific_nodes_stale(self, mock_db, patches):
         """Should mark only specified nodes stale"""
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            with patch('vizzy.services.incremental.cache') as mock_cache:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.rowcount = 3
+        mock_cache = patches['cache']
+        _, mock_cursor = mock_db
+        mock_cursor.rowcount = 3
 
-                count = mark_contributions_stale(1, node_ids=[10, 20, 30])
+        count = mark_contributions_stale(1, node_ids=[10, 20, 30])
 
-                assert count == 3
-                call_args = mock_cursor.execute.call_args[0]
-                assert 'id = ANY' in call_args[0]
+        assert count == 3
+        call_args = mock_cursor.execute.call_args[0]
+        assert 'id = ANY' in call_args[0]
 
 
 class TestFindAffectedNodes:
     """Test the affected node finding functions"""
 
-    def test_find_affected_by_edge_change(self):
+    def test_find_affected_by_edge_change(self, mock_db):
         """Should find top-level nodes affected by edge change"""
-        mock_results = [
-            {'top_level_id': 1},
-            {'top_level_id': 5},
-            {'top_level_id': 10},
-        ]
-
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchall.return_value = mock_results
+        _, mock_cursor = mock_db
+        mock_cursor.fetchall.return_value = _EDGE_CHANGE_ROWS
 
-            affected = find_affected_nodes_by_edge_change(1, 100, 200)
+        affected = find_affected_nodes_by_edge_change(1, 100, 200)
 
-            assert affected == {1, 5, 10}
-            mock_cursor.execute.assert_called_once()
+        assert affected == _AFFECTED_EDGE
+        mock_cursor.execute.assert_called_once()
 
-    def test_find_affected_by_node_change(self):
+    def test_find_affected_by_node_change(self, mock_db):
         """Should find top-level nodes affected by node change"""
-        mock_results = [
-            {'id': 1},
-            {'id': 2},
-        ]
+        _, mock_cursor = mock_db
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        # First call for is_top_level check, second for affected nodes
+        mock_cursor.fetchone.return_value = {'is_top_level': False}
+        mock_cursor.fetchall.return_value = _NODE_CHANGE_ROWS
 
-            # First call for is_top_level check, second for affected nodes
-            mock_cursor.fetchone.return_value = {'is_top_level': False}
-            mock_cursor.fetchall.return_value = mock_results
+        affected = find_affected_nodes_by_node_change(1, 100)
 
-            affected = find_affected_nodes_by_node_change(1, 100)
+        assert affected == _AFFECTED_NODE
 
-            assert affected == {1, 2}
-
-    def test_find_affected_by_top_level_change(self):
+    def test_find_affected_by_top_level_change(self, mock_db):
         """Top-level change should affect all top-level nodes"""
-        mock_results = [
-            {'id': 1},
-            {'id': 2},
-            {'id': 3},
-            {'id': 4},
-        ]
-
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchall.return_value = mock_results
+        _, mock_cursor = mock_db
+        mock_cursor.fetchall.return_value = _TOP_LEVEL_ROWS
 
-            affected = find_affected_by_top_level_change(1, 100)
+        affected = find_affected_by_top_level_change(1, 100)
 
-            assert affected == {1, 2, 3, 4}
+        assert affected == _AFFECTED_TOPLVL
 
 
 class TestRecomputeStaleContributions:
     """Test the recompute_stale_contributions function"""
 
-    def test_no_stale_nodes(self):
+    def test_no_stale_nodes(self, mock_db):
         """Should return early when no stale nodes"""
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchall.return_value = []  # No stale nodes
+        _, mock_cursor = mock_db
+        mock_cursor.fetchall.return_value = []  # No stale nodes
 
-            result = recompute_stale_contributions(1)
+        result = recompute_stale_contributions(1)
 
-            assert result.nodes_updated == 0
-            assert result.strategy_used == 'none_needed'
+        assert result.nodes_updated == 0
+        assert result.strategy_used == 'none_needed'
 
-    def test_high_staleness_uses_full_recomputation(self):
+    @pytest.mark.parametrize(
+        'patches', [['get_top_level_count_internal', 'compute_contributions']], indirect=True
+    )
+    def test_high_staleness_uses_full_recomputation(self, mock_db, patches):
         """Should use full recomputation when > 50% nodes are stale"""
-        stale_nodes = [{'id': i} for i in range(60)]
+        mock_count = patches['get_top_level_count_internal']
+        mock_compute = patches['compute_contributions']
+        _, mock_cursor = mock_db
+        mock_cursor.fetchall.return_value = _STALE_60
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            with patch('vizzy.services.incremental.get_top_level_count_internal') as mock_count:
-                with patch('vizzy.services.incremental.compute_contributions') as mock_compute:
-                    mock_conn = MagicMock()
-                    mock_cursor = MagicMock()
-                    mock_get_db.return_value.__enter__.return_value = mock_conn
-                    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                    mock_cursor.fetchall.return_value = stale_nodes
+        mock_count.return_value = 100  # 60/100 = 60% stale
+        mock_compute.return_value = 100
 
-                    mock_count.return_value = 100  # 60/100 = 60% stale
-                    mock_compute.return_value = 100
+        result = recompute_stale_contributions(1)
 
-                    result = recompute_stale_contributions(1)
-
-                    assert result.strategy_used == 'full'
-                    mock_compute.assert_called_once_with(1)
+        assert result.strategy_used == 'full'
+        mock_compute.assert_called_once_with(1)
 
 
 class TestRecomputeSelective:
     """Test the recompute_selective function"""
 
-    def test_selective_recomputation(self):
+    @pytest.mark.parametrize('patches', [['compute_closure', 'cache']], indirect=True)
+    def test_selective_recomputation(self, mock_db, patches):
         """Should selectively recompute only specified nodes"""
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            with patch('vizzy.services.incremental.compute_closure') as mock_closure:
-                with patch('vizzy.services.incremental.cache') as mock_cache:
-                    mock_conn = MagicMock()
-                    mock_cursor = MagicMock()
-                    mock_get_db.return_value.__enter__.return_value = mock_conn
-                    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_closure = patches['compute_closure']
+        mock_cache = patches['cache']
+        _, mock_cursor = mock_db
 
-                    # Mock top-level nodes
-                    mock_cursor.fetchall.return_value = [{'id': 1}, {'id': 2}, {'id': 3}]
-                    # Mock closures
-                    mock_closure.return_value = {10, 20, 30}
+        # Mock top-level nodes
+        mock_cursor.fetchall.return_value = [{'id': 1}, {'id': 2}, {'id': 3}]
+        # Mock closures
+        mock_closure.return_value = {10, 20, 30}
 
-                    result = recompute_selective(1, [1, 2])
+        result = recompute_selective(1, [1, 2])
 
-                    assert result.strategy_used == 'selective'
-                    assert result.nodes_updated == 2
-                    mock_cache.invalidate.assert_called_once()
+        assert result.strategy_used == 'selective'
+        assert result.nodes_updated == 2
+        mock_cache.invalidate.assert_called_once()
 
 
 class TestRecomputeForGraphChange:
     """Test the recompute_for_graph_change function"""
 
-    def test_full_reimport_triggers_full_recomputation(self):
+    def test_full_reimport_triggers_full_recomputation(self, monkeypatch):
         """Full reimport should trigger full recomputation"""
         change = GraphChange(
             change_type=ChangeType.FULL_REIMPORT,
             import_id=1,
         )
+        mock_compute = MagicMock(return_value=50)
+        monkeypatch.setattr('vizzy.services.incremental.compute_contributions', mock_compute)
 
-        with patch('vizzy.services.incremental.compute_contributions') as mock_compute:
-            mock_compute.return_value = 50
-
-            result = recompute_for_graph_change(change)
+        result = recompute_for_graph_change(change)
 
-            assert result.strategy_used == 'full'
-            mock_compute.assert_called_once_with(1)
+        assert result.strategy_used == 'full'
+        mock_compute.assert_called_once_with(1)
 
-    def test_edge_added_triggers_incremental(self):
+    def test_edge_added_triggers_incremental(self, monkeypatch):
         """Edge addition should trigger incremental recomputation"""
         change = GraphChange(
             change_type=ChangeType.EDGE_ADDED,
@@ -407,44 +387,40 @@ class TestRecomputeForGraphChange:
             source_id=10,
             target_id=20,
         )
+        mock_find = MagicMock(return_value={1, 2, 3})
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=3, computation_time_ms=100.0
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.find_affected_nodes_by_edge_change', mock_find)
+        monkeypatch.setattr('vizzy.services.incremental.recompute_selective', mock_recompute)
 
-        with patch('vizzy.services.incremental.find_affected_nodes_by_edge_change') as mock_find:
-            with patch('vizzy.services.incremental.recompute_selective') as mock_recompute:
-                mock_find.return_value = {1, 2, 3}
-                mock_recompute.return_value = RecomputationResult(
-                    import_id=1,
-                    nodes_updated=3,
-                    nodes_skipped=0,
-                    computation_time_ms=100.0,
-                    strategy_used='selective',
-                )
-
-                result = recompute_for_graph_change(change)
+        result = recompute_for_graph_change(change)
 
-                mock_find.assert_called_once()
-                mock_recompute.assert_called_once()
+        mock_find.assert_called_once()
+        mock_recompute.assert_called_once()
 
-    def test_no_affected_nodes(self):
+    def test_no_affected_nodes(self, monkeypatch):
         """When no nodes affected, should return early"""
         change = GraphChange(
             change_type=ChangeType.NODE_ADDED,
             import_id=1,
             node_id=100,
         )
+        monkeypatch.setattr(
+            'vizzy.services.incremental.find_affected_nodes_by_node_change',
+            MagicMock(return_value=set()),
+        )
 
-        with patch('vizzy.services.incremental.find_affected_nodes_by_node_change') as mock_find:
-            mock_find.return_value = set()
-
-            result = recompute_for_graph_change(change)
+        result = recompute_for_graph_change(change)
 
-            assert result.nodes_updated == 0
-            assert result.strategy_used == 'incremental'
+        assert result.nodes_updated == 0
+        assert result.strategy_used == 'incremental'
 
 
 class TestEstimateRecomputationCost:
     """Test the estimate_recomputation_cost function"""
 
-    def test_cost_estimate_no_stale(self):
+    def test_cost_estimate_no_stale(self, mock_db):
         """Should recommend no recomputation when nothing is stale"""
         mock_metrics = {
             'total_nodes': 1000,
@@ -454,19 +430,15 @@ class TestEstimateRecomputationCost:
             'stale_count': 0,
         }
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = mock_metrics
+        _, mock_cursor = mock_db
+        mock_cursor.fetchone.return_value = mock_metrics
 
-            estimate = estimate_recomputation_cost(1)
+        estimate = estimate_recomputation_cost(1)
 
-            assert estimate['stale_count'] == 0
-            assert estimate['recommendation'] == 'no_recomputation_needed'
+        assert estimate['stale_count'] == 0
+        assert estimate['recommendation'] == 'no_recomputation_needed'
 
-    def test_cost_estimate_high_staleness(self):
+    def test_cost_estimate_high_staleness(self, mock_db):
         """Should recommend full recomputation for high staleness"""
         mock_metrics = {
             'total_nodes': 1000,
@@ -476,19 +448,15 @@ class TestEstimateRecomputationCost:
             'stale_count': 40,  # 80% stale
         }
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = mock_metrics
+        _, mock_cursor = mock_db
+        mock_cursor.fetchone.return_value = mock_metrics
 
-            estimate = estimate_recomputation_cost(1)
+        estimate = estimate_recomputation_cost(1)
 
-            assert estimate['stale_count'] == 40
-            assert estimate['recommendation'] == 'full_recomputation'
+        assert estimate['stale_count'] == 40
+        assert estimate['recommendation'] == 'full_recomputation'
 
-    def test_cost_estimate_low_staleness(self):
+    def test_cost_estimate_low_staleness(self, mock_db):
         """Should recommend incremental for low staleness"""
         mock_metrics = {
             'total_nodes': 1000,
@@ -498,226 +466,181 @@ class TestEstimateRecomputationCost:
             'stale_count': 5,  # 10% stale
         }
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_get_db.return_value.__enter__.return_value = mock_conn
-            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-            mock_cursor.fetchone.return_value = mock_metrics
+        _, mock_cursor = mock_db
+        mock_cursor.fetchone.return_value = mock_metrics
 
-            estimate = estimate_recomputation_cost(1)
+        estimate = estimate_recomputation_cost(1)
 
-            assert estimate['stale_count'] == 5
-            assert estimate['recommendation'] == 'incremental_recomputation'
-            assert estimate['savings_percentage'] > 0
+        assert estimate['stale_count'] == 5
+        assert estimate['recommendation'] == 'incremental_recomputation'
+        assert estimate['savings_percentage'] > 0
 
 
 class TestApiIntegrationHelpers:
     """Test the API integration helper functions"""
 
-    def test_handle_import_completed_new(self):
+    def test_handle_import_completed_new(self, monkeypatch):
         """New import should trigger full computation"""
-        with patch('vizzy.services.incremental.recompute_for_graph_change') as mock_recompute:
-            mock_recompute.return_value = RecomputationResult(
-                import_id=1,
-                nodes_updated=50,
-                nodes_skipped=0,
-                computation_time_ms=500.0,
-                strategy_used='full',
-            )
-
-            result = handle_import_completed(1, is_reimport=False)
-
-            mock_recompute.assert_called_once()
-            call_arg = mock_recompute.call_args[0][0]
-            assert call_arg.change_type == ChangeType.FULL_REIMPORT
-
-    def test_handle_import_completed_reimport(self):
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=50, computation_time_ms=500.0, strategy_used='full'
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.recompute_for_graph_change', mock_recompute)
+
+        result = handle_import_completed(1, is_reimport=False)
+
+        mock_recompute.assert_called_once()
+        call_arg = mock_recompute.call_args[0][0]
+        assert call_arg.change_type == ChangeType.FULL_REIMPORT
+
+    def test_handle_import_completed_reimport(self, monkeypatch):
         """Reimport should mark stale and recompute"""
-        with patch('vizzy.services.incremental.mark_contributions_stale') as mock_mark:
-            with patch('vizzy.services.incremental.recompute_stale_contributions') as mock_recompute:
-                mock_recompute.return_value = RecomputationResult(
-                    import_id=1,
-                    nodes_updated=30,
-                    nodes_skipped=0,
-                    computation_time_ms=300.0,
-                    strategy_used='incremental',
-                )
-
-                result = handle_import_completed(1, is_reimport=True)
-
-                mock_mark.assert_called_once_with(1)
-                mock_recompute.assert_called_once()
-
-    def test_handle_node_change(self):
+        mock_mark = MagicMock()
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=30, computation_time_ms=300.0, strategy_used='incremental'
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.mark_contributions_stale', mock_mark)
+        monkeypatch.setattr('vizzy.services.incremental.recompute_stale_contributions', mock_recompute)
+
+        result = handle_import_completed(1, is_reimport=True)
+
+        mock_mark.assert_called_once_with(1)
+        mock_recompute.assert_called_once()
+
+    def test_handle_node_change(self, monkeypatch):
         """Node change should trigger appropriate recomputation"""
-        with patch('vizzy.services.incremental.recompute_for_graph_change') as mock_recompute:
-            mock_recompute.return_value = RecomputationResult(
-                import_id=1,
-                nodes_updated=5,
-                nodes_skipped=0,
-                computation_time_ms=100.0,
-                strategy_used='selective',
-            )
-
-            result = handle_node_change(1, 100, ChangeType.NODE_MODIFIED)
-
-            mock_recompute.assert_called_once()
-            call_arg = mock_recompute.call_args[0][0]
-            assert call_arg.change_type == ChangeType.NODE_MODIFIED
-            assert call_arg.node_id == 100
-
-    def test_handle_edge_change_added(self):
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=5, computation_time_ms=100.0
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.recompute_for_graph_change', mock_recompute)
+
+        result = handle_node_change(1, 100, ChangeType.NODE_MODIFIED)
+
+        mock_recompute.assert_called_once()
+        call_arg = mock_recompute.call_args[0][0]
+        assert call_arg.change_type == ChangeType.NODE_MODIFIED
+        assert call_arg.node_id == 100
+
+    def test_handle_edge_change_added(self, monkeypatch):
         """Edge addition should trigger recomputation"""
-        with patch('vizzy.services.incremental.recompute_for_graph_change') as mock_recompute:
-            mock_recompute.return_value = RecomputationResult(
-                import_id=1,
-                nodes_updated=3,
-                nodes_skipped=0,
-                computation_time_ms=50.0,
-                strategy_used='selective',
-            )
-
-            result = handle_edge_change(1, 10, 20, added=True)
-
-            mock_recompute.assert_called_once()
-            call_arg = mock_recompute.call_args[0][0]
-            assert call_arg.change_type == ChangeType.EDGE_ADDED
-            assert call_arg.source_id == 10
-            assert call_arg.target_id == 20
-
-    def test_handle_edge_change_removed(self):
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=3, computation_time_ms=50.0
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.recompute_for_graph_change', mock_recompute)
+
+        result = handle_edge_change(1, 10, 20, added=True)
+
+        mock_recompute.assert_called_once()
+        call_arg = mock_recompute.call_args[0][0]
+        assert call_arg.change_type == ChangeType.EDGE_ADDED
+        assert call_arg.source_id == 10
+        assert call_arg.target_id == 20
+
+    def test_handle_edge_change_removed(self, monkeypatch):
         """Edge removal should trigger recomputation"""
-        with patch('vizzy.services.incremental.recompute_for_graph_change') as mock_recompute:
-            mock_recompute.return_value = RecomputationResult(
-                import_id=1,
-                nodes_updated=3,
-                nodes_skipped=0,
-                computation_time_ms=50.0,
-                strategy_used='selective',
-            )
-
-            result = handle_edge_change(1, 10, 20, added=False)
-
-            mock_recompute.assert_called_once()
-            call_arg = mock_recompute.call_args[0][0]
-            assert call_arg.change_type == ChangeType.EDGE_REMOVED
-
-    def test_handle_top_level_change(self):
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=3, computation_time_ms=50.0
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.recompute_for_graph_change', mock_recompute)
+
+        result = handle_edge_change(1, 10, 20, added=False)
+
+        mock_recompute.assert_called_once()
+        call_arg = mock_recompute.call_args[0][0]
+        assert call_arg.change_type == ChangeType.EDGE_REMOVED
+
+    def test_handle_top_level_change(self, monkeypatch):
         """Top-level change should trigger full recomputation of all"""
-        with patch('vizzy.services.incremental.recompute_for_graph_change') as mock_recompute:
-            mock_recompute.return_value = RecomputationResult(
-                import_id=1,
-                nodes_updated=50,
-                nodes_skipped=0,
-                computation_time_ms=500.0,
-                strategy_used='selective',
-            )
+        mock_recompute = MagicMock(return_value=make_result(
+            nodes_updated=50, computation_time_ms=500.0
+        ))
+        monkeypatch.setattr('vizzy.services.incremental.recompute_for_graph_change', mock_recompute)
 
-            result = handle_top_level_change(1, 100)
+        result = handle_top_level_change(1, 100)
 
-            mock_recompute.assert_called_once()
-            call_arg = mock_recompute.call_args[0][0]
-            assert call_arg.change_type == ChangeType.TOP_LEVEL_CHANGED
+        mock_recompute.assert_called_once()
+        call_arg = mock_recompute.call_args[0][0]
+        assert call_arg.change_type == ChangeType.TOP_LEVEL_CHANGED
 
 
 class TestShouldTriggerRecomputation:
     """Test the should_trigger_recomputation function"""
 
-    def test_should_trigger_when_stale(self):
+    @pytest.mark.parametrize('patches', [['get_staleness_report']], indirect=True)
+    def test_should_trigger_when_stale(self, patches):
         """Should return True when recomputation is needed"""
-        with patch('vizzy.services.incremental.get_staleness_report') as mock_report:
-            mock_report.return_value = StalenessReport(
-                import_id=1,
-                total_top_level=50,
-                stale_count=10,
-                never_computed_count=5,
-                oldest_computation=None,
-                newest_computation=None,
-                freshness_threshold=timedelta(hours=1),
-                is_fresh=False,
-            )
-
-            result = should_trigger_recomputation(1, timedelta(hours=1))
-
-            assert result is True
-
-    def test_should_not_trigger_when_fresh(self):
+        mock_report = patches['get_staleness_report']
+        mock_report.return_value = StalenessReport(
+            import_id=1,
+            total_top_level=50,
+            stale_count=10,
+            never_computed_count=5,
+            oldest_computation=None,
+            newest_computation=None,
+            freshness_threshold=TD_1H,
+            is_fresh=False,
+        )
+
+        result = should_trigger_recomputation(1, TD_1H)
+
+        assert result is True
+
+    @pytest.mark.parametrize('patches', [['get_staleness_report']], indirect=True)
+    def test_should_not_trigger_when_fresh(self, patches):
         """Should return False when data is fresh"""
-        with patch('vizzy.services.incremental.get_staleness_report') as mock_report:
-            mock_report.return_value = StalenessReport(
-                import_id=1,
-                total_top_level=50,
-                stale_count=0,
-                never_computed_count=0,
-                oldest_computation=datetime.now(),
-                newest_computation=datetime.now(),
-                freshness_threshold=timedelta(hours=1),
-                is_fresh=True,
-            )
+        mock_report = patches['get_staleness_report']
+        mock_report.return_value = StalenessReport(
+            import_id=1,
+            total_top_level=50,
+            stale_count=0,
+            never_computed_count=0,
+            oldest_computation=NOW,
+            newest_computation=NOW,
+            freshness_threshold=TD_1H,
+            is_fresh=True,
+        )
 
-            result = should_trigger_recomputation(1, timedelta(hours=1))
+        result = should_trigger_recomputation(1, TD_1H)
 
-            assert result is False
+        assert result is False
 
 
 class TestRecomputeAllImportsStale:
     """Test the batch recomputation function"""
 
-    def test_recomputes_all_stale_imports(self):
+    @pytest.mark.parametrize('patches', [['recompute_stale_contributions']], indirect=True)
+    def test_recomputes_all_stale_imports(self, mock_db, patches):
         """Should recompute all imports with stale data"""
         mock_import_ids = [{'import_id': 1}, {'import_id': 2}, {'import_id': 3}]
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            with patch('vizzy.services.incremental.recompute_stale_contributions') as mock_recompute:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_import_ids
-
-                mock_recompute.return_value = RecomputationResult(
-                    import_id=1,
-                    nodes_updated=10,
-                    nodes_skipped=0,
-                    computation_time_ms=100.0,
-                    strategy_used='incremental',
-                )
-
-                results = recompute_all_imports_stale()
-
-                assert len(results) == 3
-                assert 1 in results
-                assert 2 in results
-                assert 3 in results
-
-    def test_handles_recomputation_errors(self):
+        mock_recompute = patches['recompute_stale_contributions']
+        _, mock_cursor = mock_db
+        mock_cursor.fetchall.return_value = mock_import_ids
+
+        mock_recompute.return_value = make_result(
+            nodes_updated=10, computation_time_ms=100.0, strategy_used='incremental'
+        )
+
+        results = recompute_all_imports_stale()
+
+        assert len(results) == 3
+        assert 1 in results
+        assert 2 in results
+        assert 3 in results
+
+    @pytest.mark.parametrize('patches', [['recompute_stale_contributions']], indirect=True)
+    def test_handles_recomputation_errors(self, mock_db, patches):
         """Should handle errors gracefully and continue"""
         mock_import_ids = [{'import_id': 1}, {'import_id': 2}]
 
-        with patch('vizzy.services.incremental.get_db') as mock_get_db:
-            with patch('vizzy.services.incremental.recompute_stale_contributions') as mock_recompute:
-                mock_conn = MagicMock()
-                mock_cursor = MagicMock()
-                mock_get_db.return_value.__enter__.return_value = mock_conn
-                mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.fetchall.return_value = mock_import_ids
-
-                # First import fails, second succeeds
-                mock_recompute.side_effect = [
-                    Exception("Database error"),
-                    RecomputationResult(
-                        import_id=2,
-                        nodes_updated=10,
-                        nodes_skipped=0,
-                        computation_time_ms=100.0,
-                        strategy_used='incremental',
-                    ),
-                ]
-
-                results = recompute_all_imports_stale()
-
-                assert len(results) == 2
-                assert results[1].success is False
-                assert "Database error" in results[1].errors[0]
-                assert results[2].success is True
+        mock_recompute = patches['recompute_stale_contributions']
+        _, mock_cursor = mock_db
+        mock_cursor.fetchall.return_value = mock_import_ids
+
+        mock_recompute.side_effect = iter(_ERR_RR_SIDE_EFFECTS)
+
+        results = recompute_all_imports_stale()
+
+        assert len(results) == 2
+        assert results[1].success is False
+        assert "Database error" in results[1].errors[0]
+        assert results[2].success is True
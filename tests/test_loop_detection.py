@@ -36,10 +36,10 @@ class TestTarjanAlgorithm:
             mock_get_db.return_value.__enter__.return_value = mock_conn
             mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-            # Setup mock cursor to return nodes then edges
+            # Setup mock cursor to return edges, then the nodes in cycles
             mock_cursor.fetchall.side_effect = [
-                [mock_nodes[1], mock_nodes[2]],  # nodes query
                 mock_edges,  # edges query
+                [mock_nodes[1], mock_nodes[2]],  # cycle nodes query
             ]
 
             from vizzy.services.analysis import find_loops
@@ -71,8 +71,8 @@ class TestTarjanAlgorithm:
             mock_get_db.return_value.__enter__.return_value = mock_conn
             mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
+            # No cycles, so the node rows are never fetched
             mock_cursor.fetchall.side_effect = [
-                list(mock_nodes.values()),
                 mock_edges,
             ]
 
@@ -81,6 +81,7 @@ class TestTarjanAlgorithm:
 
             # Should find no cycles
             assert len(loops) == 0
+            assert mock_cursor.execute.call_count == 1
 
     def test_find_multiple_cycles(self):
         """Test detection of multiple independent cycles"""
@@ -108,8 +109,8 @@ class TestTarjanAlgorithm:
             mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
             mock_cursor.fetchall.side_effect = [
-                list(mock_nodes.values()),
                 mock_edges,
+                list(mock_nodes.values()),
             ]
 
             from vizzy.services.analysis import find_loops
@@ -141,8 +142,8 @@ class TestTarjanAlgorithm:
             mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
             mock_cursor.fetchall.side_effect = [
-                list(mock_nodes.values()),
                 mock_edges,
+                list(mock_nodes.values()),
             ]
 
             from vizzy.services.analysis import find_loops
@@ -152,22 +153,75 @@ class TestTarjanAlgorithm:
             assert len(loops) == 1
             assert loops[0].size == 3
 
+    def test_second_call_served_from_cache(self):
+        """Repeated loop detection for the same import doesn't query again"""
+        mock_nodes = [
+            {"id": 1, "import_id": 1, "drv_hash": "aaa", "drv_name": "a.drv",
+             "label": "a", "package_type": "app", "depth": 0, "closure_size": 0, "metadata": None},
+            {"id": 2, "import_id": 1, "drv_hash": "bbb", "drv_name": "b.drv",
+             "label": "b", "package_type": "app", "depth": 1, "closure_size": 0, "metadata": None},
+        ]
+        mock_edges = [
+            {"source_id": 1, "target_id": 2},
+            {"source_id": 2, "target_id": 1},
+        ]
+
+        with patch('vizzy.services.analysis.get_db') as mock_get_db:
+            mock_conn = MagicMock()
+            mock_cursor = MagicMock()
+            mock_get_db.return_value.__enter__.return_value = mock_conn
+            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+            mock_cursor.fetchall.side_effect = [mock_edges, mock_nodes]
+
+            from vizzy.services.analysis import find_loops
+            first = find_loops(1)
+            execute_count = mock_cursor.execute.call_count
+            second = find_loops(1)
+
+            assert second is first
+            assert mock_cursor.execute.call_count == execute_count
+
+    def test_long_cycle_does_not_hit_recursion_limit(self):
+        """SCC detection is iterative, so a cycle deeper than the recursion limit works"""
+        import sys
+        from vizzy.services.analysis import _build_csr, _strongly_connected_components
+
+        n = sys.getrecursionlimit() * 2
+        edges = [(i, (i + 1) % n) for i in range(n)]
+
+        sccs = _strongly_connected_components(*_build_csr(n, edges))
+
+        assert len(sccs) == 1
+        assert sorted(sccs[0]) == list(range(n))
+
+    def test_self_loop_and_singletons_are_not_cycles(self):
+        """Only SCCs with more than one node are reported"""
+        from vizzy.services.analysis import _build_csr, _strongly_connected_components
+
+        assert _strongly_connected_components(*_build_csr(3, [(0, 0), (1, 0)])) == []
+
+    def test_build_csr(self):
+        """Successors are grouped by source, keeping edge order"""
+        from vizzy.services.analysis import _build_csr
+
+        indptr, indices = _build_csr(4, [(2, 0), (0, 1), (2, 3), (0, 2)])
+
+        assert list(indptr) == [0, 2, 2, 4, 4]
+        assert list(indices) == [1, 2, 0, 3]
+
 
 class TestFindCycleInSCC:
     """Test the helper function for finding cycle path within an SCC"""
 
     def test_find_cycle_path(self):
         """Test that cycle path is correctly extracted"""
-        from vizzy.services.analysis import _find_cycle_in_scc
+        from vizzy.services.analysis import _build_csr, _find_cycle_in_scc
 
         scc_nodes = [1, 2, 3]
-        adjacency = {
-            1: [2],
-            2: [3],
-            3: [1],
-        }
+        indptr, indices = _build_csr(4, [(1, 2), (2, 3), (3, 1)])
 
-        path = _find_cycle_in_scc(scc_nodes, adjacency)
+        path = _find_cycle_in_scc(scc_nodes, indptr, indices)
 
         # Path should form a cycle back to start
         assert len(path) >= 2
@@ -176,7 +230,18 @@ class TestFindCycleInSCC:
 
     def test_empty_scc(self):
         """Test handling of empty SCC"""
-        from vizzy.services.analysis import _find_cycle_in_scc
+        from vizzy.services.analysis import _build_csr, _find_cycle_in_scc
 
-        path = _find_cycle_in_scc([], {})
+        path = _find_cycle_in_scc([], *_build_csr(0, []))
         assert path == []
+
+    def test_cycle_ignores_edges_leaving_the_scc(self):
+        """Neighbors outside the SCC are never part of the path"""
+        from vizzy.services.analysis import _build_csr, _find_cycle_in_scc
+
+        # 0 -> 3 leaves the SCC {0, 1, 2}; 0 -> 0 is a self-loop
+        indptr, indices = _build_csr(4, [(0, 3), (0, 0), (0, 1), (1, 2), (2, 0)])
+
+        path = _find_cycle_in_scc([0, 1, 2], indptr, indices)
+
+        assert path == [0, 1, 2, 0]
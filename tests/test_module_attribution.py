@@ -52,6 +52,17 @@ class TestModuleTypeClassification:
         result = _classify_module_type('custom.module')
         assert result == 'other'
 
+    @pytest.mark.parametrize("source", [
+        'programs',
+        'services',
+        'systemPackages.extra',
+        'programsX.git.enable',
+        '',
+    ])
+    def test_prefix_without_module_path_is_other(self, source):
+        """Only exact systemPackages and dotted programs./services. paths are classified"""
+        assert _classify_module_type(source) == 'other'
+
 
 class TestServiceToPackageMapping:
     """Test the service-to-package mapping functionality"""
@@ -320,20 +331,21 @@ class TestMarkTopLevelNodesWithModuleType:
                 mock_cursor = MagicMock()
                 mock_get_db.return_value.__enter__.return_value = mock_conn
                 mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-                mock_cursor.rowcount = 1
+                mock_cursor.rowcount = 3
 
                 result = mark_top_level_nodes(import_id=1, host="testhost")
 
                 assert result == 3  # 3 packages marked
 
-                # Verify UPDATE includes module_type
-                calls = mock_cursor.execute.call_args_list
-                for call in calls:
-                    sql = call[0][0]
-                    params = call[0][1]
-                    assert 'module_type' in sql
+                # Verify the single batched UPDATE includes module_type
+                mock_cursor.executemany.assert_called_once()
+                sql, params = mock_cursor.executemany.call_args[0]
+                assert 'module_type' in sql
+                assert len(params) == 3
+                for row in params:
                     # Check that module_type is passed as parameter
-                    assert params[1] in ['systemPackages', 'programs', 'services', 'other']
+                    assert row[1] in ['systemPackages', 'programs', 'services', 'other']
+                assert [row[1] for row in params] == ['systemPackages', 'programs', 'services']
 
 
 class TestServiceToPackageMapCompleteness:
@@ -132,16 +132,18 @@ class TestMarkTopLevelNodes:
                 mock_get_db.return_value.__enter__.return_value = mock_conn
                 mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-                # First call marks firefox (1 row), second marks git (1 row)
-                mock_cursor.rowcount = 1
+                # firefox and git each mark one row; rowcount is the batch total
+                mock_cursor.rowcount = 2
 
                 result = mark_top_level_nodes(import_id=1, host="testhost")
 
                 # Should have marked 2 packages
                 assert result == 2
 
-                # Verify UPDATE was called for each package
-                assert mock_cursor.execute.call_count == 2
+                # Verify one batched UPDATE with a parameter row per package
+                mock_cursor.executemany.assert_called_once()
+                params = mock_cursor.executemany.call_args[0][1]
+                assert [row[3] for row in params] == ['firefox', 'git']
 
 
 class TestGetTopLevelNodes: